@@ -1,118 +1,237 @@
 import sys
-import asyncio
+import argparse
 import time
 import os
-from rich.console import Console
-from rich.markdown import Markdown
-from rich.panel import Panel
-from rich.live import Live
-from rich import box
-from rich.prompt import Prompt
-
-# IMPORTS DA ARQUITETURA MVC (Sherlock + Neural Engine + UI)
-from src.ui.banners import show_intro, show_menu, clear_screen
-from src.ui.dashboard import NeuralDashboard
-from src.core.scanner import run_lighthouse, run_backend_check, parse_data
-from src.core.ai import analyze_performance
-from src.core.crawler import run_crawler
-from src.utils.pdf_generator import generate_pdf
-
-console = Console()
-
-def save_report_disk(url, content, prefix="AUDIT"):
-    """Salva o relatório em Markdown na pasta reports"""
+
+# Imports pesados (rich, Playwright, UI, e até o asyncio) ficam dentro dos
+# fluxos que usam: `perfscan --help` e os subcomandos sobem em milissegundos.
+# `perfscan importtime` confere o orçamento.
+_console = None
+
+def get_console():
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+def report_path(url, prefix="AUDIT"):
+    """Caminho do relatório na pasta reports (criada se precisar)"""
     if not os.path.exists("reports"): os.makedirs("reports")
     safe_url = url.replace("http://", "").replace("https://", "").replace("/", "_")
     timestamp = time.strftime("%Y-%m-%d_%H-%M-%S")
-    filename = f"reports/{prefix}_{safe_url}_{timestamp}.md"
+    return f"reports/{prefix}_{safe_url}_{timestamp}.md"
+
+def save_report_disk(url, content, prefix="AUDIT", filename=None):
+    """Salva o relatório em Markdown na pasta reports"""
+    filename = filename or report_path(url, prefix)
     with open(filename, "w", encoding="utf-8") as f: f.write(content)
     return filename
 
-async def run_scan_flow(url, mode):
-    """Fluxo Principal: Scan + Segurança + IA Consultora"""
-    dash = NeuralDashboard(url)
-    
-    with Live(dash.make_layout(), refresh_per_second=15, console=console) as live:
-        def step(msg, prog, status="SCANNING"):
-            dash.update_logs(msg)
-            dash.status_msg = status
-            dash.progress.update(dash.task_id, completed=prog, description=status)
-            for _ in range(5): 
-                dash.tick()
-                live.update(dash.make_layout())
-                time.sleep(0.05)
-
-        step("Initializing handshake protocols...", 5)
-        
-        # 1. Frontend (Lighthouse)
-        step(f"Injecting Lighthouse probe...", 10, "FRONTEND SCAN")
-        lh_data = await asyncio.to_thread(run_lighthouse, url)
-        step("[bold green]Frontend metrics captured.[/]", 30)
-
-        # 2. Backend & Security (Sherlock 2.0)
-        step("Analyzing server headers, SSL & deep stack...", 40, "DEEP SCAN")
-        be_data = await asyncio.to_thread(run_backend_check, url)
-        
-        # Atualiza a UI com dados reais
-        if "stack" in be_data: dash.stack = be_data["stack"]
-        if "security" in be_data: dash.security_score = str(be_data["security"].get("score", 0))
-        
-        step("Security audit & Tech detection complete.", 60)
+STAGE_LABELS = {
+    "lighthouse": ("Injecting Lighthouse probe...", "[bold green]Frontend metrics captured.[/]"),
+    "measure": ("Sampling Lighthouse & TTFB (repeated runs)...", "[bold green]Metric distributions captured.[/]"),
+    "backend": ("Analyzing server headers & deep stack...", "Security audit & Tech detection complete."),
+    "ssl": ("Reading SSL certificate...", "SSL validity checked."),
+    "recon": ("Resolving DNS, probing ports & subdomains...", "Recon complete."),
+    "parse": ("Normalizing data structures for LLM...", "Data normalized."),
+    "report": ("[bold magenta]ENGAGING LLAMA 3.2 EXECUTIVE MODE...[/]", "[dim]Technical dossier drafted.[/]"),
+}
 
-        # 3. AI Processing
-        step("Normalizing data structures for LLM...", 70, "DATA PROCESSING")
-        parsed = parse_data(lh_data, be_data)
-        
-        step("[bold magenta]ENGAGING LLAMA 3.2 EXECUTIVE MODE...[/]", 80, "AI ANALYSIS")
-        step("[dim]Drafting detailed technical dossier...[/]", 85)
-        
-        # Tempo extra para a IA pensar (Relatório longo demora mais)
-        for _ in range(20):
-            dash.tick()
-            live.update(dash.make_layout())
-            time.sleep(0.1)
-            
-        report = await asyncio.to_thread(analyze_performance, parsed)
-        
-        step("[bold green]AUDIT COMPLETE. DOSSIER READY.[/]", 100, "FINISHED")
-        await asyncio.sleep(1)
+async def run_scan_flow(url, mode, report_file=None, use_ai=True, measure_options=None, ui=True):
+    """Fluxo Principal: Scan + Segurança + IA Consultora (sondas em paralelo).
+
+    Com ``use_ai=False`` o dossiê sai só do template, sem chamar o Ollama.
+    ``measure_options`` liga o modo de medição repetida (ver measure_options()).
+    O painel roda no próprio ritmo (``live_dashboard``); ``ui=False`` não desenha nada.
+    """
+    import asyncio
+    import threading
+    from src.ui.dashboard import NeuralDashboard, live_dashboard
+    from src.core.pipeline import build_scan_stages, run_dag
+
+    console = get_console()
+    dash = NeuralDashboard(url, enabled=ui)
+    cancel = threading.Event()
+    ai_stats = {}
+    report_options = {
+        # Roda na thread do LLM: só enfileira, o loop de render pinta
+        "on_token": dash.stream_ai,
+        "on_stats": ai_stats.update,
+        "stream_to": report_file,  # o .md vai sendo escrito junto com a tela
+        "cancel": cancel,
+        "use_ai": use_ai,
+    }
+    # HAR da página ao lado do .md (abre no DevTools / webpagetest)
+    har_path = os.path.splitext(report_file)[0] + ".har" if report_file else None
+    stages = build_scan_stages(url, report_options=report_options, har_path=har_path,
+                               measure_options=measure_options, subdomain_options={})
+
+    with live_dashboard(dash, console):
+        done = []
+        def on_event(name, event, result, elapsed_ms):
+            start_msg, done_msg = STAGE_LABELS[name]
+            if name == "report" and not use_ai:
+                start_msg, done_msg = "Rendering template dossier (no AI)...", "[dim]Technical dossier rendered.[/]"
+            if event == "start":
+                dash.update_logs(start_msg)
+                if name == "report": dash.set_status("AI ANALYSIS" if use_ai else "REPORT")
+                return
+            done.append(name)
+            dash.update_logs(f"{done_msg} [dim]({elapsed_ms} ms)[/]")
+            # Atualiza a UI com dados reais
+            if name == "backend":
+                if "stack" in result: dash.set_stack(result["stack"])
+                if "security" in result: dash.set_security(result["security"].get("score", 0))
+            dash.set_progress(5 + int(95 * len(done) / len(stages)))
+
+        dash.update_logs("Initializing handshake protocols...")
+        dash.set_status("DEEP SCAN")
+        dash.set_progress(5, "DEEP SCAN")
+        try:
+            results, timings = await run_dag(stages, on_event)
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            # Fecha o stream do Ollama para o modelo parar de gerar na hora
+            cancel.set()
+            raise
+        if ai_stats.get("cache") == "hit":
+            dash.update_logs("[magenta]Dossier served from AI cache (same scan data).[/]")
+        elif ai_stats.get("ttft_s") is not None:
+            dash.update_logs(f"[magenta]TTFT {ai_stats['ttft_s']}s • {ai_stats.get('tokens_per_s') or '?'} tok/s[/]")
+        dash.update_logs("[bold green]AUDIT COMPLETE. DOSSIER READY.[/]")
+        dash.set_status("FINISHED")
+        dash.set_progress(100, "FINISHED")
+
+    console.print("[dim]Stage timings: " + " • ".join(f"{n} {ms} ms" for n, ms in timings.items()) + "[/]")
+    return results["report"]
+
+def format_map_changes(changes):
+    """Seção de diff do re-crawl incremental (vazia no primeiro mapeamento)"""
+    if not changes: return ""
+    def listing(urls):
+        return "\n".join([f"- {u}" for u in urls[:50]]) or "- (nenhuma)"
+    return f"""
+## 🔄 Mudanças desde o Último Mapeamento
+**Inalteradas:** {changes['unchanged']} • **Novas:** {len(changes['added'])} • **Alteradas:** {len(changes['changed'])} • **Removidas:** {len(changes['removed'])}
+
+### ➕ Novas
+{listing(changes['added'])}
+
+### ✏️ Alteradas
+{listing(changes['changed'])}
+
+### ➖ Removidas
+{listing(changes['removed'])}
+"""
+
+def format_site_audit(audit):
+    """Seção da auditoria página a página feita durante o mapeamento"""
+    if not audit or not audit.get("pages"): return ""
+    def kb(n):
+        return f"{n / 1024:.0f} KB" if n is not None else "N/A"
+    issues = "\n".join(
+        f"- **{kind}:** {entry['count']} de {audit['pages']} páginas (ex: {', '.join(entry['samples'][:3])})"
+        for kind, entry in audit["issues"].items()
+    ) or "- Nenhuma falha de header encontrada."
+    stack = ", ".join(f"{tech} ({n})" for tech, n in audit["stack"].items()) or "-"
+    templates = "\n".join(
+        "| {} | {} | {} | {} | {} |".format(
+            name, t["pages"], kb((t["bytes"] or {}).get("avg")),
+            (t["elapsed_ms"] or {}).get("avg", "N/A"),
+            ", ".join(list(t["plugins"])[:5]) or "-",
+        )
+        for name, t in list(audit["templates"].items())[:20]
+    )
+    slowest = "\n".join(f"- {p['url']} ({p['elapsed_ms']} ms)" for p in audit["slowest"][:5]) or "- (nenhuma)"
+    security = audit.get("security_score") or {}
+    return f"""
+## 🛡️ Auditoria Página a Página
+**Páginas analisadas:** {audit['pages']} (reaproveitadas sem mudança: {audit['skipped']}) • **Score de segurança:** média {security.get('avg', 'N/A')}, pior {security.get('min', 'N/A')}
+**Stack (páginas):** {stack}
+
+### Falhas de Headers no Site
+{issues}
+
+### Templates
+| Template | Páginas | Tamanho médio | Tempo médio (ms) | Plugins |
+|---|---|---|---|---|
+{templates}
+
+### Páginas Mais Lentas
+{slowest}
+"""
+
+def format_subdomains(result):
+    """Seção de subdomínios vivos do mapa (origem: link, certificado ou wordlist)"""
+    if result.get("error"):
+        return f"\n## 🛰️ Subdomínios\n*Enumeração falhou: {result['error']}*\n"
+    if not result["subdomains"]:
+        return ""
+    rows = "\n".join(f"| {s['host']} | {', '.join(s['ips'][:3])} | {s['source']} |" for s in result["subdomains"])
+    wildcard = f"\n*DNS curinga detectado (*.{result['domain']}): nomes que só caem nele foram ignorados.*\n" \
+        if result["wildcard"] else ""
+    return f"""
+## 🛰️ Subdomínios Vivos ({len(result['subdomains'])})
+| Host | IPs | Origem |
+|---|---|---|
+{rows}
+{wildcard}"""
+
+async def run_crawler_flow(url, ui=True, incremental=False, audit=False, mode="browser", max_pages=30,
+                           max_depth=None, resume=False, persist=False):
+    """Fluxo Secundário: Spider Crawler.
 
-    return report
+    ``incremental`` compara com o último mapa salvo deste host e ``audit``
+    analisa cada página visitada (``--incremental`` / ``--site-audit``).
+    ``mode="fast"`` (``--fast``) baixa por HTTP e só abre o browser para
+    páginas renderizadas no cliente. ``max_pages``/``max_depth`` limitam o
+    mapa e ``persist``/``resume`` guardam o estado em SQLite para continuar
+    um crawl grande interrompido (``--max-pages``, ``--resume``...).
+    """
+    import asyncio
+    from src.ui.dashboard import NeuralDashboard, live_dashboard
+    from src.core.crawler import run_crawler
+    from src.core.subdomains import discover_subdomains, hosts_from_urls
 
-async def run_crawler_flow(url):
-    """Fluxo Secundário: Spider Crawler"""
-    dash = NeuralDashboard(url)
-    
-    with Live(dash.make_layout(), refresh_per_second=15, console=console) as live:
-        dash.status_msg = "SPIDER BOT"
+    console = get_console()
+    dash = NeuralDashboard(url, enabled=ui)
+
+    with live_dashboard(dash, console):
+        dash.set_status("SPIDER BOT")
         dash.update_logs("[bold yellow]🕷️  RELEASING STEALTH SPIDER (V4.0)...[/]")
-        dash.progress.update(dash.task_id, description="MAPPING")
-        
-        # Roda o crawler
-        data = await asyncio.to_thread(run_crawler, url)
-        
-        # Efeito Matrix dos links encontrados
-        total_pages = len(data.get('scanned_pages', []))
-        if total_pages == 0: total_pages = 1 
-        
-        for i, page in enumerate(data.get('scanned_pages', [])):
-            progress = ((i + 1) / total_pages) * 100
+        dash.set_progress(0, "MAPPING")
+
+        data = await asyncio.to_thread(run_crawler, url, incremental=incremental, audit=audit, mode=mode,
+                                       max_pages=max_pages, max_depth=max_depth, resume=resume, persist=persist)
+
+        # Efeito Matrix dos links encontrados (o painel mostra os últimos)
+        pages = data.get('scanned_pages', [])
+        for page in pages:
             clean_page = page.replace(url, "")
             if not clean_page: clean_page = "/"
-            
             dash.update_logs(f"[green]FOUND NODE: {clean_page}[/]")
-            dash.progress.update(dash.task_id, completed=progress)
-            dash.tick()
-            live.update(dash.make_layout())
-            time.sleep(0.05)
-        
+        dash.set_progress(90)
+
+        # Hosts dos links encontrados + lista interna viram candidatos a subdomínio
+        links = data.get('internal_links', []) + data.get('external_links', [])
+        try:
+            subs = await discover_subdomains(url, extra=hosts_from_urls(links))
+        except Exception as e:
+            subs = {"subdomains": [], "error": str(e)}
+        for sub in subs["subdomains"]:
+            dash.update_logs(f"[cyan]LIVE SUBDOMAIN: {sub['host']}[/]")
+
         dash.update_logs(f"[bold cyan]MAP COMPLETE. {len(data.get('internal_links', []))} LINKS INDEXED.[/]")
-        dash.status_msg = "FINISHED"
-        live.update(dash.make_layout())
-        time.sleep(1)
-        
+        dash.set_status("FINISHED")
+        dash.set_progress(100, "FINISHED")
+
         internal_list = "\n".join([f"- {link}" for link in data.get('internal_links', [])[:50]])
         external_list = "\n".join([f"- {link}" for link in data.get('external_links', [])])
+        changes_section = format_map_changes(data.get('changes'))
+        audit_section = format_site_audit(data.get('audit'))
+        subdomain_section = format_subdomains(subs)
+        failed = data.get('failed_pages') or []
+        failed_section = ("\n## ⚠️ Páginas que Falharam\n" + "\n".join(f"- {f['url']}: {f['error']}" for f in failed) + "\n") if failed else ""
         
         return f"""
 # 🕸️ Mapeamento Tático do Site
@@ -125,14 +244,27 @@ async def run_crawler_flow(url):
 
 ## 🌍 Conexões Externas
 {external_list}
-
+{changes_section}{audit_section}{subdomain_section}{failed_section}
 ---
 *Mapeado por PerfScan v6.0*
 """
 
-def main():
+def interactive(use_ai=True, measure_options=None, ui=True, intro=True, crawl_options=None):
+    """Loop de missões com intro, menu e dashboard (modo clássico).
+
+    ``ui=False`` (``--no-ui``) pula a intro animada e o painel ao vivo;
+    ``intro=False`` só a intro (qualquer flag na linha de comando).
+    ``crawl_options`` vai para o mapeamento (incremental, audit, mode, limites, resume).
+    """
+    import asyncio
+    from rich.panel import Panel
+    from rich import box
+    from rich.prompt import Prompt
+    from src.ui.banners import show_intro, show_menu
+
+    console = get_console()
     while True:
-        show_intro()
+        if ui and intro: show_intro()
         mode = show_menu()
         
         if mode == 0: break
@@ -143,15 +275,20 @@ def main():
         try:
             # ROTEAMENTO DE MODOS
             if mode == 5:
-                report = asyncio.run(run_crawler_flow(url))
                 prefix = "MAP"
+                fname = report_path(url, prefix)
+                report = asyncio.run(run_crawler_flow(url, ui=ui, **(crawl_options or {})))
                 border_color = "green"
             else:
-                report = asyncio.run(run_scan_flow(url, mode))
                 prefix = "AUDIT"
+                fname = report_path(url, prefix)
+                report = asyncio.run(run_scan_flow(url, mode, report_file=fname, use_ai=use_ai,
+                                                   measure_options=measure_options, ui=ui))
                 border_color = "white"
             
             # EXIBIÇÃO NO TERMINAL (ESTILO DOCUMENTO CONFIDENCIAL)
+            # rich.markdown puxa o markdown_it: só carrega quando há relatório
+            from rich.markdown import Markdown
             console.rule(f"[bold {border_color}] RELATÓRIO FINAL [/bold {border_color}]")
             console.print(
                 Panel(
@@ -165,21 +302,130 @@ def main():
             )
             
             # SALVAMENTO EM DISCO (MD)
-            fname = save_report_disk(url, report, prefix)
+            fname = save_report_disk(url, report, prefix, filename=fname)
             console.print(f"\n[bold black on green] MARKDOWN SAVED: {fname} [/]")
             
             # GERAÇÃO DE PDF
             console.print("[bold yellow]📄 GENERATING EXECUTIVE PDF...[/]")
             try:
+                from src.utils.pdf_generator import generate_pdf
                 pdf_file = asyncio.run(asyncio.to_thread(generate_pdf, report, fname))
                 console.print(f"[bold black on cyan] PDF EXPORTED: {pdf_file} [/]")
             except Exception as pdf_err:
                 console.print(f"[red]❌ PDF Generation Failed (Check dependencies): {pdf_err}[/]")
             
-        except Exception as e:
+        except Exception:
             console.print_exception()
         
         if Prompt.ask("\n[bold]New Mission?[/]", choices=["y", "n"], default="y") == "n": break
 
+def add_measure_args(parser):
+    parser.add_argument("--runs", type=int, default=1, help="Amostras do Lighthouse/TTFB por alvo (>1 liga a estatística)")
+    parser.add_argument("--warmup", type=int, default=1, help="Runs de aquecimento descartados (com --runs > 1)")
+    parser.add_argument("--cache", choices=["cold", "warm", "both"], default="cold", help="Cache do browser nas amostras")
+    parser.add_argument("--sample-concurrency", type=int, default=1,
+                        help="Amostras cold simultâneas (mais rápido, mas divide CPU e infla as métricas)")
+
+def measure_options(args):
+    """kwargs de src.core.measure.measure, ou None para o Lighthouse único"""
+    if args.runs <= 1: return None
+    return {"runs": args.runs, "warmup": args.warmup, "cache": args.cache, "concurrency": args.sample_concurrency}
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="perfscan", description="PerfScan: auditoria de performance e segurança")
+    parser.add_argument("--no-ai", action="store_true", help="Dossiê só de template, sem chamar o Ollama")
+    parser.add_argument("--no-ui", action="store_true", help="Sem intro animada nem painel ao vivo")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Mapa: compara com o último crawl salvo e só renderiza o que mudou")
+    parser.add_argument("--site-audit", action="store_true", help="Mapa: audita cada página visitada")
+    parser.add_argument("--fast", action="store_true",
+                        help="Mapa: HTTP puro, browser só para páginas renderizadas no cliente (SPA)")
+    parser.add_argument("--max-pages", type=int, default=30, help="Mapa: máximo de páginas visitadas")
+    parser.add_argument("--max-depth", type=int, default=None, help="Mapa: profundidade máxima a partir da URL inicial")
+    parser.add_argument("--persist", action="store_true",
+                        help="Mapa: guarda fronteira/visitados em .perfscan/crawl (crawls grandes)")
+    parser.add_argument("--resume", action="store_true", help="Mapa: continua o último crawl salvo deste host")
+    add_measure_args(parser)
+    sub = parser.add_subparsers(dest="command")
+
+    batch = sub.add_parser("batch", help="Audita uma lista de URLs sem UI e grava JSONL")
+    batch.add_argument("file", help="Arquivo com uma URL por linha (# comenta)")
+    batch.add_argument("--concurrency", type=int, default=8, help="Alvos auditados ao mesmo tempo")
+    batch.add_argument("--out", default="results.jsonl", help="Arquivo JSONL de saída (append)")
+    batch.add_argument("--recon", action="store_true", help="Inclui DNS/portas no pipeline")
+    batch.add_argument("--ports", default=None, help="Portas do recon: top100 (padrão), top1000, 1-1024,8080...")
+    batch.add_argument("--subdomains", action="store_true", help="Enumera subdomínios no recon (requer --recon)")
+    batch.add_argument("--wordlist", default=None, help="Wordlist de subdomínios (um rótulo por linha)")
+    batch.add_argument("--report", action="store_true", help="Inclui o dossiê de template (sem IA) em cada registro")
+    batch.add_argument("--ai", action="store_true", help="Inclui o dossiê com resumo executivo da IA em cada registro")
+    batch.add_argument("-v", "--verbose", action="store_true", help="Loga detalhes (ex: tokens do prompt por request)")
+    add_measure_args(batch)
+
+    recon = sub.add_parser("recon", help="Só DNS/portas (asyncio) para uma lista de hosts, grava JSONL")
+    recon.add_argument("file", help="Arquivo com uma URL/host por linha (# comenta)")
+    recon.add_argument("--ports", default="top1000", help="top1000 (padrão), top100, 1-65535, 22,80,443...")
+    recon.add_argument("--concurrency", type=int, default=8, help="Hosts varridos ao mesmo tempo")
+    recon.add_argument("--max-connections", type=int, default=500, help="Connects simultâneos somando todos os hosts")
+    recon.add_argument("--out", default="recon.jsonl", help="Arquivo JSONL de saída (append)")
+
+    subs = sub.add_parser("subdomains", help="Enumera subdomínios vivos e grava a lista para o batch")
+    subs.add_argument("target", help="Domínio ou URL alvo")
+    subs.add_argument("--wordlist", default=None, help="Um rótulo por linha (lido em streaming; padrão: lista interna)")
+    subs.add_argument("--concurrency", type=int, default=200, help="Consultas DNS simultâneas")
+    subs.add_argument("--rate", type=int, default=500, help="Máximo de consultas DNS por segundo (0 = sem limite)")
+    subs.add_argument("--out", default="live_hosts.txt", help="Hosts vivos, um por linha (entrada do perfscan batch)")
+
+    importtime = sub.add_parser("importtime", help="Mede o import das entradas da CLI e confere o orçamento")
+    importtime.add_argument("--budget", action="append", default=[], metavar="MÓDULO=MS",
+                            help="Orçamento por módulo (padrão: main=40, src.core.batch=150)")
+    importtime.add_argument("--runs", type=int, default=3, help="Medições por módulo (vale a menor)")
+
+    portfolio = sub.add_parser("portfolio", help="Dossiê único (com comparativo) a partir do JSONL do batch")
+    portfolio.add_argument("results", help="JSONL gerado pelo perfscan batch")
+    portfolio.add_argument("--out", default="portfolio.md", help="Arquivo Markdown de saída")
+    portfolio.add_argument("-v", "--verbose", action="store_true", help="Loga cada passada da IA")
+    return parser
+
+def importtime_main(args):
+    """Entrada do subcomando ``perfscan importtime``: sai com 1 se algum import estourar"""
+    from src.utils.importtime import check_budgets, DEFAULT_BUDGETS
+    budgets = dict(DEFAULT_BUDGETS)
+    for item in args.budget:
+        module, _, ms = item.partition("=")
+        budgets[module] = float(ms)
+    ok = True
+    for r in check_budgets(budgets, args.runs):
+        ok = ok and r["ok"]
+        status = "ok  " if r["ok"] else "FAIL"
+        heavy = f" • pesados no boot: {', '.join(r['heavy'])}" if r["heavy"] else ""
+        slowest = ", ".join(f"{n} {ms}" for n, ms in r["slowest"][:3])
+        print(f"{status} {r['module']}: {r['ms']} ms (orçamento {r['budget_ms']:g} ms){heavy} • {slowest}")
+    return 0 if ok else 1
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    args = build_parser().parse_args(argv)
+
+    if args.command == "batch":
+        from src.core.batch import batch_main
+        return batch_main(args, measure_options(args))
+    if args.command == "recon":
+        from src.core.batch import recon_main
+        return recon_main(args)
+    if args.command == "subdomains":
+        from src.core.batch import subdomains_main
+        return subdomains_main(args)
+    if args.command == "importtime":
+        return importtime_main(args)
+    if args.command == "portfolio":
+        from src.core.batch import portfolio_main
+        return portfolio_main(args)
+
+    # Quem passa flag quer trabalhar: pula a intro animada
+    interactive(use_ai=not args.no_ai, measure_options=measure_options(args), ui=not args.no_ui,
+                intro=not argv, crawl_options={"incremental": args.incremental, "audit": args.site_audit,
+                               "mode": "fast" if args.fast else "browser", "max_pages": args.max_pages,
+                               "max_depth": args.max_depth, "resume": args.resume, "persist": args.persist})
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
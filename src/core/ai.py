@@ -1,5 +1,11 @@
-import requests
-import json
+import asyncio
+import threading
+from src.core.prompt import (
+    build_prompt, build_site_block, chunk_sites, comparison_table, estimate_tokens, size_num_ctx,
+    PORTFOLIO_SYSTEM_PROMPT, FLEET_SYSTEM_PROMPT, PORTFOLIO_OUTPUT_PER_SITE, log,
+)
+from src.core.report import render_report_parts, template_summary
+from src.utils.report_cache import get_report_cache, cache_key
 
 # URL da API do Ollama
 OLLAMA_API = "http://localhost:11434/api/generate"
@@ -7,88 +13,222 @@ OLLAMA_API = "http://localhost:11434/api/generate"
 # Modelo Inteligente
 PRIMARY_MODEL = "llama3.2" 
 
-def query_ollama(prompt):
-    payload = {
-        "model": PRIMARY_MODEL, 
-        "prompt": prompt, 
-        "stream": False,
-        "options": {
-            "num_ctx": 8192,  # AUMENTADO: Mais memória para escrever textos longos
-            "temperature": 0.3, # Criatividade controlada
-            "top_p": 0.9
-        }
-    }
+GENERATION_OPTIONS = {
+    "num_ctx": 8192,  # Teto; build_prompt ajusta ao tamanho real do prompt
+    "temperature": 0.3, # Criatividade controlada
+    "top_p": 0.9
+}
+
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+def get_ollama_client():
+    """Cliente compartilhado: uma sessão HTTP e uma fila para o processo todo"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            # requests só carrega quando a IA é usada de fato
+            from src.core.ollama_client import OllamaClient
+            _client = OllamaClient(api_url=OLLAMA_API, model=PRIMARY_MODEL)
+        return _client
+
+def get_async_ollama_client():
+    """Variante asyncio do cliente compartilhado (mesma fila, mesma sessão)"""
+    global _async_client
+    client = get_ollama_client()
+    with _client_lock:
+        if _async_client is None:
+            from src.core.ollama_client import AsyncOllamaClient
+            _async_client = AsyncOllamaClient(client)
+        return _async_client
+
+def query_ollama(prompt, options=None, system=None, priority=10, on_stats=None):
+    # Timeout de leitura de 4 minutos (Relatórios longos demoram mais)
+    text, stats = get_ollama_client().generate(
+        prompt, options or GENERATION_OPTIONS, system=system, priority=priority
+    )
+    if on_stats: on_stats(stats)
+    return text
+
+def stream_ollama(prompt, on_token=None, cancel=None, priority=10, options=None, system=None):
+    """Consome o NDJSON do Ollama token a token.
+
+    ``on_token(texto)`` recebe cada pedaço assim que chega e ``cancel`` (um
+    ``threading.Event``) interrompe a geração: fechar a conexão faz o Ollama
+    abortar o request e liberar o slot do modelo na hora. Retorna
+    ``(texto, stats)`` com tempo até o primeiro token e tokens/s.
+    """
+    return get_ollama_client().generate(
+        prompt, options or GENERATION_OPTIONS, stream=True, on_token=on_token, cancel=cancel,
+        system=system, priority=priority
+    )
+
+async def stream_ollama_async(prompt, on_token=None, cancel=None, priority=10, options=None, system=None):
+    """``stream_ollama`` para quem está no loop asyncio; cancelar a task aborta a geração"""
+    return await get_async_ollama_client().generate(
+        prompt, options or GENERATION_OPTIONS, stream=True, on_token=on_token, cancel=cancel,
+        system=system, priority=priority
+    )
+
+def summary_cache_key(system, prompt, options):
+    """Chave do resumo: o prompt exatamente como o modelo recebe.
+
+    ``build_data_prompt`` já normaliza o que não muda o diagnóstico (ordem
+    de sets, validade do SSL em faixas); números que o modelo cita entram
+    como estão, para um resumo cacheado nunca contradizer as tabelas.
+    """
+    return cache_key(PRIMARY_MODEL, options, system, prompt)
+
+def _cacheable(text, stats, cancel=None):
+    """Só resposta completa: sem erro, não vazia, não cancelada e terminada pelo modelo"""
+    if not text.strip() or stats.get("error") or (cancel is not None and cancel.is_set()):
+        return False
+    return stats.get("done", False) and stats.get("done_reason") in (None, "stop")
+
+def summarize(data, on_token=None, on_stats=None, cancel=None, use_cache=True):
+    """Só o resumo executivo via LLM (curto, cacheado). Retorna o texto ou
+    ``"Erro ..."`` se o Ollama falhar (e ``on_stats`` recebe ``"error"``)."""
+    # Instruções fixas no system (KV cache reaproveitado), só dados no prompt
+    system, prompt, options = build_prompt(data, GENERATION_OPTIONS)
+
+    key = summary_cache_key(system, prompt, options)
+    cached = get_report_cache().get(key) if use_cache else None
+    if cached is not None:
+        if on_token: on_token(cached)
+        if on_stats: on_stats({"cache": "hit"})
+        return cached
+
+    run_stats = {}
+    def record(stats):
+        run_stats.update(stats)
+        if on_stats: on_stats(stats)
+
+    if on_token is None:
+        text = query_ollama(prompt, options, system, on_stats=record)
+    else:
+        text, stats = stream_ollama(prompt, on_token, cancel, options=options, system=system)
+        record(stats)
+    log.info("ollama prompt_eval_count=%s eval_count=%s num_ctx=%d",
+             run_stats.get("prompt_tokens"), run_stats.get("tokens"), options["num_ctx"])
+
+    if use_cache and _cacheable(text, run_stats, cancel):
+        get_report_cache().put(key, text.strip())
+    return text
+
+def analyze_performance(data, on_token=None, on_stats=None, stream_to=None, cancel=None,
+                        use_cache=True, use_ai=True):
+    """Gera o dossiê. Tabelas, riscos e snippets saem do template
+    (src/core/report.py); o LLM só escreve o resumo executivo, e com
+    ``use_ai=False`` nem isso. Com ``on_token``/``stream_to`` o texto sai
+    em streaming para a UI e para o arquivo do relatório."""
+    head, body = render_report_parts(data)
+
+    out = open(stream_to, "w", encoding="utf-8") if stream_to else None
+    def emit(token):
+        if out:
+            out.write(token)
+            out.flush()
+        if on_token: on_token(token)
+
     try:
-        # Timeout aumentado para 4 minutos (Relatórios longos demoram mais)
-        r = requests.post(OLLAMA_API, json=payload, timeout=240)
-        
-        if r.status_code == 200:
-            response_json = r.json()
-            return response_json.get("response", "")
-        else:
-            return f"Erro status {r.status_code}"
-            
-    except Exception as e:
-        return f"Erro conexão IA: {str(e)}"
-
-def analyze_performance(data):
-    stack = ", ".join(data.get("stack", ["Standard Web"]))
-    
-    # Prepara dados de segurança para a IA não se perder
-    sec_score = data['security'].get('score', 0)
-    sec_issues = "\n".join([f"- {i}" for i in data['security'].get('issues', [])])
-    if not sec_issues: sec_issues = "Nenhuma falha crítica detectada nos headers padrão."
-
-    # PROMPT "CONSULTORIA DE ELITE"
-    prompt_engineer = f"""
-    [ROLE]
-    Você é um Arquiteto de Soluções Sênior e Especialista em Cibersegurança.
-    Você foi contratado para fazer uma auditoria técnica profunda e impiedosa.
-    
-    [DADOS DO ALVO]
-    - Stack Tecnológica: {stack}
-    - SSL Status: {data['ssl_days']} dias restantes.
-    - Performance (Lighthouse): {data['score']}/100
-    - Métricas Vitais: LCP={data['metrics']['LCP']}, CLS={data['metrics']['CLS']}, TTFB={data['metrics']['TTFB']}
-    - Score de Segurança: {sec_score}/100
-    - Falhas de Segurança Detectadas:
-    {sec_issues}
-
-    [DIRETRIZES DE ESCRITA]
-    1. SEJA EXTENSO E DETALHADO. Não economize palavras. Explique o "porquê".
-    2. Use linguagem corporativa/técnica de alto nível.
-    3. NÃO invente dados. Use os números acima.
-    4. Use Tabelas Markdown para organizar dados.
-    5. Fale Português do Brasil Formal.
-
-    [ESTRUTURA OBRIGATÓRIA DO RELATÓRIO]
-    
-    # 📑 Dossiê Técnico de Auditoria: {stack}
-    
-    ## 1. Resumo Executivo
-    (Escreva um parágrafo de alto nível sobre a saúde geral do site. Mencione se está crítico ou estável. Fale sobre o impacto disso no negócio/SEO).
-
-    ## 2. Análise de Infraestrutura e Performance
-    (Crie uma tabela comparando os valores atuais com os valores ideais do Google).
-    (Explique tecnicamente por que o LCP de {data['metrics']['LCP']} está impactando a conversão de usuários. Cite a tecnologia {stack} na explicação).
-
-    ## 3. Diagnóstico de Cibersegurança
-    (Analise o Score de {sec_score}/100).
-    (Para cada falha listada nos dados, explique o risco real. Ex: Falta de HSTS permite ataques Man-in-the-Middle).
-    (Comente sobre a validade do SSL).
-
-    ## 4. Plano de Correção Tática (Roadmap)
-    (Crie uma lista numerada detalhada com comandos ou configurações específicas para {stack}).
-    (Ex: Se for Nginx, sugira config do Nginx. Se for WP, sugira plugins).
-
-    ---
-    *Confidencial • Auditado por PerfScan v6.0*
+        emit(head)
+        summary = None
+        if use_ai:
+            streamed = []
+            def emit_summary(token):
+                streamed.append(token)
+                emit(token)
+            ai_stats = {}
+            def record(stats):
+                ai_stats.update(stats)
+                if on_stats: on_stats(stats)
+            streaming = on_token is not None or out is not None
+            text = summarize(data, emit_summary if streaming else None, record, cancel, use_cache)
+            if ai_stats.get("error"):
+                # Sem IA o relatório sai do mesmo jeito, com o resumo do template
+                summary = f"> ⚠️ Resumo da IA indisponível ({text}).\n\n{template_summary(data)}"
+                if streamed: summary = "".join(streamed) + "\n\n" + summary
+                if streaming: emit(summary[len("".join(streamed)):])
+            elif streamed:
+                summary = "".join(streamed)
+            else:
+                summary = text.strip()
+        if summary is None:
+            summary = template_summary(data)
+            emit(summary)
+        emit(body)
+    finally:
+        if out: out.close()
+    return head + summary + body
+
+async def _generate_cached(system, prompt, options, use_cache=True, priority=10):
+    """Uma chamada ao LLM passando pelo cache de relatórios"""
+    key = cache_key(PRIMARY_MODEL, options, system, prompt)
+    cached = get_report_cache().get(key) if use_cache else None
+    if cached is not None:
+        return cached
+    # Em streaming: se o lote for cancelado, a conexão fecha e o modelo para na hora
+    text, stats = await stream_ollama_async(prompt, options=options, system=system, priority=priority)
+    if use_cache and _cacheable(text, stats):
+        get_report_cache().put(key, text)
+    return text
+
+async def analyze_portfolio_async(sites, use_cache=True, on_progress=None):
+    """Relatório de portfólio: um request do LLM para vários sites.
+
+    ``sites`` é uma lista de ``{"url": ..., "data": parse_data(...)}`` (o
+    mesmo formato dos registros do ``perfscan batch``). Os sites são
+    agrupados para caber no contexto, cada grupo vira um request com uma
+    seção por site, e um último request escreve o resumo da frota sobre a
+    tabela comparativa (montada sem IA). Os requests vão todos juntos para
+    a fila do cliente, que segura no máximo OLLAMA_NUM_PARALLEL em voo.
     """
-    
-    # print(f"DEBUG: Gerando relatório longo com {PRIMARY_MODEL}...") 
-    tech_analysis = query_ollama(prompt_engineer)
-    
-    if "Erro" in tech_analysis:
-        return f"# ⚠️ Falha na Geração do Relatório\n\n{tech_analysis}"
-
-    return tech_analysis
\ No newline at end of file
+    blocks = [build_site_block(s["url"], s["data"]) for s in sites]
+    chunks = chunk_sites(blocks)
+    total = len(chunks) + 1
+    done = 0
+
+    async def generate(system, prompt, options):
+        nonlocal done
+        text = await _generate_cached(system, prompt, options, use_cache)
+        done += 1
+        if on_progress: on_progress(done, total)
+        return text
+
+    calls = []
+    for n, chunk in enumerate(chunks, 1):
+        prompt = "\n\n".join(blocks[i] for i in chunk)
+        options = dict(GENERATION_OPTIONS)
+        options["num_ctx"] = size_num_ctx(
+            estimate_tokens(PORTFOLIO_SYSTEM_PROMPT) + estimate_tokens(prompt),
+            output_budget=len(chunk) * PORTFOLIO_OUTPUT_PER_SITE,
+        )
+        log.info("portfolio chunk %d/%d: %d sites, num_ctx %d", n, len(chunks), len(chunk), options["num_ctx"])
+        calls.append(generate(PORTFOLIO_SYSTEM_PROMPT, prompt, options))
+
+    # O resumo da frota só depende da tabela: entra na fila junto com os grupos
+    table = comparison_table(sites)
+    options = dict(GENERATION_OPTIONS)
+    options["num_ctx"] = size_num_ctx(estimate_tokens(FLEET_SYSTEM_PROMPT) + estimate_tokens(table), output_budget=768)
+    calls.append(generate(FLEET_SYSTEM_PROMPT, table, options))
+    *sections, fleet = await asyncio.gather(*calls)
+
+    body = "\n\n".join(sections)
+    return f"""# 🗂️ Dossiê de Portfólio ({len(sites)} sites)
+
+## Comparativo
+{table}
+
+## Resumo da Frota
+{fleet}
+
+# Análise por Site
+{body}
+
+---
+*Confidencial • Auditado por PerfScan v6.0 • {total} chamadas de IA para {len(sites)} sites*
+"""
+
+def analyze_portfolio(sites, use_cache=True, on_progress=None):
+    return asyncio.run(analyze_portfolio_async(sites, use_cache, on_progress))
@@ -0,0 +1,211 @@
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import time
+
+from src.core.pipeline import build_scan_stages, run_dag
+from src.utils.net_cache import get_net_cache
+
+
+def read_urls(path):
+    """Lê a lista de alvos linha a linha (sem carregar o arquivo todo)"""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            url = line.strip()
+            if not url or url.startswith("#"):
+                continue
+            if not url.startswith("http"): url = "http://" + url
+            yield url
+
+
+async def audit_url(url, recon=False, report=False, ai=False, measure_options=None, recon_ports=None,
+                    subdomain_options=None):
+    """Mesmo pipeline do modo interativo, sem UI. Devolve um registro JSON-serializável.
+
+    ``report`` inclui o dossiê de template; ``ai`` também (com o resumo
+    executivo escrito pelo LLM).
+    """
+    report = report or ai
+    start = time.perf_counter()
+    record = {"url": url, "ok": False}
+    try:
+        stages = build_scan_stages(url, recon=recon, report=report, lighthouse_pool=False,
+                                   report_options={"use_ai": ai}, measure_options=measure_options,
+                                   recon_ports=recon_ports, subdomain_options=subdomain_options)
+        results, timings = await run_dag(stages)
+        # As sondas não levantam exceção: falhas vêm como {"error": ...} no resultado
+        errors = {name: r["error"] for name, r in results.items() if isinstance(r, dict) and "error" in r}
+        record["ok"] = not errors
+        if errors:
+            record["errors"] = errors
+        record["data"] = results["parse"]
+        record["timings"] = timings
+        if report:
+            record["report"] = results["report"]
+    except Exception as e:
+        record["error"] = str(e)
+    record["elapsed_ms"] = int((time.perf_counter() - start) * 1000)
+    return record
+
+
+class BatchStats:
+    """Contadores de throughput do lote"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.done = 0
+        self.failed = 0
+        self.latencies = []
+
+    def add(self, record):
+        self.done += 1
+        if not record["ok"]: self.failed += 1
+        self.latencies.append(record["elapsed_ms"])
+
+    def summary(self):
+        wall = time.perf_counter() - self.started
+        lat = sorted(self.latencies) or [0]
+        return {
+            "urls": self.done,
+            "failed": self.failed,
+            "wall_s": round(wall, 1),
+            "urls_per_min": round(self.done / wall * 60, 2) if wall else 0,
+            "latency_p50_ms": int(statistics.median(lat)),
+            "latency_max_ms": lat[-1],
+        }
+
+
+async def run_batch(urls, out_path, concurrency=8, recon=False, report=False, ai=False, log=None,
+                    measure_options=None, recon_ports=None, subdomain_options=None):
+    """Audita ``urls`` com no máximo ``concurrency`` alvos em voo.
+
+    Cada resultado vira uma linha no JSONL assim que termina (ordem de
+    conclusão, não de entrada). ``urls`` pode ser qualquer iterável,
+    inclusive um gerador de arquivo enorme: os workers puxam sob demanda.
+    """
+    stats = BatchStats()
+    targets = iter(urls)
+
+    with open(out_path, "a", encoding="utf-8") as out:
+        async def worker():
+            for url in targets:
+                record = await audit_url(url, recon=recon, report=report, ai=ai, measure_options=measure_options,
+                                         recon_ports=recon_ports, subdomain_options=subdomain_options)
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                stats.add(record)
+                if log:
+                    status = "ok " if record["ok"] else "ERR"
+                    log(f"[{stats.done}] {status} {record['elapsed_ms'] / 1000:6.1f}s {url}")
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+    return stats.summary()
+
+
+def batch_main(args, measure_options=None):
+    """Entrada do subcomando ``perfscan batch`` (sem rich, saída simples no stderr)"""
+    def log(msg):
+        print(msg, file=sys.stderr, flush=True)
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, stream=sys.stderr, format="%(name)s: %(message)s")
+
+    summary = asyncio.run(run_batch(
+        read_urls(args.file), args.out, concurrency=args.concurrency,
+        recon=args.recon, report=args.report or args.ai, ai=args.ai and not args.no_ai, log=log,
+        measure_options=measure_options, recon_ports=args.ports,
+        subdomain_options={"wordlist": args.wordlist} if args.subdomains else None,
+    ))
+    log(f"DONE {summary['urls']} urls ({summary['failed']} failed) in {summary['wall_s']}s • "
+        f"{summary['urls_per_min']} urls/min • p50 {summary['latency_p50_ms']} ms")
+    net = get_net_cache().stats()
+    log(f"NET CACHE {net['hits']} hits / {net['misses']} lookups • {net['hosts']} hosts, {net['tls']} TLS handshakes")
+    if args.ai and not args.no_ai:
+        from src.utils.report_cache import get_report_cache
+        cache = get_report_cache().stats()
+        log(f"AI CACHE {cache['hits']} hits / {cache['misses']} misses ({cache['hit_rate']:.0%}) • "
+            f"{cache['entries']} entries")
+    return 0
+
+
+def recon_main(args):
+    """Entrada do subcomando ``perfscan recon``: só DNS/portas, vários hosts de uma vez"""
+    from src.core.recon import run_recon_many, parse_ports
+
+    def log(msg):
+        print(msg, file=sys.stderr, flush=True)
+
+    urls = list(read_urls(args.file))
+    ports = parse_ports(args.ports)
+    start = time.perf_counter()
+    with open(args.out, "a", encoding="utf-8") as out:
+        def on_result(url, data):
+            out.write(json.dumps({"url": url, **data}, ensure_ascii=False) + "\n")
+            out.flush()
+            log(f"{data['elapsed_ms'] / 1000:6.1f}s {url} {data['ip']} open={data['open_ports']}")
+
+        run_recon_many(urls, ports, concurrency=args.concurrency, max_connections=args.max_connections,
+                       on_result=on_result)
+    log(f"DONE {len(urls)} hosts x {len(ports)} ports in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+def subdomains_main(args):
+    """Entrada do subcomando ``perfscan subdomains``: hosts vivos prontos para o ``perfscan batch``"""
+    from src.core.scanner import get_ssl_info
+    from src.core.subdomains import discover_subdomains, live_hosts_file
+
+    def log(msg):
+        print(msg, file=sys.stderr, flush=True)
+
+    # SANs do certificado do alvo entram como candidatos conhecidos
+    extra = [(name, "cert") for name in get_ssl_info(args.target)["sans"]]
+    result = asyncio.run(discover_subdomains(
+        args.target, wordlist=args.wordlist, extra=extra, concurrency=args.concurrency, rate=args.rate,
+        on_found=lambda sub: log(f"LIVE {sub['host']} {','.join(sub['ips'])} ({sub['source']})"),
+    ))
+    live_hosts_file(result["subdomains"], args.out)
+    if result["wildcard"]:
+        log(f"WILDCARD *.{result['domain']} -> {', '.join(result['wildcard'])} (ignorado)")
+    log(f"DONE {len(result['subdomains'])} live / {result['checked']} checked ({result['errors']} DNS errors) "
+        f"in {result['elapsed_ms'] / 1000:.1f}s -> {args.out}")
+    return 0
+
+
+def read_records(path):
+    """Registros do JSONL do batch; se a URL aparece mais de uma vez, vale o último"""
+    records = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line: continue
+            record = json.loads(line)
+            if record.get("data"):
+                records[record["url"]] = record
+    return list(records.values())
+
+
+def portfolio_main(args):
+    """Entrada do subcomando ``perfscan portfolio``: dossiê único para o JSONL do batch"""
+    from src.core.ai import analyze_portfolio
+
+    def log(msg):
+        print(msg, file=sys.stderr, flush=True)
+
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO, stream=sys.stderr, format="%(name)s: %(message)s")
+
+    sites = [{"url": r["url"], "data": r["data"]} for r in read_records(args.results)]
+    if not sites:
+        log("Nenhum resultado com dados em " + args.results)
+        return 1
+
+    start = time.perf_counter()
+    report = analyze_portfolio(sites, on_progress=lambda n, total: log(f"[{n}/{total}] AI pass done"))
+    with open(args.out, "w", encoding="utf-8") as f:
+        f.write(report)
+    log(f"PORTFOLIO {len(sites)} sites -> {args.out} in {time.perf_counter() - start:.1f}s")
+    return 0
@@ -0,0 +1,159 @@
+import atexit
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager, asynccontextmanager
+
+# Flags do Chromium compartilhado (somam o que scan, crawler e lighthouse usavam)
+CHROME_ARGS = [
+    "--headless=new",
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-gpu",
+    "--no-sandbox",
+    "--ignore-certificate-errors",
+    "--disable-blink-features=AutomationControlled",
+]
+
+
+class BrowserPool:
+    """Um único Chromium por processo, exposto via CDP.
+
+    Scan, crawler e PDF pegam um contexto isolado emprestado
+    (``connect_over_cdp``) em vez de pagar um ``chromium.launch()`` frio cada
+    um, e o Lighthouse se conecta na mesma porta com ``--port``.
+    ``max_contexts`` limita quantos contextos ficam abertos ao mesmo tempo,
+    o que segura o pico de memória. Se o processo morrer ou parar de
+    responder, o próximo empréstimo sobe outro.
+
+    Cada ``context()`` abre e fecha o próprio driver sync: um driver vivo
+    deixa o loop do Playwright marcado como "rodando" na thread, e a
+    próxima tarefa dessa thread (``asyncio.run`` do recon/measure) quebraria.
+    """
+
+    def __init__(self, max_contexts=8, startup_timeout=15):
+        self.max_contexts = max_contexts
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.port = None
+        self.endpoint = None
+        self._profile_dir = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_contexts)
+        self._executable_path = None
+
+    def _executable(self):
+        # Usa o mesmo Chromium que o `playwright install` baixou (resolvido uma vez, driver descartável)
+        if self._executable_path is None:
+            from playwright.sync_api import sync_playwright
+            with sync_playwright() as p:
+                self._executable_path = p.chromium.executable_path
+        return self._executable_path
+
+    def _start(self):
+        self._profile_dir = tempfile.mkdtemp(prefix="perfscan-chrome-")
+        cmd = [self._executable(), "--remote-debugging-port=0",
+               f"--user-data-dir={self._profile_dir}", *CHROME_ARGS, "about:blank"]
+        self.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        # O Chrome escreve a porta escolhida em DevToolsActivePort quando está pronto
+        port_file = os.path.join(self._profile_dir, "DevToolsActivePort")
+        deadline = time.time() + self.startup_timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("Chromium encerrou durante o boot")
+            try:
+                with open(port_file, "r", encoding="utf-8") as f:
+                    lines = f.read().splitlines()
+                if len(lines) >= 2:
+                    self.port = int(lines[0])
+                    self.endpoint = f"http://127.0.0.1:{self.port}"
+                    return
+            except (FileNotFoundError, ValueError):
+                pass
+            time.sleep(0.05)
+        self.close()
+        raise RuntimeError("Chromium não abriu a porta CDP a tempo")
+
+    def healthy(self):
+        """Processo vivo e respondendo no endpoint /json/version"""
+        if self.process is None or self.process.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(f"{self.endpoint}/json/version", timeout=2) as r:
+                return r.status == 200
+        except Exception:
+            return False
+
+    def ensure(self):
+        """Garante um browser saudável e devolve o endpoint CDP"""
+        with self._lock:
+            if not self.healthy():
+                self.close()
+                self._start()
+            return self.endpoint
+
+    @contextmanager
+    def context(self, **options):
+        """Contexto isolado (API sync) num browser já quente"""
+        from playwright.sync_api import sync_playwright
+        with self._slots:
+            endpoint = self.ensure()
+            with sync_playwright() as p:
+                browser = p.chromium.connect_over_cdp(endpoint)
+                ctx = browser.new_context(**options)
+                try:
+                    yield ctx
+                finally:
+                    ctx.close()
+                    # Só desconecta: o processo continua vivo para o próximo estágio
+                    browser.close()
+
+    @asynccontextmanager
+    async def async_context(self, playwright, **options):
+        """Mesmo empréstimo para quem já roda em ``playwright.async_api``"""
+        import asyncio
+        await asyncio.to_thread(self._slots.acquire)
+        try:
+            endpoint = await asyncio.to_thread(self.ensure)
+            browser = await playwright.chromium.connect_over_cdp(endpoint)
+            ctx = await browser.new_context(**options)
+            try:
+                yield ctx
+            finally:
+                await ctx.close()
+                await browser.close()
+        finally:
+            self._slots.release()
+
+    def close(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+        self.port = None
+        self.endpoint = None
+        if self._profile_dir:
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+            self._profile_dir = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Pool global do processo (criado no primeiro uso, fechado no exit)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
@@ -0,0 +1,242 @@
+import os
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT UNIQUE NOT NULL,
+    depth INTEGER NOT NULL DEFAULT 0,
+    state TEXT NOT NULL DEFAULT 'queued',
+    status INTEGER,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT,
+    change TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_urls_state ON urls(state, id);
+CREATE TABLE IF NOT EXISTS edges (
+    src TEXT NOT NULL,
+    dst TEXT NOT NULL,
+    internal INTEGER NOT NULL,
+    PRIMARY KEY (src, dst)
+);
+CREATE INDEX IF NOT EXISTS idx_edges_dst ON edges(dst, internal);
+CREATE TABLE IF NOT EXISTS prev_urls (
+    url TEXT PRIMARY KEY,
+    status INTEGER,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS prev_edges (
+    src TEXT NOT NULL,
+    dst TEXT NOT NULL,
+    internal INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_prev_edges_src ON prev_edges(src);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def default_state_path(domain):
+    """Arquivo de estado padrão por domínio (.perfscan/crawl/<host>.sqlite)"""
+    safe = domain.replace(":", "_").replace("/", "_")
+    return os.path.join(".perfscan", "crawl", f"{safe}.sqlite")
+
+
+class CrawlStore:
+    """Estado do crawl em SQLite: fronteira, visitados, status e arestas.
+
+    Expõe a mesma interface push/pop/seen do ``CrawlFrontier`` para o
+    ``WebCrawler`` usar qualquer um dos dois. Nada fica acumulado em RAM:
+    a deduplicação é o UNIQUE da tabela ``urls`` e a fila é a própria tabela
+    ordenada por ``id``. As escritas são agrupadas e gravadas a cada
+    ``checkpoint_every`` operações (e no ``close``).
+
+    Com ``incremental`` o arquivo do run anterior não é apagado: as páginas
+    visitadas e suas arestas viram ``prev_urls``/``prev_edges`` e servem de
+    base para requisições condicionais e para o diff added/removed/changed.
+    """
+
+    def __init__(self, path, resume=False, checkpoint_every=200, incremental=False):
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder): os.makedirs(folder)
+        if not resume and not incremental:
+            # O -wal/-shm de um run antigo seria reaplicado sobre o banco novo
+            for stale in (path, path + "-wal", path + "-shm"):
+                if os.path.exists(stale):
+                    os.remove(stale)
+
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self._pending = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self._migrate()
+        if incremental and not resume:
+            self._snapshot_previous_run()
+
+        # Após um crash, o que estava em andamento volta para a fila
+        self.db.execute("UPDATE urls SET state = 'queued' WHERE state = 'in_progress'")
+        self.db.commit()
+
+    def _migrate(self):
+        """Adiciona colunas novas em arquivos de estado criados por versões antigas"""
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(urls)")}
+        for name, kind in (("etag", "TEXT"), ("last_modified", "TEXT"),
+                           ("body_hash", "TEXT"), ("change", "TEXT")):
+            if name not in columns:
+                self.db.execute(f"ALTER TABLE urls ADD COLUMN {name} {kind}")
+
+    def _snapshot_previous_run(self):
+        """Move o último crawl para prev_* e zera a fronteira para o novo run"""
+        if not self.db.execute("SELECT 1 FROM urls WHERE state = 'done' LIMIT 1").fetchone():
+            return
+        self.db.executescript("""
+            DELETE FROM prev_urls;
+            DELETE FROM prev_edges;
+            INSERT INTO prev_urls (url, status, etag, last_modified, body_hash)
+                SELECT url, status, etag, last_modified, body_hash FROM urls WHERE state = 'done';
+            INSERT INTO prev_edges (src, dst, internal) SELECT src, dst, internal FROM edges;
+            DELETE FROM urls;
+            DELETE FROM edges;
+            DELETE FROM sqlite_sequence WHERE name = 'urls';
+        """)
+        self.set_meta("has_previous_run", 1)
+        self.db.commit()
+
+    def _touch(self):
+        self._pending += 1
+        if self._pending >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self):
+        self.db.commit()
+        self._pending = 0
+
+    def get_meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+        self._touch()
+
+    # --- Fronteira ---
+    def push(self, url, depth=0):
+        cur = self.db.execute("INSERT OR IGNORE INTO urls (url, depth) VALUES (?, ?)", (url, depth))
+        self._touch()
+        return cur.rowcount == 1
+
+    def pop(self):
+        row = self.db.execute(
+            "SELECT id, url, depth FROM urls WHERE state = 'queued' ORDER BY id LIMIT 1"
+        ).fetchone()
+        if not row:
+            return None
+        self.db.execute("UPDATE urls SET state = 'in_progress' WHERE id = ?", (row[0],))
+        self._touch()
+        return row[1], row[2]
+
+    def seen(self, url):
+        return self.db.execute("SELECT 1 FROM urls WHERE url = ?", (url,)).fetchone() is not None
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM urls WHERE state = 'queued'").fetchone()[0]
+
+    # --- Resultados ---
+    def mark_visited(self, url, status=None):
+        self.db.execute(
+            "UPDATE urls SET state = 'done', status = ?, updated_at = ? WHERE url = ?",
+            (status, time.time(), url),
+        )
+        self._touch()
+
+    def mark_failed(self, url):
+        self.db.execute(
+            "UPDATE urls SET state = 'failed', updated_at = ? WHERE url = ?", (time.time(), url)
+        )
+        self._touch()
+
+    # --- Re-crawl incremental ---
+    def previous(self, url):
+        """Validadores do run anterior (ou None se a página é nova)"""
+        row = self.db.execute(
+            "SELECT status, etag, last_modified, body_hash FROM prev_urls WHERE url = ?", (url,)
+        ).fetchone()
+        if not row:
+            return None
+        return {"status": row[0], "etag": row[1], "last_modified": row[2], "body_hash": row[3]}
+
+    def previous_edges(self, url):
+        """Outlinks gravados no run anterior: lista de ``(dst, internal)``"""
+        return [(dst, bool(internal)) for dst, internal in
+                self.db.execute("SELECT dst, internal FROM prev_edges WHERE src = ?", (url,))]
+
+    def save_validators(self, url, etag=None, last_modified=None, body_hash=None, change=None):
+        self.db.execute(
+            "UPDATE urls SET etag = ?, last_modified = ?, body_hash = ?, change = ? WHERE url = ?",
+            (etag, last_modified, body_hash, change, url),
+        )
+        self._touch()
+
+    def changes(self):
+        """Diff contra o run anterior: páginas novas, removidas e alteradas"""
+        if not self.get_meta("has_previous_run"):
+            return None
+        self.checkpoint()
+        added = [u for (u,) in self.db.execute(
+            "SELECT url FROM urls WHERE state = 'done' AND change = 'added' ORDER BY url")]
+        changed = [u for (u,) in self.db.execute(
+            "SELECT url FROM urls WHERE state = 'done' AND change = 'changed' ORDER BY url")]
+        unchanged = self.db.execute(
+            "SELECT COUNT(*) FROM urls WHERE state = 'done' AND change = 'unchanged'").fetchone()[0]
+        # Removida = estava no mapa anterior e nem foi descoberta agora
+        removed = [u for (u,) in self.db.execute(
+            "SELECT url FROM prev_urls WHERE url NOT IN (SELECT url FROM urls) ORDER BY url")]
+        return {"added": added, "removed": removed, "changed": changed, "unchanged": unchanged}
+
+    def add_edges(self, src, dsts, internal):
+        self.db.executemany(
+            "INSERT OR IGNORE INTO edges (src, dst, internal) VALUES (?, ?, ?)",
+            [(src, dst, int(internal)) for dst in dsts],
+        )
+        self._touch()
+
+    def visited_count(self):
+        return self.db.execute("SELECT COUNT(*) FROM urls WHERE state = 'done'").fetchone()[0]
+
+    def iter_visited(self):
+        for (url,) in self.db.execute("SELECT url FROM urls WHERE state = 'done' ORDER BY id"):
+            yield url
+
+    def iter_links(self, internal):
+        for (url,) in self.db.execute(
+            "SELECT DISTINCT dst FROM edges WHERE internal = ? ORDER BY dst", (int(internal),)
+        ):
+            yield url
+
+    def results(self):
+        """Mesmo formato de dict que o crawl em memória devolve"""
+        self.checkpoint()
+        results = {
+            "scanned_pages": list(self.iter_visited()),
+            "internal_links": list(self.iter_links(True)),
+            "external_links": list(self.iter_links(False)),
+            "total_scanned": self.visited_count(),
+        }
+        changes = self.changes()
+        if changes is not None:
+            results["changes"] = changes
+        return results
+
+    def close(self):
+        self.checkpoint()
+        self.db.close()
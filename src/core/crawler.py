@@ -1,100 +1,382 @@
+import asyncio
 import time
-from urllib.parse import urlparse, urljoin
-from playwright.sync_api import sync_playwright
+from contextlib import AsyncExitStack
+from urllib.parse import urlparse
+from requests import RequestException
+from src.utils.urls import normalize_url, OrderedSet, CrawlFrontier
+from src.core.fetcher import HttpFetcher, looks_client_rendered, conditional_headers
+from src.core.crawl_store import CrawlStore, default_state_path
+from src.core.browser_pool import get_browser_pool
+from src.core.fingerprints import StackScanner
+from src.core.site_audit import SiteAggregator, analyze_page
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Altura do documento, posição do fundo da viewport e total de âncoras
+PAGE_PROBE_JS = "() => [document.documentElement.scrollHeight, window.scrollY + window.innerHeight, document.querySelectorAll('a').length]"
+
+# Assentamento depois de cada scroll: intervalo de checagem, janela sem
+# mudança exigida e teto por scroll (segundos)
+SETTLE_POLL = 0.1
+SETTLE_QUIET = 0.3
+SETTLE_MAX = 2.0
+# Conexões longas nunca "terminam": não contam como request em voo
+STREAMING_TYPES = ("websocket", "eventsource", "media")
+
 
 class WebCrawler:
-    def __init__(self, start_url, max_pages=30):
-        self.start_url = start_url
-        self.domain = urlparse(start_url).netloc
+    def __init__(self, start_url, max_pages=30, concurrency=4, per_host_limit=4,
+                 scroll_mode="adaptive", max_scrolls=10, scroll_timeout=5.0, mode="browser",
+                 max_depth=None, store=None, incremental=False, audit=False):
+        self.start_url = normalize_url(start_url) or start_url
+        self.domain = urlparse(self.start_url).netloc
         self.max_pages = max_pages
+        self.concurrency = max(1, concurrency)
+        self.per_host_limit = max(1, per_host_limit)
+        self.scroll_mode = scroll_mode
+        self.max_scrolls = max_scrolls
+        self.scroll_timeout = scroll_timeout
+        self.mode = mode  # "browser" (Playwright em tudo) ou "fast" (HTTP + fallback)
+        self.max_depth = max_depth
+        # Incremental precisa do store para comparar com o run anterior
+        self.incremental = incremental and store is not None
+        # Com store (SQLite) a fronteira e os visitados vivem em disco
+        self.store = store
         self.visited = set()
-        self.queue = [start_url]
+        self.failed = []
+        if store is not None:
+            self.queue = store
+            self.queue.push(self.start_url)
+        else:
+            self.queue = CrawlFrontier([self.start_url])
         self.links_map = {
-            "internal": [],
-            "external": []
+            "internal": OrderedSet(),
+            "external": OrderedSet()
         }
+        # Auditoria por página (stack, headers, tamanho/tempo) no mesmo passe do mapa
+        self.audit = SiteAggregator() if audit else None
+        self._dispatched = store.visited_count() if store is not None else 0
+        self._host_limits = {}
+        self._playwright = None
+        self._context = None
+        self._pages_created = 0
+        self._fetcher = None
 
     def is_internal(self, url):
         return self.domain in urlparse(url).netloc
 
-    def _scroll_page(self, page):
+    async def _scroll_page(self, page):
         """Rola a página para baixo para ativar Lazy Loading"""
         try:
-            for _ in range(5): # Rola 5 vezes
-                page.mouse.wheel(0, 15000)
-                time.sleep(0.5)
+            if self.scroll_mode == "fixed":
+                for _ in range(5): # Rola 5 vezes
+                    await page.mouse.wheel(0, 15000)
+                    await asyncio.sleep(0.5)
+                return
+            await self._scroll_adaptive(page)
         except:
             pass
 
+    async def _scroll_adaptive(self, page):
+        """Rola só enquanto a página crescer (altura ou nº de links)
+
+        Depois de cada scroll espera a página assentar (``_settle``): sem
+        requests em voo e com altura/âncoras estáveis por ``SETTLE_QUIET``.
+        Para assim que um scroll não muda nada, ou no teto de
+        ``max_scrolls``/``scroll_timeout``. Páginas estáticas que cabem na
+        tela não rolam nenhuma vez.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.scroll_timeout
+        height, bottom, anchors = await page.evaluate(PAGE_PROBE_JS)
+
+        # Requests em voo (lazy load dispara fetch/imagens depois do scroll)
+        inflight = set()
+        def started(request):
+            if request.resource_type not in STREAMING_TYPES: inflight.add(request)
+        def ended(request):
+            inflight.discard(request)
+        page.on("request", started)
+        page.on("requestfinished", ended)
+        page.on("requestfailed", ended)
+        try:
+            for _ in range(self.max_scrolls):
+                if bottom >= height:
+                    # Já estamos no fim e nada novo apareceu no último ciclo
+                    break
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+
+                await page.mouse.wheel(0, 15000)
+                new_height, bottom, new_anchors = await self._settle(page, inflight, min(remaining, SETTLE_MAX))
+                if new_height == height and new_anchors == anchors and bottom >= new_height:
+                    break
+                height, anchors = new_height, new_anchors
+        finally:
+            page.remove_listener("request", started)
+            page.remove_listener("requestfinished", ended)
+            page.remove_listener("requestfailed", ended)
+
+    async def _settle(self, page, inflight, limit):
+        """Espera rede parada e DOM estável por ``SETTLE_QUIET`` (no máximo ``limit`` s)"""
+        loop = asyncio.get_running_loop()
+        end = loop.time() + limit
+        probe = await page.evaluate(PAGE_PROBE_JS)
+        quiet_since = None
+        while loop.time() < end:
+            await asyncio.sleep(SETTLE_POLL)
+            current = await page.evaluate(PAGE_PROBE_JS)
+            if inflight or current[0] != probe[0] or current[2] != probe[2]:
+                quiet_since = None
+            elif quiet_since is None:
+                quiet_since = loop.time()
+            elif loop.time() - quiet_since >= SETTLE_QUIET:
+                return current
+            probe = current
+        return probe
+
+    def _register_links(self, current_url, hrefs, depth=0, source=None):
+        """Classifica os hrefs de uma página e alimenta a fila compartilhada.
+
+        ``current_url`` é a URL final (base dos relativos, depois de redirect);
+        ``source`` é a URL pedida, chave das arestas que o incremental relê.
+        """
+        internal, external = OrderedSet(), OrderedSet()
+        for href in hrefs:
+            if not href: continue
+
+            # Resolve relativos (/sobre -> https://site.com/sobre) e canoniza
+            full_url = normalize_url(href, base=current_url)
+            if not full_url: continue
+
+            if self.is_internal(full_url):
+                internal.add(full_url)
+            else:
+                external.add(full_url)
+
+        follow = self.max_depth is None or depth < self.max_depth
+        for url in internal:
+            if follow:
+                self.queue.push(url, depth + 1)
+            if self.store is None:
+                self.links_map["internal"].add(url)
+        if self.store is None:
+            for url in external:
+                self.links_map["external"].add(url)
+        else:
+            src = source or normalize_url(current_url) or current_url
+            self.store.add_edges(src, internal, True)
+            self.store.add_edges(src, external, False)
+
+    def _mark_visited(self, url, status=None):
+        if self.store is not None:
+            self.store.mark_visited(url, status)
+        else:
+            self.visited.add(url)
+
+    def _next_url(self):
+        """Tira a próxima ``(url, profundidade)`` respeitando o limite de páginas"""
+        if self._dispatched >= self.max_pages:
+            return None
+        item = self.queue.pop()
+        if item is not None:
+            self._dispatched += 1
+        return item
+
+    def _host_semaphore(self, url):
+        host = urlparse(url).netloc
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_limits[host]
+
+    async def _launch_browser(self):
+        """Pega um contexto do browser compartilhado só quando a primeira página precisar"""
+        async with self._browser_lock:
+            if self._context is None:
+                if self._playwright is None:
+                    # Driver do Playwright (Node) só sobe aqui: no modo rápido, páginas
+                    # servidas prontas nunca chegam a precisar dele
+                    from playwright.async_api import async_playwright
+                    self._playwright = await async_playwright().start()
+                    self._resources.push_async_callback(self._playwright.stop)
+                # MODO STEALTH: Contexto com User Agent de Chrome comum (compartilhado pelas abas)
+                self._context = await self._resources.enter_async_context(
+                    get_browser_pool().async_context(
+                        self._playwright,
+                        user_agent=USER_AGENT,
+                        viewport={'width': 1920, 'height': 1080}
+                    )
+                )
+
+    async def _acquire_page(self):
+        """Empresta uma aba do pool (no máximo uma por worker)"""
+        await self._launch_browser()
+        if self._pages.empty() and self._pages_created < self.concurrency:
+            self._pages_created += 1
+            return await self._context.new_page()
+        return await self._pages.get()
+
+    async def _render(self, current_url, depth):
+        from playwright.async_api import Error as PlaywrightError
+        # Falha ao subir/conectar o browser não é da página: propaga e derruba o crawl
+        page = await self._acquire_page()
+        try:
+            # Acessa com timeout generoso
+            start = time.perf_counter()
+            response = await page.goto(current_url, timeout=20000, wait_until="domcontentloaded")
+            elapsed_ms = int((time.perf_counter() - start) * 1000)
+
+            # Rola a página para pegar links do rodapé/lazy load
+            await self._scroll_page(page)
+
+            self._mark_visited(current_url, response.status if response else None)
+
+            # Extrai hrefs brutos via JS no browser
+            hrefs = await page.eval_on_selector_all("a", "elements => elements.map(e => e.getAttribute('href'))")
+            self._register_links(page.url or current_url, hrefs, depth, source=current_url)
+
+            if self.audit is not None and response is not None:
+                headers = await response.all_headers()
+                html = await page.content()
+                ttfb = response.request.timing.get("responseStart")
+                facts = await asyncio.to_thread(
+                    analyze_page, current_url, response.status, headers, html,
+                    elapsed_ms=elapsed_ms, ttfb_ms=int(ttfb) if ttfb and ttfb > 0 else None,
+                )
+                self.audit.add(facts)
+        except PlaywrightError as e:
+            # Timeout/erro de navegação (inclui PlaywrightTimeoutError): só esta página falha
+            self._page_failed(current_url, e)
+        finally:
+            self._pages.put_nowait(page)
+
+    def _reuse_previous(self, current_url, depth, previous, result):
+        """Incremental: página igual ao run anterior reaproveita os outlinks gravados"""
+        headers = {k.lower(): v for k, v in result["headers"].items()}
+        etag = headers.get("etag") or (previous or {}).get("etag")
+        last_modified = headers.get("last-modified") or (previous or {}).get("last_modified")
+
+        unchanged = previous is not None and (
+            result["status"] == 304
+            or (result["body_hash"] is not None and result["body_hash"] == previous["body_hash"])
+        )
+        if not unchanged:
+            change = "added" if previous is None else "changed"
+            self.store.save_validators(current_url, etag, last_modified, result["body_hash"], change)
+            return False
+
+        self._mark_visited(current_url, previous["status"])
+        self.store.save_validators(current_url, etag, last_modified, previous["body_hash"], "unchanged")
+        edges = self.store.previous_edges(current_url)
+        internal = [dst for dst, is_internal in edges if is_internal]
+        external = [dst for dst, is_internal in edges if not is_internal]
+        if self.max_depth is None or depth < self.max_depth:
+            for url in internal:
+                self.queue.push(url, depth + 1)
+        self.store.add_edges(current_url, internal, True)
+        self.store.add_edges(current_url, external, False)
+        return True
+
+    async def _visit(self, current_url, depth):
+        async with self._host_semaphore(current_url):
+            try:
+                if self._fetcher is not None:
+                    # Modo rápido / incremental: HTTP puro antes de pensar em browser
+                    previous = self.store.previous(current_url) if self.incremental else None
+                    # O scanner lê o HTML durante o download (nada fica em memória)
+                    scanner = StackScanner() if self.audit is not None else None
+                    result = await asyncio.to_thread(
+                        self._fetcher.fetch, current_url, conditional_headers(previous),
+                        scanner.feed if scanner else None,
+                    )
+                    if self.incremental and self._reuse_previous(current_url, depth, previous, result):
+                        if self.audit is not None: self.audit.skip()
+                        return
+                    if self.mode == "fast" and not looks_client_rendered(result):
+                        self._mark_visited(current_url, result["status"])
+                        self._register_links(result["final_url"], result["hrefs"], depth, source=current_url)
+                        if self.audit is not None:
+                            self.audit.add(analyze_page(
+                                current_url, result["status"], result["headers"], scanner=scanner,
+                                elapsed_ms=result.get("elapsed"), ttfb_ms=result.get("ttfb"), size=result["bytes"],
+                            ))
+                        return
+                await self._render(current_url, depth)
+            except RequestException as e:
+                self._page_failed(current_url, e)
+
+    def _page_failed(self, url, error):
+        """Registra a página que não carregou (o crawl segue com as outras)"""
+        self.failed.append({"url": url, "error": (str(error).strip().splitlines() or [type(error).__name__])[0][:200]})
+        if self.store is not None:
+            self.store.mark_failed(url)
+
+    async def _worker(self, worker_id, idle):
+        """Cada worker consome a fila compartilhada"""
+        while True:
+            item = self._next_url()
+            if item is None:
+                # Fila vazia: só encerra quando ninguém mais pode gerar links
+                idle.add(worker_id)
+                if len(idle) == self.concurrency or self._dispatched >= self.max_pages:
+                    return
+                await asyncio.sleep(0.05)
+                continue
+
+            idle.discard(worker_id)
+            await self._visit(*item)
+
+    async def crawl_async(self):
+        if self.mode == "fast" or self.incremental:
+            self._fetcher = HttpFetcher(USER_AGENT, pool_size=self.concurrency)
+
+        async with AsyncExitStack() as resources:
+            self._resources = resources
+            self._browser_lock = asyncio.Lock()
+            self._pages = asyncio.Queue()
+            try:
+                idle = set()
+                await asyncio.gather(*(self._worker(i, idle) for i in range(self.concurrency)))
+            finally:
+                if self._fetcher:
+                    self._fetcher.close()
+
+        if self.store is not None:
+            data = self.store.results()
+        else:
+            data = {
+                "scanned_pages": list(self.visited),
+                "internal_links": sorted(self.links_map["internal"]),
+                "external_links": sorted(self.links_map["external"]),
+                "total_scanned": len(self.visited)
+            }
+        data["failed_pages"] = self.failed
+        if self.audit is not None:
+            data["audit"] = self.audit.summary()
+        return data
+
     def crawl(self):
-        with sync_playwright() as p:
-            # MODO STEALTH: Finge ser um usuário real para não ser bloqueado
-            browser = p.chromium.launch(
-                headless=True, 
-                args=["--disable-blink-features=AutomationControlled"]
-            )
-            
-            # Contexto com User Agent de Chrome comum
-            context = browser.new_context(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                viewport={'width': 1920, 'height': 1080}
-            )
-            
-            page = context.new_page()
-            
-            while self.queue and len(self.visited) < self.max_pages:
-                current_url = self.queue.pop(0)
-                
-                # Normaliza URL
-                if current_url.endswith('/'): current_url = current_url[:-1]
-                
-                if current_url in self.visited:
-                    continue
-
-                try:
-                    # Acessa com timeout generoso
-                    page.goto(current_url, timeout=20000, wait_until="domcontentloaded")
-                    
-                    # Rola a página para pegar links do rodapé/lazy load
-                    self._scroll_page(page)
-                    
-                    self.visited.add(current_url)
-                    
-                    # Extrai hrefs brutos via JS no browser
-                    hrefs = page.eval_on_selector_all("a", "elements => elements.map(e => e.getAttribute('href'))")
-                    
-                    for href in hrefs:
-                        if not href: continue
-                        
-                        # Resolve links relativos (/sobre -> https://site.com/sobre)
-                        full_url = urljoin(current_url, href).split('#')[0]
-                        
-                        # Limpa URLs inválidas
-                        if not full_url.startswith('http'): continue
-                        if full_url.endswith('/'): full_url = full_url[:-1]
-
-                        if self.is_internal(full_url):
-                            if full_url not in self.visited and full_url not in self.queue:
-                                self.queue.append(full_url)
-                                if full_url not in self.links_map["internal"]:
-                                    self.links_map["internal"].append(full_url)
-                        else:
-                            if full_url not in self.links_map["external"]:
-                                self.links_map["external"].append(full_url)
-
-                except Exception as e:
-                    pass
-
-            browser.close()
-            
-        return {
-            "scanned_pages": list(self.visited),
-            "internal_links": sorted(list(set(self.links_map["internal"]))),
-            "external_links": sorted(list(set(self.links_map["external"]))),
-            "total_scanned": len(self.visited)
-        }
+        return asyncio.run(self.crawl_async())
 
 # --- AQUI ESTA A FUNCAO QUE ESTAVA FALTANDO ---
-def run_crawler(url):
-    spider = WebCrawler(url, max_pages=30)
-    return spider.crawl()
\ No newline at end of file
+def run_crawler(url, max_pages=30, max_depth=None, resume=False, persist=False,
+                state_path=None, incremental=False, concurrency=4, scroll_mode="adaptive",
+                mode="browser", audit=False):
+    """Mapeia o site. Com ``persist``/``resume`` o estado vai para SQLite e
+    um crawl interrompido continua de onde parou. ``incremental`` compara com
+    o último crawl salvo (ETag/Last-Modified/hash) e só renderiza o que mudou.
+    ``audit`` analisa cada página visitada e devolve o resumo em ``"audit"``."""
+    store = None
+    if persist or resume or incremental or state_path:
+        domain = urlparse(normalize_url(url) or url).netloc
+        store = CrawlStore(state_path or default_state_path(domain), resume=resume,
+                           incremental=incremental)
+    try:
+        spider = WebCrawler(url, max_pages=max_pages, max_depth=max_depth, store=store,
+                            incremental=incremental, concurrency=concurrency,
+                            scroll_mode=scroll_mode, mode=mode, audit=audit)
+        return spider.crawl()
+    finally:
+        if store is not None:
+            store.close()
@@ -0,0 +1,122 @@
+import codecs
+import hashlib
+import time
+from html.parser import HTMLParser
+import requests
+from requests.adapters import HTTPAdapter
+
+# Ids/atributos típicos do nó raiz de SPAs (React, Vue, Next, Nuxt, Angular, Svelte)
+SPA_ROOT_IDS = {"root", "app", "__next", "__nuxt", "___gatsby", "svelte"}
+SPA_ROOT_ATTRS = {"data-reactroot", "ng-version", "data-server-rendered"}
+
+MAX_BODY_BYTES = 5 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class LinkExtractor(HTMLParser):
+    """Parser incremental: coleta <a href> e sinais de renderização no cliente"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.hrefs = []
+        self.spa_root = False
+        self.scripts = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            for name, value in attrs:
+                if name == "href" and value:
+                    self.hrefs.append(value)
+        elif tag == "script":
+            self.scripts += 1
+        elif tag == "div" and not self.spa_root:
+            for name, value in attrs:
+                if (name == "id" and value in SPA_ROOT_IDS) or name in SPA_ROOT_ATTRS:
+                    self.spa_root = True
+
+
+class HttpFetcher:
+    """Cliente HTTP com pool de conexões para o modo de crawl rápido"""
+
+    def __init__(self, user_agent, pool_size=10, timeout=15):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": user_agent, "Accept": "text/html,*/*;q=0.8"})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch(self, url, headers=None, on_text=None):
+        """Baixa a página em streaming e extrai os links sem montar o HTML inteiro.
+
+        ``on_text(pedaço)`` recebe o HTML decodificado conforme chega (ex:
+        ``StackScanner.feed`` para analisar a página no mesmo download).
+        """
+        start = time.time()
+        result = {"url": url, "final_url": url, "status": 0, "headers": {},
+                  "html": False, "hrefs": [], "spa_root": False, "scripts": 0, "bytes": 0,
+                  "body_hash": None}
+
+        with self.session.get(url, headers=headers, timeout=self.timeout, stream=True) as r:
+            result["status"] = r.status_code
+            result["final_url"] = r.url
+            result["headers"] = dict(r.headers)
+            result["ttfb"] = int(r.elapsed.total_seconds() * 1000)
+
+            if r.status_code == 304 or "html" not in r.headers.get("content-type", "").lower():
+                result["elapsed"] = int((time.time() - start) * 1000)
+                return result
+            result["html"] = True
+
+            # Sem charset no header o requests chutaria latin-1; HTML moderno é utf-8
+            charset = r.encoding if "charset" in r.headers.get("content-type", "").lower() else "utf-8"
+            try:
+                decoder = codecs.getincrementaldecoder(charset)(errors="replace")
+            except LookupError:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+            parser = LinkExtractor()
+            digest = hashlib.sha256()
+            for chunk in r.iter_content(CHUNK_SIZE):
+                result["bytes"] += len(chunk)
+                digest.update(chunk)
+                text = decoder.decode(chunk)
+                parser.feed(text)
+                if on_text: on_text(text)
+                if result["bytes"] >= MAX_BODY_BYTES:
+                    break
+            text = decoder.decode(b"", final=True)
+            parser.feed(text)
+            if on_text: on_text(text)
+            parser.close()
+            result["body_hash"] = digest.hexdigest()
+
+        result["hrefs"] = parser.hrefs
+        result["spa_root"] = parser.spa_root
+        result["scripts"] = parser.scripts
+        result["elapsed"] = int((time.time() - start) * 1000)
+        return result
+
+    def close(self):
+        self.session.close()
+
+
+def conditional_headers(previous):
+    """If-None-Match / If-Modified-Since a partir dos validadores anteriores"""
+    headers = {}
+    if previous:
+        if previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+    return headers
+
+
+def looks_client_rendered(result, min_anchors=3):
+    """Heurística: a página precisa de JS para mostrar os links?"""
+    if not result.get("html"):
+        return False
+    anchors = len(result.get("hrefs", []))
+    if anchors == 0:
+        return True
+    return result.get("spa_root", False) and anchors < min_anchors
@@ -0,0 +1,270 @@
+import re
+from functools import lru_cache
+
+# Base de assinaturas (estilo Wappalyzer, só literais, sem regex por tecnologia).
+# Todas as comparações são case-insensitive.
+#   headers: {header: trecho do valor}  ("" = basta o header existir)
+#   cookies: prefixos de nome de cookie
+#   meta:    trechos do <meta name="generator">
+#   html:    trechos do HTML (inclui src de <script>/<link>)
+#   wp_plugins: slugs de wp-content/plugins/<slug>/
+#   implies: tecnologias que vêm junto
+FINGERPRINTS = {
+    # --- Frameworks JS ---
+    "React": {"html": ["data-reactroot", "data-reactid", "react-dom", "__reactcontainer", "react.production.min.js"]},
+    "Next.js": {"headers": {"x-powered-by": "next.js", "x-nextjs-cache": "", "x-nextjs-prerender": ""},
+                "html": ["/_next/", "__next_data__"], "implies": ["React"]},
+    "Gatsby": {"meta": ["gatsby"], "html": ["___gatsby", "/page-data/"], "implies": ["React"]},
+    "Remix": {"html": ["__remixcontext", "__remixmanifest"], "implies": ["React"]},
+    "Vue.js": {"html": ["data-v-", "vue.runtime", "vue.global", "vue.min.js", "__vue__"]},
+    "Nuxt": {"meta": ["nuxt"], "html": ["/_nuxt/", "__nuxt__", "window.__nuxt", "data-n-head"], "implies": ["Vue.js"]},
+    "Angular": {"html": ["ng-version=", "ng-app=", "angular.min.js"]},
+    "Svelte": {"html": ["svelte-", "__svelte"]},
+    "SvelteKit": {"html": ["/_app/immutable/", "data-sveltekit-", "__sveltekit"], "implies": ["Svelte"]},
+    "Astro": {"meta": ["astro"], "html": ["astro-island", "/_astro/"]},
+    "Vite": {"html": ["/@vite/client", "vite/modulepreload-polyfill", "/assets/index-"]},
+    "jQuery": {"html": ["jquery.min.js", "jquery.js", "/jquery-"]},
+    "Alpine.js": {"html": ["x-data=", "alpinejs"]},
+    "Tailwind CSS": {"html": ["tailwindcss", "cdn.tailwindcss.com"]},
+
+    # --- CMS / E-commerce ---
+    "WordPress": {"cookies": ["wordpress_", "wp-settings-"], "meta": ["wordpress"],
+                  "html": ["wp-content", "wp-includes", "wp-json"], "implies": ["PHP"]},
+    "WooCommerce": {"meta": ["woocommerce"], "wp_plugins": ["woocommerce"], "html": ["woocommerce", "wc-block"],
+                    "implies": ["WordPress"]},
+    "Elementor": {"meta": ["elementor"], "wp_plugins": ["elementor", "elementor-pro"], "html": ["elementor-"],
+                  "implies": ["WordPress"]},
+    "Yoast SEO": {"wp_plugins": ["wordpress-seo"], "html": ["yoast-schema-graph"], "implies": ["WordPress"]},
+    "WP Rocket": {"wp_plugins": ["wp-rocket"], "html": ["wp-rocket"], "implies": ["WordPress"]},
+    "Drupal": {"headers": {"x-drupal-cache": "", "x-generator": "drupal"}, "meta": ["drupal"],
+               "html": ["/sites/default/files/", "drupal-settings-json"], "implies": ["PHP"]},
+    "Joomla": {"meta": ["joomla"], "html": ["/media/jui/", "/components/com_"], "implies": ["PHP"]},
+    "Wix": {"headers": {"x-wix-request-id": ""}, "meta": ["wix.com"], "html": ["static.wixstatic.com"]},
+    "Shopify": {"headers": {"x-shopid": "", "x-shopify-stage": "", "powered-by": "shopify"},
+                "cookies": ["_shopify_", "cart_sig"], "meta": ["shopify"],
+                "html": ["cdn.shopify.com", "shopify.theme", "myshopify.com"]},
+    "VTEX": {"headers": {"x-vtex-cache-status-janus-apigw": "", "x-vtex-io-cluster-id": ""},
+             "cookies": ["vtex_session", "vtex_segment", "vtexrcmacidv7"],
+             "html": ["vteximg.com.br", "vtexassets.com", "vtex.com.br", "vtex-render"]},
+    "Magento": {"cookies": ["mage-cache-", "mage-messages"], "html": ["mage/cookies", "/static/version"],
+                "implies": ["PHP"]},
+
+    # --- Backend ---
+    "PHP": {"headers": {"x-powered-by": "php"}, "cookies": ["phpsessid"]},
+    "Laravel": {"headers": {"x-powered-by": "laravel"}, "cookies": ["laravel_session", "laravel_token"],
+                "implies": ["PHP"]},
+    "Express": {"headers": {"x-powered-by": "express"}, "implies": ["Node.js"]},
+    "Node.js": {"headers": {"x-powered-by": "node"}},
+    "ASP.NET": {"headers": {"x-aspnet-version": "", "x-powered-by": "asp.net"}, "cookies": ["asp.net_sessionid"],
+                "html": ["__viewstate"]},
+    "Django": {"cookies": ["csrftoken", "django_language"], "html": ["csrfmiddlewaretoken"], "implies": ["Python"]},
+    "Ruby on Rails": {"headers": {"x-runtime": ""}, "cookies": ["_rails_"], "html": ["csrf-param"]},
+    "Python": {"headers": {"server": "gunicorn", "x-powered-by": "python"}},
+
+    # --- Servidores / Infra ---
+    "Nginx": {"headers": {"server": "nginx"}},
+    "Apache": {"headers": {"server": "apache"}},
+    "LiteSpeed": {"headers": {"server": "litespeed", "x-litespeed-cache": ""}},
+    "IIS": {"headers": {"server": "microsoft-iis"}, "implies": ["ASP.NET"]},
+    "Cloudflare": {"headers": {"server": "cloudflare", "cf-ray": "", "cf-cache-status": ""},
+                   "cookies": ["__cf_bm", "__cflb", "cf_clearance"], "html": ["cdnjs.cloudflare.com/ajax/libs"]},
+    "Vercel": {"headers": {"server": "vercel", "x-vercel-id": "", "x-vercel-cache": ""}},
+    "Netlify": {"headers": {"server": "netlify", "x-nf-request-id": ""}},
+    "Amazon CloudFront": {"headers": {"x-amz-cf-id": "", "via": "cloudfront"}},
+    "Fastly": {"headers": {"x-served-by": "cache-", "x-fastly-request-id": ""}},
+    "Varnish": {"headers": {"x-varnish": "", "via": "varnish"}},
+
+    # --- Analytics / Terceiros ---
+    "Google Tag Manager": {"html": ["googletagmanager.com/gtm.js", "googletagmanager.com/ns.html"]},
+    "Google Analytics": {"html": ["google-analytics.com/analytics.js", "googletagmanager.com/gtag/js"]},
+    "Meta Pixel": {"html": ["connect.facebook.net", "fbevents.js"]},
+    "Hotjar": {"html": ["static.hotjar.com"]},
+
+    # --- Heurística de código gerado por IA (V0.dev / Shadcn genérico) ---
+    "AI Generated Code (V0/Shadcn)": {"html": ["v0_block", "rounded-lg border bg-card text-card-foreground"]},
+}
+
+AI_CODE_TECH = "AI Generated Code (V0/Shadcn)"
+
+# Tema/plugins do WordPress saem do mesmo passe pelo HTML
+_WP_PATTERN = r"(?P<wp>wp-content/(?P<wp_kind>themes|plugins)/(?P<wp_slug>[\w.-]+)/)"
+_META_PATTERN = r"(?P<gen><meta[^>]{0,200}?name=[\"']generator[\"'][^>]{0,200}?content=[\"'](?P<gen_value>[^\"']{1,200}))"
+
+
+def _trie_pattern(literals):
+    """Alternância fatorada por prefixo comum (trie -> regex).
+
+    Com ``a|b|c...`` plano o ``re`` testa cada literal em cada posição do
+    HTML; fatorado, cada posição só segue o ramo do caractere atual, então
+    o custo quase não cresce com o tamanho da base.
+    """
+    trie = {}
+    for literal in literals:
+        node = trie
+        for ch in literal:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node):
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        if "" in node:
+            # Quantificador guloso: prefere o literal mais longo
+            return "(?:" + "|".join(alts) + ")?"
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    return build(trie)
+
+
+class _Index:
+    """Assinaturas compiladas: um regex combinado + tabelas de lookup"""
+
+    def __init__(self, db):
+        self.implies = {name: tuple(fp.get("implies", ())) for name, fp in db.items()}
+        self.headers = {}
+        self.meta = []
+        self.wp_plugins = {}
+        body, cookies = {}, {}
+        for name, fp in db.items():
+            for header, value in fp.get("headers", {}).items():
+                self.headers.setdefault(header.lower(), []).append((value.lower(), name))
+            for cookie in fp.get("cookies", ()):
+                cookies.setdefault(cookie.lower(), set()).add(name)
+            for value in fp.get("meta", ()):
+                self.meta.append((value.lower(), name))
+            for slug in fp.get("wp_plugins", ()):
+                self.wp_plugins.setdefault(slug.lower(), set()).add(name)
+            for literal in fp.get("html", ()):
+                body.setdefault(literal.lower(), set()).add(name)
+
+        self.body = self._close_substrings(body)
+        self.cookies = self._close_substrings(cookies)
+        # O scan roda sobre o texto já em minúsculas: IGNORECASE deixa o re
+        # umas 5x mais lento que um .lower() feito uma vez só
+        self.body_re = re.compile(f"{_WP_PATTERN}|{_META_PATTERN}|(?P<lit>{_trie_pattern(self.body)})")
+        self.cookie_re = re.compile(_trie_pattern(self.cookies)) if self.cookies else None
+
+    @staticmethod
+    def _close_substrings(table):
+        """Cada literal também responde pelas tecnologias dos literais contidos nele.
+
+        O scan não sobrepõe casamentos: se "react-dom" casou, "react" naquele
+        trecho não casa de novo, então "react-dom" herda as techs de "react".
+        Custo quadrático só na compilação (uma vez por processo).
+        """
+        closed = {}
+        for literal, techs in table.items():
+            merged = set(techs)
+            for other, other_techs in table.items():
+                if other != literal and other in literal:
+                    merged |= other_techs
+            closed[literal] = frozenset(merged)
+        return closed
+
+
+@lru_cache(maxsize=1)
+def get_index():
+    return _Index(FINGERPRINTS)
+
+
+def _resolve_implies(found, implies):
+    pending = list(found)
+    while pending:
+        for implied in implies.get(pending.pop(), ()):
+            if implied not in found:
+                found.add(implied)
+                pending.append(implied)
+    return found
+
+
+# Sobreposição entre pedaços no modo streaming: cobre o maior casamento
+# possível (meta generator ~650 chars) cortado na fronteira
+_OVERLAP = 1024
+
+
+class StackScanner:
+    """Detecção incremental: ``feed`` recebe o HTML em pedaços (ex: direto do
+    download em streaming) e ``result`` devolve ``(techs, details)``.
+
+    Entre um pedaço e outro fica só a cauda de ``_OVERLAP`` caracteres, então
+    a memória não depende do tamanho da página.
+    """
+
+    def __init__(self, headers=None):
+        self.index = get_index()
+        self.headers = headers or {}
+        self.found = set()
+        self.theme = None
+        self.plugins = {}
+        self._tail = ""
+
+    def _scan(self, text):
+        index = self.index
+        for match in index.body_re.finditer(text):
+            kind = match.lastgroup
+            if kind == "lit":
+                self.found |= index.body[match.group(0)]
+            elif kind == "wp":
+                self.found.add("WordPress")
+                slug = match.group("wp_slug")
+                if match.group("wp_kind") == "themes":
+                    self.theme = self.theme or slug
+                else:
+                    self.plugins.setdefault(slug, None)
+                    self.found |= index.wp_plugins.get(slug, set())
+            elif kind == "gen":
+                generator = match.group("gen_value")
+                for pattern, tech in index.meta:
+                    if pattern in generator:
+                        self.found.add(tech)
+
+    def feed(self, text):
+        if not text:
+            return
+        # Casamentos repetidos dentro da cauda não mudam nada (tudo é conjunto)
+        chunk = self._tail + text.lower()
+        self._scan(chunk)
+        self._tail = chunk[-_OVERLAP:]
+
+    def _scan_headers(self):
+        index = self.index
+        # Headers: só olha as regras dos headers que vieram na resposta
+        for key, value in self.headers.items():
+            rules = index.headers.get(key.lower())
+            if not rules: continue
+            value = str(value).lower()
+            for pattern, tech in rules:
+                if pattern in value:
+                    self.found.add(tech)
+
+        cookie_header = next((str(v) for k, v in self.headers.items() if k.lower() == "set-cookie"), "")
+        if cookie_header and index.cookie_re:
+            for match in index.cookie_re.finditer(cookie_header.lower()):
+                self.found |= index.cookies[match.group(0)]
+
+    def result(self, headers=None):
+        """``headers`` substitui os do construtor (no streaming eles chegam depois)"""
+        if headers is not None:
+            self.headers = headers
+        self._scan_headers()
+        found = _resolve_implies(set(self.found), self.index.implies)
+        details = {
+            "plugins": list(self.plugins)[:10],  # Top 10 plugins
+            "theme": self.theme or "Unknown",
+            "ai_code": AI_CODE_TECH in found,
+        }
+        return found, details
+
+
+def fingerprint(html, headers):
+    """Detecta tecnologias numa passada só pelo HTML.
+
+    Retorna ``(techs, details)`` com ``details`` = tema/plugins do WordPress
+    e flag de código gerado por IA. O custo por página é um ``.lower()`` e
+    um ``finditer`` no HTML + lookups em dicionário.
+    """
+    scanner = StackScanner(headers)
+    # HTML inteiro de uma vez: sem cauda para reprocessar
+    scanner._scan((html or "").lower())
+    return scanner.result()
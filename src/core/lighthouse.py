@@ -0,0 +1,127 @@
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+
+# Flags do Chrome quando o Lighthouse sobe o próprio browser (um por execução)
+CHROME_FLAGS = "--headless --no-sandbox --disable-gpu --ignore-certificate-errors"
+DEFAULT_TIMEOUT = 180
+
+
+def lighthouse_command(url, port=None, warm=False):
+    """argv do Lighthouse com o JSON saindo no stdout (sem arquivo temporário).
+
+    ``warm`` mantém cache/storage do browser entre runs (só faz sentido no
+    Chromium compartilhado, via ``port``).
+    """
+    # shutil.which resolve o lighthouse.cmd do npm no Windows sem precisar de shell
+    cmd = [
+        shutil.which("lighthouse") or "lighthouse",
+        url,
+        "--output=json",
+        "--output-path=stdout",
+        "--quiet",
+    ]
+    if warm:
+        cmd.append("--disable-storage-reset")
+    if port:
+        cmd.append(f"--port={port}")
+    else:
+        # Chrome novo a cada run: usa o IP já resolvido pelo processo em vez de ir ao DNS de novo
+        flags = CHROME_FLAGS
+        rules = host_rules(url)
+        if rules:
+            flags += f' --host-resolver-rules="{rules}"'
+        cmd.append(f"--chrome-flags={flags}")
+    return cmd
+
+
+def host_rules(url):
+    """``MAP host ip`` do alvo, vindo do cache de rede do processo"""
+    from urllib.parse import urlparse
+    from src.utils.net_cache import get_net_cache
+    host = urlparse(url).hostname
+    return get_net_cache().host_resolver_rules([host]) if host else ""
+
+
+def _parse_report(stdout):
+    try:
+        return json.loads(stdout)
+    except (ValueError, TypeError):
+        return {"error": "Lighthouse Failed"}
+
+
+def run_lighthouse(url, use_pool=True, timeout=DEFAULT_TIMEOUT):
+    """Uma auditoria. Com ``use_pool`` conecta no Chromium compartilhado."""
+    try:
+        port = None
+        if use_pool:
+            # Conecta no Chromium compartilhado em vez de subir outro
+            from src.core.browser_pool import get_browser_pool
+            get_browser_pool().ensure()
+            port = get_browser_pool().port
+        proc = subprocess.run(
+            lighthouse_command(url, port),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=timeout,
+            check=True,
+        )
+        return _parse_report(proc.stdout)
+    except subprocess.TimeoutExpired:
+        return {"error": f"Lighthouse Timeout ({timeout}s)"}
+    except:
+        return {"error": "Lighthouse Failed"}
+
+
+async def run_lighthouse_async(url, timeout=DEFAULT_TIMEOUT, port=None, warm=False):
+    """Versão asyncio: cada run tem processo e Chrome próprios; cancelar mata o processo"""
+    # Montar o comando pode consultar o DNS (host-resolver-rules): fora do loop
+    cmd = await asyncio.to_thread(lighthouse_command, url, port, warm)
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+    except OSError:
+        return {"error": "Lighthouse Failed"}
+
+    try:
+        stdout, _ = await asyncio.wait_for(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return {"error": f"Lighthouse Timeout ({timeout}s)"}
+    except asyncio.CancelledError:
+        proc.kill()
+        await proc.wait()
+        raise
+
+    if proc.returncode != 0:
+        return {"error": "Lighthouse Failed"}
+    return _parse_report(stdout)
+
+
+def default_concurrency():
+    # Cada Lighthouse usa ~1 núcleo para o Chrome e outro para o Node
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+async def run_lighthouse_many_async(urls, concurrency=None, timeout=DEFAULT_TIMEOUT, on_result=None):
+    """Distribui as auditorias com no máximo ``concurrency`` Lighthouses vivos"""
+    semaphore = asyncio.Semaphore(concurrency or default_concurrency())
+
+    async def worker(url):
+        async with semaphore:
+            data = await run_lighthouse_async(url, timeout)
+        if on_result: on_result(url, data)
+        return data
+
+    return await asyncio.gather(*(worker(u) for u in urls))
+
+
+def run_lighthouse_many(urls, concurrency=None, timeout=DEFAULT_TIMEOUT, on_result=None):
+    """Auditoria em lote; devolve os relatórios na mesma ordem de ``urls``"""
+    return asyncio.run(run_lighthouse_many_async(urls, concurrency, timeout, on_result))
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from src.core.lighthouse import run_lighthouse_async, DEFAULT_TIMEOUT
+from src.utils.stats import describe
+
+# Métricas numéricas tiradas de cada run do Lighthouse (audit -> chave)
+LH_METRICS = {
+    "largest-contentful-paint": "lcp_ms",
+    "cumulative-layout-shift": "cls",
+    "first-contentful-paint": "fcp_ms",
+    "total-blocking-time": "tbt_ms",
+    "server-response-time": "server_ttfb_ms",
+}
+
+
+def lighthouse_values(report):
+    """numericValue de cada métrica + score (0-100); None se o run falhou"""
+    if not report or "error" in report:
+        return None
+    audits = report.get("audits", {})
+    values = {key: audits.get(audit, {}).get("numericValue") for audit, key in LH_METRICS.items()}
+    score = report.get("categories", {}).get("performance", {}).get("score")
+    values["score"] = score * 100 if score is not None else None
+    return values
+
+
+def sample_ttfb(url, samples, warm=False, timeout=15):
+    """TTFB via HTTP puro: ``warm`` reaproveita a conexão (só servidor), frio
+    abre DNS+TCP+TLS a cada amostra (o que o usuário novo sente)"""
+    import requests
+
+    def timed(session, headers=None):
+        start = time.perf_counter()
+        try:
+            with session.get(url, timeout=timeout, stream=True, headers=headers):
+                return (time.perf_counter() - start) * 1000
+        except:
+            return None
+
+    if not warm:
+        values = []
+        for _ in range(samples):
+            with requests.Session() as session:
+                values.append(timed(session, {"Connection": "close"}))
+        return values
+
+    with requests.Session() as session:
+        timed(session)  # só abre a conexão
+        return [timed(session) for _ in range(samples)]
+
+
+def build_distributions(values, ttfb):
+    """Distribuições de cada métrica a partir dos valores por run (None = run falhou)"""
+    ok = [v for v in values if v is not None]
+    dist = {key: describe([v[key] for v in ok], 3 if key == "cls" else 1)
+            for key in list(LH_METRICS.values()) + ["score"]}
+    dist["ttfb_ms"] = describe(ttfb)
+    dist["failed"] = len(values) - len(ok)
+    return dist
+
+
+async def measure_async(url, runs=5, warmup=1, cache="cold", concurrency=1,
+                        timeout=DEFAULT_TIMEOUT, on_sample=None):
+    """Roda o Lighthouse ``runs`` vezes (depois de ``warmup`` runs descartados)
+    e amostra o TTFB, devolvendo as distribuições por modo de cache.
+
+    - ``cache="cold"``: cada run num Chrome novo (perfil vazio), até
+      ``concurrency`` ao mesmo tempo;
+    - ``cache="warm"``: runs em sequência num Chromium só deles, sem
+      limpar o cache (``--disable-storage-reset``);
+    - ``cache="both"``: os dois.
+
+    Concorrência > 1 divide CPU entre os Chromes e infla as métricas: use
+    só para acelerar comparações relativas.
+    """
+    modes = ["cold", "warm"] if cache == "both" else [cache]
+    result = {"url": url, "runs": runs, "warmup": warmup, "concurrency": concurrency, "modes": {}}
+    representative = None
+
+    for mode in modes:
+        port = None
+        warm = mode == "warm"
+        browser = None
+        if warm:
+            # Chromium próprio (não o do pool): o estágio backend roda junto no compartilhado
+            from src.core.browser_pool import BrowserPool
+            browser = BrowserPool(max_contexts=1)
+            await asyncio.to_thread(browser.ensure)
+            port = browser.port
+        # Um Chromium só aguenta um Lighthouse por vez
+        semaphore = asyncio.Semaphore(1 if warm else max(1, concurrency))
+
+        async def one(i):
+            async with semaphore:
+                report = await run_lighthouse_async(url, timeout, port, warm)
+            values = lighthouse_values(report)
+            if on_sample: on_sample(mode, i, values)
+            return report, values
+
+        try:
+            # Warm-up: esquenta DNS/CDN/cache do servidor (e do browser, no modo warm)
+            for _ in range(warmup):
+                await run_lighthouse_async(url, timeout, port, warm)
+            samples = await asyncio.gather(*(one(i) for i in range(runs)))
+        finally:
+            if browser: await asyncio.to_thread(browser.close)
+        values = [v for _, v in samples]
+        ttfb = await asyncio.to_thread(sample_ttfb, url, runs, warm)
+        dist = build_distributions(values, ttfb)
+        result["modes"][mode] = dist
+
+        # Relatório completo guardado: o run com score mais perto da mediana
+        median_score = dist["score"].get("median")
+        ok = [(r, v) for r, v in samples if v is not None and v["score"] is not None]
+        if ok and representative is None:
+            representative = min(ok, key=lambda rv: abs(rv[1]["score"] - median_score))[0]
+
+    result["report"] = representative or {"error": "Lighthouse Failed"}
+    return result
+
+
+def measure(url, runs=5, warmup=1, cache="cold", concurrency=1, timeout=DEFAULT_TIMEOUT, on_sample=None):
+    return asyncio.run(measure_async(url, runs, warmup, cache, concurrency, timeout, on_sample))
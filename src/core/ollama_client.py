@@ -0,0 +1,216 @@
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+
+# Status que valem nova tentativa (Ollama ocupado / reiniciando)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def default_max_in_flight():
+    """Casa com o OLLAMA_NUM_PARALLEL do servidor (1 se não estiver definido)"""
+    try:
+        return max(1, int(os.environ.get("OLLAMA_NUM_PARALLEL", "1")))
+    except ValueError:
+        return 1
+
+
+class _PrioritySlots:
+    """Semáforo com fila de prioridade (menor número = atende primeiro)"""
+
+    def __init__(self, size):
+        self.size = size
+        self.in_use = 0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def acquire(self, priority=10):
+        with self._lock:
+            if self.in_use < self.size and not self._waiters:
+                self.in_use += 1
+                return
+            event = threading.Event()
+            heapq.heappush(self._waiters, (priority, next(self._seq), event))
+        # Quem libera a vaga passa ela direto para o próximo da fila
+        event.wait()
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                _, _, event = heapq.heappop(self._waiters)
+                event.set()
+            else:
+                self.in_use -= 1
+
+
+class OllamaClient:
+    """Cliente do Ollama com sessão HTTP persistente e vazão controlada.
+
+    - ``max_in_flight`` requests simultâneos (padrão: OLLAMA_NUM_PARALLEL),
+      o resto espera numa fila por ``priority``;
+    - ``keep_alive`` controla quanto tempo o modelo fica carregado na RAM/VRAM;
+    - falhas de conexão e status 429/5xx são repetidas com backoff
+      exponencial + jitter, desde que nenhum token tenha sido entregue ainda.
+    """
+
+    def __init__(self, api_url="http://localhost:11434/api/generate", model="llama3.2",
+                 max_in_flight=None, keep_alive="10m", retries=3, backoff=0.5,
+                 timeout=(5, 240)):
+        self.api_url = api_url
+        self.model = model
+        self.max_in_flight = max_in_flight or default_max_in_flight()
+        self.keep_alive = keep_alive
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_in_flight)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._slots = _PrioritySlots(self.max_in_flight)
+
+    def _payload(self, prompt, options, stream, system=None, keep_alive=None):
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": options or {},
+            "keep_alive": self.keep_alive if keep_alive is None else keep_alive,
+        }
+        if system:
+            payload["system"] = system
+        return payload
+
+    def _sleep_backoff(self, attempt):
+        # "Full jitter": espalha as novas tentativas de vários workers
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def _request(self, prompt, options=None, stream=False, on_token=None, cancel=None, system=None):
+        """Chamada crua, sem fila. Retorna ``(texto, stats)``; erro vira texto "Erro ..." e ``stats["error"]``"""
+        stats = {"ttft_s": None, "tokens": 0, "tokens_per_s": None, "cancelled": False, "attempts": 0,
+                 "done": False, "done_reason": None, "error": None}
+        payload = self._payload(prompt, options, stream, system)
+        start = time.perf_counter()
+
+        def fail(message):
+            # Flag explícita: o texto da IA pode conter "Erro" sem ser falha
+            stats["error"] = message
+            return message, stats
+
+        for attempt in range(self.retries + 1):
+            if cancel is not None and cancel.is_set():
+                # Cancelado ainda na fila (ou entre tentativas): nem chega a ocupar o modelo
+                stats["cancelled"] = True
+                return "", stats
+            stats["attempts"] = attempt + 1
+            parts = []
+            try:
+                with self.session.post(self.api_url, json=payload, stream=stream, timeout=self.timeout) as r:
+                    if r.status_code in RETRY_STATUS and attempt < self.retries:
+                        self._sleep_backoff(attempt)
+                        continue
+                    if r.status_code != 200:
+                        return fail(f"Erro status {r.status_code}")
+
+                    if not stream:
+                        body = r.json()
+                        if body.get("error"):
+                            return fail(f"Erro IA: {body['error']}")
+                        self._fill_stats(stats, body, start)
+                        return body.get("response", ""), stats
+
+                    for line in r.iter_lines():
+                        if cancel is not None and cancel.is_set():
+                            # Fechar a conexão faz o Ollama abortar a geração
+                            stats["cancelled"] = True
+                            break
+                        if not line: continue
+                        chunk = json.loads(line)
+                        if chunk.get("error"):
+                            # Erro no meio do stream (modelo caiu, contexto estourou...)
+                            stats["total_s"] = round(time.perf_counter() - start, 2)
+                            return fail(f"Erro IA: {chunk['error']}")
+                        token = chunk.get("response", "")
+                        if token:
+                            if stats["ttft_s"] is None:
+                                stats["ttft_s"] = round(time.perf_counter() - start, 2)
+                            parts.append(token)
+                            if on_token: on_token(token)
+                        if chunk.get("done"):
+                            self._fill_stats(stats, chunk, start)
+                            break
+                    stats["total_s"] = round(time.perf_counter() - start, 2)
+                    return "".join(parts), stats
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # Depois do primeiro token não dá para repetir sem duplicar texto
+                if parts or attempt >= self.retries:
+                    return fail(f"Erro conexão IA: {str(e)}")
+                self._sleep_backoff(attempt)
+            except Exception as e:
+                return fail(f"Erro conexão IA: {str(e)}")
+        return fail("Erro conexão IA: tentativas esgotadas")
+
+    def _fill_stats(self, stats, body, start):
+        # done=False (ou done_reason "length") = resposta cortada
+        stats["done"] = bool(body.get("done"))
+        stats["done_reason"] = body.get("done_reason")
+        stats["tokens"] = body.get("eval_count", 0)
+        stats["prompt_tokens"] = body.get("prompt_eval_count")
+        eval_ns = body.get("eval_duration") or 0
+        if eval_ns:
+            stats["tokens_per_s"] = round(stats["tokens"] / (eval_ns / 1e9), 1)
+        stats["total_s"] = round(time.perf_counter() - start, 2)
+
+    def generate(self, prompt, options=None, stream=False, on_token=None, cancel=None,
+                 system=None, priority=10):
+        """Gera respeitando o limite de requests em voo e a prioridade"""
+        self._slots.acquire(priority)
+        try:
+            return self._request(prompt, options, stream, on_token, cancel, system)
+        finally:
+            self._slots.release()
+
+    def unload(self):
+        """Descarrega o modelo agora (keep_alive=0) para liberar memória"""
+        try:
+            self.session.post(self.api_url, json={"model": self.model, "keep_alive": 0}, timeout=self.timeout)
+        except Exception:
+            pass
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncOllamaClient:
+    """Variante asyncio sobre um ``OllamaClient``: mesma sessão, fila de
+    prioridade, retry e keep_alive.
+
+    O request roda numa thread pelo ``generate`` do cliente sync, então o
+    limite de OLLAMA_NUM_PARALLEL vale para os dois caminhos somados.
+    ``on_token`` é chamado dessa thread.
+    """
+
+    def __init__(self, client=None, **kwargs):
+        self.client = client or OllamaClient(**kwargs)
+
+    async def generate(self, prompt, options=None, stream=False, on_token=None, cancel=None,
+                       system=None, priority=10):
+        cancel = cancel or threading.Event()
+        try:
+            return await asyncio.to_thread(
+                self.client.generate, prompt, options, stream, on_token, cancel, system, priority
+            )
+        except asyncio.CancelledError:
+            # A thread não é interrompida: o evento fecha o stream e libera a vaga
+            cancel.set()
+            raise
+
+    async def unload(self):
+        await asyncio.to_thread(self.client.unload)
@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+
+class Stage:
+    """Nó do grafo: ``func`` recebe os resultados das dependências na ordem de ``deps``"""
+
+    def __init__(self, name, func, deps=()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+
+
+async def run_dag(stages, on_event=None):
+    """Executa os estágios assim que as dependências ficam prontas.
+
+    Estágios independentes rodam juntos (cada um numa thread via
+    ``asyncio.to_thread``), então a latência total tende ao caminho mais
+    lento do grafo em vez da soma de todos. ``on_event(name, event, result,
+    elapsed_ms)`` é chamado no loop com ``"start"`` e ``"done"`` para a UI
+    acompanhar. Retorna ``(resultados, tempos_ms)``.
+    """
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        missing = [d for d in s.deps if d not in by_name]
+        if missing:
+            raise ValueError(f"Estágio {s.name} depende de {missing}, que não existe")
+
+    # Ciclo deixaria as tasks esperando umas às outras para sempre
+    pending = {s.name: set(s.deps) for s in stages}
+    while pending:
+        ready = [n for n, deps in pending.items() if not deps]
+        if not ready:
+            raise ValueError(f"Ciclo entre os estágios {sorted(pending)}")
+        for n in ready:
+            del pending[n]
+        for deps in pending.values():
+            deps.difference_update(ready)
+
+    tasks = {}
+    results = {}
+    timings = {}
+
+    async def run(stage):
+        inputs = [await tasks[d] for d in stage.deps]
+        if on_event: on_event(stage.name, "start", None, None)
+        start = time.perf_counter()
+        result = await asyncio.to_thread(stage.func, *inputs)
+        timings[stage.name] = int((time.perf_counter() - start) * 1000)
+        results[stage.name] = result
+        if on_event: on_event(stage.name, "done", result, timings[stage.name])
+        return result
+
+    # Cria todas as tasks antes de qualquer uma rodar para que `tasks[d]` exista
+    for s in stages:
+        tasks[s.name] = asyncio.ensure_future(run(s))
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for t in tasks.values():
+            t.cancel()
+        raise
+    return results, timings
+
+
+def build_scan_stages(url, recon=True, report=True, lighthouse_pool=False, report_options=None, har_path=None,
+                      measure_options=None, recon_ports=None,
+                      subdomain_options=None):
+    """Grafo do scan: sondas independentes em paralelo, parse/relatório quando os insumos chegam.
+
+    O Lighthouse sobe o próprio Chrome (padrão) e roda junto com o
+    ``backend``, que usa o Chromium compartilhado. ``lighthouse_pool=True``
+    conecta no compartilhado; aí ele espera o ``backend`` terminar, senão a
+    gravação do HAR dividiria o mesmo browser com a medição.
+    ``report_options`` vai como kwargs para ``analyze_performance`` (streaming,
+    ``use_ai=False`` para o relatório só de template etc.). ``har_path`` salva o
+    HAR da página auditada. ``measure_options`` (runs, warmup, cache,
+    concurrency) troca o Lighthouse único por N amostras com estatística.
+    ``recon_ports`` é a lista/faixa de portas do recon (ver ``parse_ports``) e
+    ``subdomain_options`` (wordlist, concurrency, rate) liga a enumeração de
+    subdomínios, que usa os SANs do certificado lido no estágio ``ssl``.
+    """
+    from src.core.lighthouse import run_lighthouse
+    from src.core.scanner import run_backend_check, get_ssl_info, parse_data
+
+    if measure_options:
+        from src.core.measure import measure
+        frontend = Stage("measure", lambda: measure(url, **measure_options))
+    else:
+        after = ("backend",) if lighthouse_pool else ()
+        frontend = Stage("lighthouse", lambda *_: run_lighthouse(url, use_pool=lighthouse_pool), deps=after)
+    stages = [
+        frontend,
+        Stage("backend", lambda: run_backend_check(url, check_ssl=False, har_path=har_path)),
+        Stage("ssl", lambda: get_ssl_info(url)),
+    ]
+    probes = [frontend.name, "backend", "ssl"]
+    if recon:
+        from src.core.recon import run_recon
+        stages.append(Stage("recon", lambda ssl_info: run_recon(url, ports=recon_ports, subdomains=subdomain_options,
+                                                                cert_names=ssl_info["sans"]), deps=("ssl",)))
+        probes.append("recon")
+
+    def parse(lh, be, ssl_info, recon_data=None):
+        be = {**be, "ssl_days": ssl_info["days"]}
+        if measure_options:
+            return parse_data(None, be, recon_data, measurements=lh)
+        return parse_data(lh, be, recon_data)
+
+    stages.append(Stage("parse", parse, deps=probes))
+    if report:
+        from src.core.ai import analyze_performance
+        report_options = report_options or {}
+        stages.append(Stage("report", lambda parsed: analyze_performance(parsed, **report_options), deps=("parse",)))
+    return stages
@@ -0,0 +1,195 @@
+import logging
+import math
+
+log = logging.getLogger("perfscan.ai")
+
+# Instruções fixas: vão no campo "system" do Ollama. Como não mudam entre
+# chamadas, o Ollama reaproveita o KV cache desse prefixo em vez de
+# reprocessar tudo a cada alvo.
+# O dossiê (tabelas, riscos, snippets) é montado por src/core/report.py;
+# o modelo escreve só o resumo executivo.
+SYSTEM_PROMPT = """[ROLE]
+Você é um Arquiteto de Soluções Sênior e Especialista em Cibersegurança escrevendo o Resumo Executivo de uma auditoria técnica.
+[DIRETRIZES]
+1. Um único parágrafo (no máximo 6 frases), em Português do Brasil formal.
+2. Diga se a saúde geral é crítica ou estável e o impacto no negócio/SEO, citando a stack.
+3. NÃO invente dados: use apenas os números de [DADOS DO ALVO].
+4. Sem títulos, tabelas ou listas: tabelas e plano de correção já estão no relatório."""
+
+# Versão enxuta para o modo portfólio: várias empresas num único request
+PORTFOLIO_SYSTEM_PROMPT = """[ROLE]
+Você é um Arquiteto de Soluções Sênior auditando um portfólio de sites de uma vez.
+[DIRETRIZES]
+1. Português do Brasil formal, técnico e direto.
+2. NÃO invente dados: use apenas o que está em cada bloco [SITE].
+3. Para CADA bloco [SITE], na mesma ordem, escreva uma seção:
+## <url do site>
+- **Diagnóstico:** 2-3 frases sobre performance e segurança.
+- **Prioridades:** 3 correções numeradas, específicas para a stack.
+4. Não escreva introdução nem conclusão fora das seções."""
+
+FLEET_SYSTEM_PROMPT = """Você é um Arquiteto de Soluções Sênior. Recebe a tabela comparativa de um portfólio de sites.
+Escreva em Português do Brasil formal um "Resumo da Frota" de 1-2 parágrafos: padrões comuns, os piores casos e as 3 ações de maior impacto para o portfólio inteiro. NÃO invente dados."""
+
+# Tokens de resposta por site no modo portfólio
+PORTFOLIO_OUTPUT_PER_SITE = 350
+
+# Tokens reservados para a resposta (só o resumo executivo)
+OUTPUT_BUDGET = 512
+# num_ctx só anda nesses degraus: mudar o num_ctx faz o Ollama recarregar o
+# modelo, então é melhor alternar entre poucos valores fixos
+CTX_BUCKETS = (2048, 4096, 8192)
+# Média conservadora de caracteres por token para PT-BR no tokenizer do Llama 3
+CHARS_PER_TOKEN = 3.2
+
+
+def ssl_status(days):
+    """Faixa de validade do SSL (dias exatos mudariam o prompt todo dia e matariam o cache)"""
+    if days is None: return "Não verificado (sem HTTPS ou handshake falhou)"
+    if days < 0: return "EXPIRADO"
+    if days <= 7: return "Expira em até 7 dias (CRÍTICO)"
+    if days <= 30: return "Expira em até 30 dias"
+    if days <= 90: return "Válido por até 90 dias"
+    return "Válido por mais de 90 dias"
+
+
+def estimate_tokens(text):
+    """Estimativa rápida de tokens (sem depender do tokenizer do modelo)"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def size_num_ctx(prompt_tokens, output_budget=OUTPUT_BUDGET):
+    """Menor degrau de contexto que cabe prompt + resposta"""
+    need = prompt_tokens + output_budget
+    for bucket in CTX_BUCKETS:
+        if need <= bucket:
+            return bucket
+    return CTX_BUCKETS[-1]
+
+
+def _samples_line(distributions):
+    """Com várias amostras, a IA precisa saber que as métricas são p75 e quão estáveis são"""
+    for mode, dist in (distributions or {}).items():
+        lcp = dist.get("lcp_ms") or {}
+        if lcp.get("n", 0) > 1:
+            return (f"Amostras: {lcp['n']} runs ({mode}), métricas em p75; LCP mediana {lcp['median']:.0f} ms, "
+                    f"p95 {lcp['p95']:.0f} ms, desvio {lcp['stdev']:.0f} ms")
+    return ""
+
+
+def _section(title, lines):
+    lines = [l for l in lines if l]
+    if not lines:
+        return ""
+    return f"[{title}]\n" + "\n".join(lines)
+
+
+def build_data_prompt(data):
+    """Só os dados do alvo, compactos e sem seções vazias"""
+    # Ordena tudo que vem de set() para o mesmo scan gerar sempre o mesmo prompt
+    stack = ", ".join(sorted(data.get("stack") or ["Standard Web"]))
+    metrics = data.get("metrics", {})
+    security = data.get("security") or {}
+    issues = sorted(security.get("issues", []))
+
+    sections = [
+        _section("DADOS DO ALVO", [
+            f"Stack: {stack}",
+            f"SSL: {ssl_status(data.get('ssl_days'))}",
+            f"Performance (Lighthouse): {data.get('score', 0)}/100",
+            "Métricas: " + ", ".join(f"{k}={v}" for k, v in metrics.items()) if metrics else "",
+            _samples_line(data.get("distributions")),
+            f"Score de Segurança: {security.get('score', 0)}/100" if security else "",
+        ]),
+        _section("FALHAS DE SEGURANÇA", [f"- {i}" for i in issues]),
+    ]
+
+    wp = data.get("wp_details") or {}
+    sections.append(_section("WORDPRESS", [
+        f"Tema: {wp['theme']}" if wp.get("theme") and wp["theme"] != "Unknown" else "",
+        "Plugins: " + ", ".join(sorted(wp["plugins"])) if wp.get("plugins") else "",
+        "Código gerado por IA detectado (V0/Shadcn)" if wp.get("ai_code") else "",
+    ]))
+
+    html = data.get("html_context") or {}
+    sections.append(_section("CONTEÚDO", [
+        f"Título: {html['title']}" if html.get("title") else "",
+        f"H1: {html['h1']}" if html.get("h1") and html["h1"] != "Sem H1" else "",
+        f"Meta description: {html['meta_desc']}" if html.get("meta_desc") and html["meta_desc"] != "Sem Meta Desc" else "",
+    ]))
+
+    network = (data.get("network") or {}).get("summary") or {}
+    sections.append(_section("REDE", [
+        f"Requests: {network['requests']}, {network['transfer_bytes'] // 1024} KB transferidos, "
+        f"{network['third_party']['requests']} de terceiros" if network.get("requests") else "",
+        f"Recursos sem compressão: {len(network['uncompressed'])}" if network.get("uncompressed") else "",
+        "Mais lentos: " + ", ".join(f"{s['url'][:80]} ({s['total_ms']:.0f} ms)" for s in network["slowest"][:3])
+        if network.get("slowest") else "",
+    ]))
+
+    recon = data.get("recon") or {}
+    sections.append(_section("INFRA", [
+        f"IP: {recon['ip']}" if recon.get("ip") not in (None, "N/A", "Unknown") else "",
+        "Portas abertas: " + ", ".join(str(p) for p in recon["open_ports"]) if recon.get("open_ports") else "",
+        "DNS MX: " + ", ".join(recon["dns_records"]["MX"]) if recon.get("dns_records", {}).get("MX") else "",
+        f"Subdomínios vivos ({len(recon['subdomains'])}): " + ", ".join(s["host"] for s in recon["subdomains"][:15])
+        if recon.get("subdomains") else "",
+    ]))
+
+    return "\n".join(s for s in sections if s)
+
+
+def build_prompt(data, base_options):
+    """Monta ``(system, prompt, options)`` com ``num_ctx`` do tamanho da necessidade"""
+    prompt = build_data_prompt(data)
+    prompt_tokens = estimate_tokens(SYSTEM_PROMPT) + estimate_tokens(prompt)
+    options = dict(base_options)
+    options["num_ctx"] = size_num_ctx(prompt_tokens)
+    log.info("prompt ~%d tokens (system %d) -> num_ctx %d",
+             prompt_tokens, estimate_tokens(SYSTEM_PROMPT), options["num_ctx"])
+    return SYSTEM_PROMPT, prompt, options
+
+
+def build_site_block(url, data):
+    """Bloco [SITE] do modo portfólio (mesmos dados do prompt individual)"""
+    return f"[SITE] {url}\n{build_data_prompt(data)}"
+
+
+def chunk_sites(blocks, max_ctx=CTX_BUCKETS[-1], per_site_output=PORTFOLIO_OUTPUT_PER_SITE):
+    """Agrupa blocos de sites para cada request caber no contexto.
+
+    Devolve listas de índices; cada grupo respeita
+    system + blocos + respostas <= ``max_ctx``.
+    """
+    base = estimate_tokens(PORTFOLIO_SYSTEM_PROMPT)
+    chunks, current, used = [], [], base
+    for i, block in enumerate(blocks):
+        cost = estimate_tokens(block) + per_site_output
+        if current and used + cost > max_ctx:
+            chunks.append(current)
+            current, used = [], base
+        current.append(i)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def comparison_table(sites):
+    """Tabela Markdown lado a lado (renderizada aqui, sem gastar token de saída)"""
+    rows = ["| Site | Perf | LCP | CLS | TTFB | Segurança | SSL | Stack |",
+            "|---|---|---|---|---|---|---|---|"]
+    for site in sites:
+        data = site["data"]
+        metrics = data.get("metrics", {})
+        rows.append("| {} | {} | {} | {} | {} | {} | {} | {} |".format(
+            site["url"],
+            data.get("score", 0),
+            metrics.get("LCP", "N/A"),
+            metrics.get("CLS", "N/A"),
+            metrics.get("TTFB", "N/A"),
+            (data.get("security") or {}).get("score", "N/A"),
+            "N/A" if data.get("ssl_days") is None else f"{data['ssl_days']}d",
+            ", ".join(sorted(data.get("stack") or [])) or "-",
+        ))
+    return "\n".join(rows)
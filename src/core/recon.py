@@ -1,62 +1,216 @@
-import socket
-import dns.resolver
-import concurrent.futures
+import asyncio
+import statistics
+import time
 from urllib.parse import urlparse
+from src.utils.net_cache import get_net_cache
+
+# Portas TCP mais comuns na internet (ordem de frequência do nmap) + serviços
+# que costumam vazar em servidores web (bancos, caches, painéis, Docker/K8s)
+TOP_PORTS = [
+    80, 23, 443, 21, 22, 25, 3389, 110, 445, 139, 143, 53, 135, 3306, 8080, 1723, 111, 995, 993, 5900,
+    1025, 587, 8888, 199, 1720, 465, 548, 113, 81, 6001, 10000, 514, 5060, 179, 1026, 2000, 8443, 8000,
+    32768, 554, 26, 1433, 49152, 2001, 515, 8008, 49154, 1027, 5666, 646, 5000, 5631, 631, 49153, 8081,
+    2049, 88, 79, 5800, 106, 2121, 1110, 49155, 6000, 513, 990, 5357, 427, 49156, 543, 544, 5101, 144,
+    7, 389, 8009, 3128, 444, 9999, 5009, 7070, 5190, 3000, 5432, 1900, 3986, 13, 1029, 9, 5051, 6646,
+    49157, 1028, 873, 1755, 2717, 4899, 9100, 119, 37,
+    6379, 27017, 9200, 9300, 11211, 5672, 15672, 9000, 9090, 2375, 2376, 6443, 10250, 5601, 8086, 8983,
+    5984, 7474, 1521, 50000, 8161, 61616, 2181, 9092, 4369, 25565, 8001, 8082, 8090, 8181, 8880, 9443,
+]
+DEFAULT_PORTS = "top100"
+
+DNS_RECORD_TYPES = ("A", "AAAA", "CNAME", "MX", "NS", "TXT", "SOA", "CAA")
+
+# Conexões simultâneas (cada uma é um socket: fica bem abaixo do ulimit padrão de 1024)
+DEFAULT_MAX_CONNECTIONS = 500
+# Limites do timeout adaptativo por porta
+MIN_TIMEOUT = 0.15
+MAX_TIMEOUT = 2.0
+
+
+def top_ports(n):
+    """As ``n`` portas mais comuns: a lista curada primeiro, depois 1-65535 em ordem"""
+    ports = list(dict.fromkeys(TOP_PORTS))[:n]
+    if len(ports) < n:
+        seen = set(ports)
+        for port in range(1, 65536):
+            if port not in seen:
+                ports.append(port)
+                if len(ports) >= n:
+                    break
+    return ports
+
+
+def parse_ports(spec):
+    """``"top1000"``, ``"1-1024,3306,8000-8100"`` ou lista de ints -> lista de portas sem repetição"""
+    if spec is None:
+        spec = DEFAULT_PORTS
+    if isinstance(spec, (list, tuple, set)):
+        return list(dict.fromkeys(int(p) for p in spec))
+    ports = []
+    for part in str(spec).replace(" ", "").split(","):
+        if not part:
+            continue
+        if part.lower().startswith("top"):
+            ports.extend(top_ports(int(part[3:] or 100)))
+        elif "-" in part:
+            lo, hi = part.split("-", 1)
+            ports.extend(range(max(1, int(lo)), min(65535, int(hi)) + 1))
+        else:
+            ports.append(int(part))
+    return list(dict.fromkeys(p for p in ports if 0 < p < 65536))
+
+
+def target_host(url):
+    """Hostname sem porta/credenciais (``host:8080`` e ``[::1]`` inclusos)"""
+    if "//" not in url:
+        url = "//" + url
+    parsed = urlparse(url)
+    return parsed.hostname or "", parsed.port
+
 
 class ReconScanner:
-    def __init__(self, target_url):
+    def __init__(self, target_url, ports=None, max_connections=DEFAULT_MAX_CONNECTIONS, semaphore=None,
+                 subdomains=None, cert_names=()):
         self.target = target_url
-        self.domain = urlparse(target_url).netloc
+        self.domain, self.url_port = target_host(target_url)
+        self.ports = parse_ports(ports)
+        # Semáforo pode ser compartilhado entre vários alvos (recon em lote)
+        self._semaphore = semaphore
+        self.max_connections = max_connections
+        self.timeout = MAX_TIMEOUT / 2
+        # Opções de discover_subdomains (None = não enumera); SANs do certificado viram candidatos
+        self.subdomain_options = subdomains
+        self.cert_names = cert_names
         self.results = {
             "ip": "N/A",
+            "ips": [],
             "open_ports": [],
             "dns_records": {},
-            "subdomains": []
+            "subdomains": [],
         }
 
-    def resolve_ip(self):
-        try:
-            self.results["ip"] = socket.gethostbyname(self.domain)
-        except:
-            self.results["ip"] = "Unknown"
+    async def resolve_ip(self):
+        """Resolve uma vez só (cache de rede do processo); todas as portas usam o IP"""
+        ips = await get_net_cache().resolve_async(self.domain)
+        self.results["ips"] = ips
+        self.results["ip"] = ips[0] if ips else "Unknown"
+        return self.results["ip"]
 
-    def scan_port(self, port):
-        """Verifica se uma porta está aberta (Socket rápido)"""
+    async def _connect(self, ip, port, timeout):
+        """True = aberta, False = recusada, None = sem resposta (filtrada)"""
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(0.5) # Timeout curto para ser rápido
-            result = sock.connect_ex((self.domain, port))
-            sock.close()
-            if result == 0:
-                return port
+            _, writer = await asyncio.wait_for(asyncio.open_connection(ip, port), timeout)
+        except asyncio.TimeoutError:
+            return None
+        except OSError:
+            return False
+        writer.close()
+        try:
+            await writer.wait_closed()
         except:
             pass
-        return None
-
-    def scan_ports_parallel(self):
-        """Scan multithread das top 20 portas mais comuns"""
-        common_ports = [21, 22, 23, 25, 53, 80, 110, 135, 139, 143, 443, 445, 993, 995, 1433, 3306, 3389, 5432, 8080, 8443]
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            results = executor.map(self.scan_port, common_ports)
-        
-        self.results["open_ports"] = [p for p in results if p is not None]
-
-    def get_dns_records(self):
-        """Extrai registros DNS importantes (MX = Email, TXT = Verificações)"""
-        record_types = ['A', 'MX', 'NS', 'TXT']
-        for r_type in record_types:
+        return True
+
+    async def measure_rtt(self, ip, samples=3):
+        """RTT até o alvo pela porta web; vira o timeout por porta (RTT x 4, com piso e teto)"""
+        port = self.url_port or (443 if self.target.startswith("https") else 80)
+        rtts = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            state = await self._connect(ip, port, MAX_TIMEOUT)
+            if state is not None:
+                # Recusada também responde (RST): serve de medida do RTT
+                rtts.append(time.perf_counter() - start)
+        if rtts:
+            rtt = statistics.median(rtts)
+            self.timeout = min(MAX_TIMEOUT, max(MIN_TIMEOUT, rtt * 4 + 0.05))
+            self.results["rtt_ms"] = round(rtt * 1000, 1)
+        self.results["port_timeout_ms"] = int(self.timeout * 1000)
+        return self.timeout
+
+    async def scan_ports(self, ip):
+        """Connects não bloqueantes em todas as portas, no máximo ``max_connections`` em voo"""
+        semaphore = self._semaphore or asyncio.Semaphore(self.max_connections)
+        filtered = 0
+
+        async def probe(port):
+            nonlocal filtered
+            async with semaphore:
+                state = await self._connect(ip, port, self.timeout)
+            if state is None:
+                filtered += 1
+            return port if state else None
+
+        found = await asyncio.gather(*(probe(p) for p in self.ports))
+        self.results["open_ports"] = sorted(p for p in found if p is not None)
+        self.results["ports_scanned"] = len(self.ports)
+        self.results["ports_filtered"] = filtered
+
+    async def get_dns_records(self):
+        """Todos os tipos de registro em paralelo (MX = Email, TXT = Verificações)"""
+        import dns.asyncresolver
+        resolver = dns.asyncresolver.Resolver()
+        resolver.lifetime = 3
+
+        async def query(r_type):
             try:
-                answers = dns.resolver.resolve(self.domain, r_type)
-                self.results["dns_records"][r_type] = [r.to_text() for r in answers]
+                answers = await resolver.resolve(self.domain, r_type)
+                return r_type, [r.to_text() for r in answers]
             except:
-                pass
+                return r_type, None
 
-    def run(self):
-        self.resolve_ip()
-        self.get_dns_records()
-        self.scan_ports_parallel()
+        for r_type, records in await asyncio.gather(*(query(t) for t in DNS_RECORD_TYPES)):
+            if records:
+                self.results["dns_records"][r_type] = records
+
+    async def find_subdomains(self):
+        from src.core.subdomains import discover_subdomains
+        extra = [(name, "cert") for name in self.cert_names or ()]
+        try:
+            found = await discover_subdomains(self.domain, extra=extra, **self.subdomain_options)
+        except Exception as e:
+            self.results["subdomain_scan"] = {"error": str(e)}
+            return
+        self.results["subdomains"] = found.pop("subdomains")
+        self.results["subdomain_scan"] = found
+
+    async def run_async(self):
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(self.get_dns_records())]
+        if self.subdomain_options is not None:
+            tasks.append(asyncio.create_task(self.find_subdomains()))
+        ip = await self.resolve_ip()
+        if ip != "Unknown":
+            await self.measure_rtt(ip)
+            await self.scan_ports(ip)
+        await asyncio.gather(*tasks)
+        self.results["elapsed_ms"] = int((time.perf_counter() - start) * 1000)
         return self.results
 
-def run_recon(url):
-    scanner = ReconScanner(url)
-    return scanner.run()
\ No newline at end of file
+    def run(self):
+        return asyncio.run(self.run_async())
+
+
+def run_recon(url, ports=None, subdomains=None, cert_names=()):
+    scanner = ReconScanner(url, ports=ports, subdomains=subdomains, cert_names=cert_names)
+    return scanner.run()
+
+
+async def run_recon_many_async(urls, ports=None, concurrency=8, max_connections=DEFAULT_MAX_CONNECTIONS,
+                               on_result=None):
+    """Recon de vários alvos; o limite de conexões é global (somado entre alvos)"""
+    semaphore = asyncio.Semaphore(max_connections)
+    targets = asyncio.Semaphore(max(1, concurrency))
+
+    async def one(url):
+        async with targets:
+            data = await ReconScanner(url, ports=ports, semaphore=semaphore).run_async()
+        if on_result: on_result(url, data)
+        return data
+
+    return await asyncio.gather(*(one(u) for u in urls))
+
+
+def run_recon_many(urls, ports=None, concurrency=8, max_connections=DEFAULT_MAX_CONNECTIONS, on_result=None):
+    """Recon em lote; devolve os resultados na mesma ordem de ``urls``"""
+    return asyncio.run(run_recon_many_async(urls, ports, concurrency, max_connections, on_result))
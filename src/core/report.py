@@ -0,0 +1,314 @@
+import re
+from src.core.prompt import ssl_status
+from src.core.waterfall import waterfall_table
+
+# Limites do Google (Core Web Vitals / web.dev): (bom até, ruim acima de)
+THRESHOLDS = {
+    "LCP": (2500, 4000, "ms"),
+    "CLS": (0.1, 0.25, ""),
+    "TTFB": (800, 1800, "ms"),
+}
+
+# Explicação de risco por tipo de falha (chave = prefixo da issue do scanner)
+ISSUE_RISKS = {
+    "Falta HSTS": "Sem `Strict-Transport-Security` o navegador aceita a primeira visita em HTTP, abrindo espaço para SSL stripping e ataques Man-in-the-Middle em redes públicas.",
+    "Falta X-Frame-Options": "A página pode ser embutida em iframes de terceiros, permitindo clickjacking (o usuário clica em algo diferente do que vê).",
+    "Falta No-Sniff": "Sem `X-Content-Type-Options: nosniff` o navegador pode \"adivinhar\" o tipo de um arquivo e executar como script um upload que deveria ser texto/imagem.",
+    "Leak": "O header `X-Powered-By` expõe a tecnologia e a versão do backend, facilitando a busca por CVEs específicas.",
+    "Server Info": "O header `Server` revela o software do servidor; sozinho não é uma falha, mas encurta o reconhecimento de um atacante.",
+    "Headers vazios": "Nenhum header foi lido: o alvo bloqueou o scanner ou respondeu com erro, então a postura de segurança não pôde ser avaliada.",
+}
+
+# Headers de defesa que correspondem a cada falha, para os snippets de correção
+ISSUE_HEADERS = {
+    "Falta HSTS": ("Strict-Transport-Security", "max-age=31536000; includeSubDomains"),
+    "Falta X-Frame-Options": ("X-Frame-Options", "SAMEORIGIN"),
+    "Falta No-Sniff": ("X-Content-Type-Options", "nosniff"),
+}
+
+
+def parse_metric(value):
+    """'2.5 s' / '1,230 ms' / '0.05' -> float na unidade de THRESHOLDS (ms ou sem unidade)"""
+    if value is None:
+        return None
+    text = str(value).strip().lower().replace(",", "").replace("\u00a0", " ")  # Lighthouse usa NBSP
+    match = re.match(r"^(-?[\d.]+)\s*(ms|s)?$", text)
+    if not match:
+        return None
+    number = float(match.group(1))
+    if match.group(2) == "s":
+        number *= 1000
+    return number
+
+
+def rate_metric(name, value):
+    """Classificação estilo Google: Bom / Precisa Melhorar / Ruim"""
+    number = parse_metric(value)
+    if number is None or name not in THRESHOLDS:
+        return "N/A"
+    good, poor, _ = THRESHOLDS[name]
+    if number <= good: return "🟢 Bom"
+    if number <= poor: return "🟡 Precisa Melhorar"
+    return "🔴 Ruim"
+
+
+def _issue_kind(issue):
+    for kind in ISSUE_RISKS:
+        if issue.startswith(kind):
+            return kind
+    return None
+
+
+def detect_server(data):
+    """nginx/apache/etc. a partir da stack ou do header Server vazado"""
+    names = " ".join(data.get("stack") or []).lower()
+    for issue in (data.get("security") or {}).get("issues", []):
+        if issue.startswith("Server Info"):
+            names += " " + issue.lower()
+    for server in ("nginx", "apache", "litespeed", "iis"):
+        if server in names:
+            return server
+    return None
+
+
+def header_snippet(stack, server, headers):
+    """Snippet de configuração para os headers que faltam, no dialeto da stack"""
+    if not headers:
+        return None
+    stack_lower = [s.lower() for s in stack]
+    if server == "nginx":
+        lines = [f'add_header {name} "{value}" always;' for name, value in headers]
+        return "nginx", "# server { ... }\n" + "\n".join(lines) + "\nserver_tokens off;"
+    if server in ("apache", "litespeed"):
+        lines = [f'Header always set {name} "{value}"' for name, value in headers]
+        return "apache", "# .htaccess\n" + "\n".join(lines) + "\nHeader unset X-Powered-By"
+    if any("next.js" in s for s in stack_lower):
+        entries = ",\n".join(f"        {{ key: '{name}', value: '{value}' }}" for name, value in headers)
+        return "js", ("// next.config.js\nmodule.exports = {\n  async headers() {\n    return [{\n"
+                      "      source: '/(.*)',\n      headers: [\n" + entries + "\n      ],\n    }];\n  },\n};")
+    if any("vercel" in s for s in stack_lower):
+        entries = ",\n".join(f'        {{ "key": "{name}", "value": "{value}" }}' for name, value in headers)
+        return "json", '// vercel.json\n{\n  "headers": [{\n    "source": "/(.*)",\n    "headers": [\n' + entries + "\n    ]\n  }]\n}"
+    if any("laravel" in s for s in stack_lower):
+        lines = "\n".join(f"        $response->headers->set('{name}', '{value}');" for name, value in headers)
+        return "php", ("// app/Http/Middleware/SecurityHeaders.php (registre no Kernel)\n"
+                       "public function handle($request, Closure $next)\n{\n    $response = $next($request);\n"
+                       + lines + "\n    return $response;\n}")
+    if any("wordpress" in s for s in stack_lower):
+        lines = "\n".join(f"    header('{name}: {value}');" for name, value in headers)
+        return "php", "// functions.php do tema filho\nadd_action('send_headers', function () {\n" + lines + "\n});"
+    lines = "\n".join(f"{name}: {value}" for name, value in headers)
+    return "http", "# Headers a adicionar na resposta do servidor/CDN\n" + lines
+
+
+# Ações de performance por stack (quando LCP/TTFB não estão bons)
+PERF_ACTIONS = {
+    "wordpress": [
+        "Ative cache de página (WP Rocket, LiteSpeed Cache ou W3 Total Cache) e object cache (Redis).",
+        "Sirva imagens em WebP/AVIF e remova `loading=\"lazy\"` da imagem principal (LCP).",
+        "Desative plugins carregados em todas as páginas sem necessidade (Asset CleanUp / Perfmatters).",
+    ],
+    "next.js": [
+        "Use `next/image` com `priority` na imagem do LCP e tamanhos (`sizes`) corretos.",
+        "Prefira SSG/ISR nas páginas de entrada em vez de SSR por request.",
+        "Analise o bundle (`@next/bundle-analyzer`) e carregue componentes pesados com `dynamic()`.",
+    ],
+    "laravel": [
+        "Rode `php artisan config:cache`, `route:cache` e `view:cache` em produção.",
+        "Ative OPcache e cache de resposta para páginas públicas.",
+        "Revise queries N+1 com eager loading (`with()`).",
+    ],
+    "react": [
+        "Faça code-splitting por rota (`React.lazy`) e reduza o JS inicial.",
+        "Considere SSR/SSG para o conteúdo acima da dobra.",
+    ],
+    "vue.js": [
+        "Faça code-splitting por rota e carregue componentes pesados de forma assíncrona.",
+        "Considere SSR/SSG (Nuxt) para o conteúdo acima da dobra.",
+    ],
+}
+GENERIC_PERF_ACTIONS = [
+    "Faça `<link rel=\"preload\">` do recurso do LCP (imagem ou fonte) e sirva-o por CDN.",
+    "Ative compressão Brotli/Gzip e cache HTTP longo para assets versionados.",
+    "Adie scripts de terceiros (`defer`/`async`) que bloqueiam a renderização.",
+]
+
+
+def metrics_table(data):
+    metrics = data.get("metrics", {})
+    rows = ["| Métrica | Valor Atual | Ideal (Google) | Status |", "|---|---|---|---|"]
+    for name, (good, _, unit) in THRESHOLDS.items():
+        ideal = f"≤ {good / 1000:g} s" if unit == "ms" and name != "TTFB" else f"≤ {good:g}{' ' + unit if unit else ''}"
+        value = metrics.get(name, "N/A")
+        rows.append(f"| {name} | {value} | {ideal} | {rate_metric(name, value)} |")
+    rows.append(f"| Performance (Lighthouse) | {data.get('score', 0)}/100 | ≥ 90 | "
+                f"{'🟢 Bom' if data.get('score', 0) >= 90 else '🟡 Precisa Melhorar' if data.get('score', 0) >= 50 else '🔴 Ruim'} |")
+    return "\n".join(rows)
+
+
+# Linhas da tabela de distribuição: (chave, rótulo, formato)
+DISTRIBUTION_ROWS = (
+    ("lcp_ms", "LCP (ms)", "{:.0f}"),
+    ("cls", "CLS", "{:.3f}"),
+    ("ttfb_ms", "TTFB (ms)", "{:.0f}"),
+    ("tbt_ms", "TBT (ms)", "{:.0f}"),
+    ("score", "Performance", "{:.0f}"),
+)
+CACHE_LABELS = {"cold": "cache frio", "warm": "cache quente", "single": "run único"}
+
+
+def distribution_section(data):
+    """Mediana/p75/p95/desvio/IC por métrica quando o scan teve várias amostras"""
+    parts = []
+    for mode, dist in (data.get("distributions") or {}).items():
+        n = max((dist.get(key) or {}).get("n", 0) for key, _, _ in DISTRIBUTION_ROWS)
+        if n < 2:
+            continue
+        rows = [f"### Distribuição ({n} amostras, {CACHE_LABELS.get(mode, mode)})",
+                "| Métrica | Mediana | p75 | p95 | Desvio | IC 95% (mediana) |", "|---|---|---|---|---|---|"]
+        for key, label, fmt in DISTRIBUTION_ROWS:
+            d = dist.get(key) or {}
+            if not d.get("n"):
+                continue
+            ci = d.get("ci95_median") or d.get("ci95_mean")
+            ci_text = f"{fmt.format(ci[0])} – {fmt.format(ci[1])}" if ci else "-"
+            rows.append(f"| {label} | {fmt.format(d['median'])} | {fmt.format(d['p75'])} | {fmt.format(d['p95'])} | "
+                        f"{fmt.format(d['stdev'])} | {ci_text} |")
+        if dist.get("failed"):
+            rows.append(f"\n*{dist['failed']} run(s) falharam e ficaram fora da conta.*")
+        parts.append("\n".join(rows))
+    if not parts:
+        return ""
+    return "\n\n" + "\n\n".join(parts) + "\n\n*Valores da tabela acima: p75 (critério do Google para Core Web Vitals).*"
+
+
+def network_section(data):
+    """Cascata de rede: onde o tempo e os bytes foram gastos"""
+    network = data.get("network") or {}
+    summary = network.get("summary") or {}
+    if not summary.get("requests"):
+        return ""
+    third = summary.get("third_party", {})
+    lines = [
+        "",
+        "### Cascata de Rede",
+        f"**Requests:** {summary['requests']} • **Transferido:** {summary['transfer_bytes'] / 1024:.0f} KB • "
+        f"**Terceiros:** {third.get('requests', 0)} requests / {third.get('bytes', 0) / 1024:.0f} KB • "
+        f"**Protocolos:** " + ", ".join(f"{p} ({n})" for p, n in summary.get("protocols", {}).items()),
+        "",
+        waterfall_table(network.get("rows", [])),
+    ]
+    if summary.get("uncompressed"):
+        lines += ["", "**Sem compressão (⚠️):** " + ", ".join(
+            f"`{u['url'].rsplit('/', 1)[-1][:40] or u['url']}` ({u['bytes'] / 1024:.0f} KB)" for u in summary["uncompressed"][:5])]
+    hosts = [(h, v) for h, v in summary.get("hosts", {}).items() if v.get("third_party")]
+    if hosts:
+        lines += ["", "**Terceiros mais lentos:** " + ", ".join(
+            f"{h} ({v['requests']} req, {v['time_ms']:.0f} ms)" for h, v in hosts[:5])]
+    return "\n".join(lines)
+
+
+def security_section(data):
+    security = data.get("security") or {}
+    issues = security.get("issues", [])
+    lines = [f"**Score de Segurança:** {security.get('score', 'N/A')}/100", ""]
+    if not issues:
+        lines.append("Nenhuma falha crítica detectada nos headers padrão.")
+    for issue in issues:
+        kind = _issue_kind(issue)
+        risk = ISSUE_RISKS.get(kind, "Achado do scanner; avalie o impacto no contexto da aplicação.")
+        lines.append(f"- **{issue}** — {risk}")
+
+    days = data.get("ssl_days")
+    lines += ["", f"**SSL:** {ssl_status(days)}" + (f" ({days} dias restantes)." if days is not None else ".")]
+    return "\n".join(lines)
+
+
+def roadmap_section(data):
+    stack = data.get("stack") or []
+    issues = (data.get("security") or {}).get("issues", [])
+    steps = []
+
+    missing = [ISSUE_HEADERS[k] for k in (_issue_kind(i) for i in issues) if k in ISSUE_HEADERS]
+    snippet = header_snippet(stack, detect_server(data), missing)
+    if snippet:
+        lang, code = snippet
+        # Indentado para o bloco de código ficar dentro do item da lista
+        block = "\n".join("   " + line for line in f"```{lang}\n{code}\n```".splitlines())
+        steps.append(f"Adicione os headers de segurança que faltam:\n\n{block}")
+    if any(i.startswith("Leak") for i in issues):
+        steps.append("Remova o header `X-Powered-By` (ex: `expose_php = Off` no php.ini, `app.disable('x-powered-by')` no Express).")
+    days = data.get("ssl_days")
+    if days is not None and days <= 30:
+        steps.append("Renove o certificado SSL agora e automatize a renovação (certbot/ACME ou certificado gerenciado pela CDN).")
+
+    network = (data.get("network") or {}).get("summary") or {}
+    if network.get("uncompressed"):
+        steps.append(f"Ative Brotli/Gzip: {len(network['uncompressed'])} recursos de texto saem sem compressão "
+                     "(`gzip on; gzip_types text/css application/javascript application/json image/svg+xml;` no nginx).")
+    if network.get("uncached"):
+        steps.append(f"Defina `Cache-Control: public, max-age=31536000, immutable` para os {network['uncached']} "
+                     "assets próprios sem cache (com nome versionado/hash).")
+
+    metrics = data.get("metrics", {})
+    slow = [n for n in ("LCP", "TTFB") if rate_metric(n, metrics.get(n)).endswith(("Melhorar", "Ruim"))]
+    if slow or data.get("score", 0) < 90:
+        actions = []
+        for tech in stack:
+            actions += PERF_ACTIONS.get(tech.lower(), [])
+        for action in (actions or GENERIC_PERF_ACTIONS):
+            if action not in steps:
+                steps.append(action)
+
+    if not steps:
+        return "Nenhuma correção urgente: mantenha o monitoramento contínuo."
+    return "\n".join(f"{i}. {step}" for i, step in enumerate(steps, 1))
+
+
+def template_summary(data):
+    """Resumo executivo sem IA, montado a partir das mesmas classificações"""
+    score = data.get("score", 0)
+    sec = (data.get("security") or {}).get("score", 0)
+    state = "CRÍTICO" if score < 50 or sec < 50 else "ESTÁVEL COM RESSALVAS" if score < 90 or sec < 80 else "ESTÁVEL"
+    metrics = data.get("metrics", {})
+    bad = [n for n in THRESHOLDS if rate_metric(n, metrics.get(n)).endswith("Ruim")]
+    issues = (data.get("security") or {}).get("issues", [])
+    text = (f"O site está em estado **{state}**: performance {score}/100 e segurança {sec}/100. ")
+    if bad:
+        subject = f"A métrica {bad[0]} está" if len(bad) == 1 else f"As métricas {', '.join(bad)} estão"
+        text += f"{subject} fora do limite do Google, o que penaliza SEO e conversão. "
+    if issues:
+        text += f"Foram encontrados {len(issues)} apontamentos nos headers de segurança. "
+    text += "O plano de correção abaixo está ordenado por impacto."
+    return text
+
+
+def render_report_parts(data):
+    """Relatório determinístico dividido em (cabeçalho, corpo).
+
+    O resumo executivo entra entre as duas partes: vem da IA ou de
+    ``template_summary``.
+    """
+    stack = ", ".join(sorted(data.get("stack") or ["Standard Web"]))
+    head = f"# 📑 Dossiê Técnico de Auditoria: {stack}\n\n## 1. Resumo Executivo\n"
+    body = f"""
+
+## 2. Análise de Infraestrutura e Performance
+{metrics_table(data)}{distribution_section(data)}
+{network_section(data)}
+
+## 3. Diagnóstico de Cibersegurança
+{security_section(data)}
+
+## 4. Plano de Correção Tática (Roadmap)
+{roadmap_section(data)}
+
+---
+*Confidencial • Auditado por PerfScan v6.0*
+"""
+    return head, body
+
+
+def render_report(data, summary=None):
+    head, body = render_report_parts(data)
+    return head + (summary or template_summary(data)) + body
@@ -1,73 +1,42 @@
-import subprocess
-import json
 import os
 import time
-import ssl
-import socket
-import re
-from datetime import datetime
+import tempfile
 from urllib.parse import urlparse
-from playwright.sync_api import sync_playwright
+from src.core.browser_pool import get_browser_pool
+from src.core.fingerprints import fingerprint
+from src.core.measure import lighthouse_values, build_distributions
+from src.core.waterfall import load_har, top_rows
+from src.utils.net_cache import get_net_cache, cert_days_left
 
 
-def get_ssl_expiry(url):
-    """Verifica a validade do certificado SSL"""
+def get_ssl_info(url):
+    """Dias até expirar + nomes do certificado (SANs, usados no recon) e protocolo/cifra.
+
+    O handshake vem do cache de rede do processo: vários scans do mesmo
+    host (batch, recon, crawler) leem o certificado uma vez só.
+    """
+    info = {"days": None, "sans": []}
     try:
-        hostname = urlparse(url).netloc
-        context = ssl.create_default_context()
-        with socket.create_connection((hostname, 443), timeout=3) as sock:
-            with context.wrap_socket(sock, server_hostname=hostname) as ssock:
-                cert = ssock.getpeercert()
-                not_after = cert["notAfter"]
-                # Formato: May 30 12:00:00 2025 GMT
-                expiry_date = datetime.strptime(not_after, "%b %d %H:%M:%S %Y %Z")
-                days_left = (expiry_date - datetime.now()).days
-                return days_left
+        parsed = urlparse(url if "//" in url else "//" + url)
+        port = parsed.port if parsed.scheme == "https" and parsed.port else 443
+        facts = get_net_cache().tls_facts(parsed.hostname, port)
+        if "error" not in facts:
+            info.update(facts)
+            info["days"] = cert_days_left(facts["not_after"])
     except:
-        return None
+        pass
+    return info
+
+
+def get_ssl_expiry(url):
+    """Verifica a validade do certificado SSL"""
+    return get_ssl_info(url)["days"]
 
 
 def detect_advanced_stack(html, headers):
-    """Sherlock 2.0: Detecção Profunda (Plugins WP, Temas, AI Code)"""
-    stack = set()
-    details = {"plugins": [], "theme": "Unknown", "ai_code": False}
-
-    html_lower = html.lower()
-    headers_str = str(headers).lower()
-
-    # --- 1. Frameworks & Infra (Básico) ---
-    if "/_next/" in html:
-        stack.update(["Next.js", "React"])
-    if "react" in html:
-        stack.add("React")
-    if "vue" in html or "data-v-" in html:
-        stack.add("Vue.js")
-    if "laravel" in headers_str:
-        stack.add("Laravel")
-    if "cloudflare" in headers_str:
-        stack.add("Cloudflare")
-    if "vercel" in headers_str:
-        stack.add("Vercel")
-
-    # --- 2. WordPress Deep Dive ---
-    if "wp-content" in html_lower:
-        stack.add("WordPress")
-        # Tenta achar o tema
-        theme_match = re.search(r"wp-content/themes/(.*?)/", html)
-        if theme_match:
-            details["theme"] = theme_match.group(1)
-
-        # Tenta achar plugins comuns
-        plugins = re.findall(r"wp-content/plugins/(.*?)/", html)
-        details["plugins"] = list(set(plugins))[:10]  # Top 10 plugins
-
-    # --- 3. AI Code Detection (Heurística) ---
-    # Padrões comuns de geradores como V0.dev ou Tailwind genérico de LLM
-    if "v0_block" in html or "rounded-lg border bg-card text-card-foreground" in html:
-        stack.add("AI Generated Code (V0/Shadcn)")
-        details["ai_code"] = True
-
-    return list(stack), details
+    """Sherlock 3.0: Detecção Profunda (Plugins WP, Temas, AI Code) via base de assinaturas"""
+    stack, details = fingerprint(html, headers)
+    return sorted(stack), details
 
 
 def analyze_security_headers(headers):
@@ -96,28 +65,12 @@ def analyze_security_headers(headers):
     return {"score": max(0, score), "issues": issues}
 
 
-def run_lighthouse(url):
-    temp_file = "temp_report.json"
-    cmd = [
-        "lighthouse",
-        url,
-        "--output=json",
-        f"--output-path={temp_file}",
-        "--quiet",
-        "--chrome-flags='--headless --no-sandbox --disable-gpu --ignore-certificate-errors'",
-    ]
-    try:
-        subprocess.run(" ".join(cmd), shell=True, check=True, stdout=subprocess.DEVNULL)
-        with open(temp_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
-        return data
-    except:
-        return {"error": "Lighthouse Failed"}
-
+def run_backend_check(url, check_ssl=True, har_path=None):
+    """Headers, stack, HTML e a cascata de rede da página.
 
-def run_backend_check(url):
+    Todo request da página vai para um HAR (gravado pelo Playwright) que
+    vira ``results["waterfall"]``; com ``har_path`` o arquivo fica salvo.
+    """
     results = {
         "ttfb": 0,
         "headers": {},
@@ -127,13 +80,21 @@ def run_backend_check(url):
         "html_summary": {},
     }
 
-    # Checa SSL fora do browser (mais rápido)
-    results["ssl_days"] = get_ssl_expiry(url)
+    # Checa SSL fora do browser (mais rápido). No fluxo em DAG vira um estágio próprio
+    if check_ssl:
+        results["ssl_days"] = get_ssl_expiry(url)
 
-    with sync_playwright() as p:
-        try:
-            browser = p.chromium.launch(args=["--ignore-certificate-errors"])
-            page = browser.new_page()
+    keep_har = har_path is not None
+    if not keep_har:
+        fd, har_path = tempfile.mkstemp(suffix=".har")
+        os.close(fd)
+    failed = []
+
+    try:
+        with get_browser_pool().context(ignore_https_errors=True, record_har_path=har_path,
+                                         record_har_content="omit") as context:
+            page = context.new_page()
+            page.on("requestfailed", lambda req: failed.append({"url": req.url, "error": req.failure}))
             start = time.time()
             response = page.goto(url, wait_until="domcontentloaded", timeout=60000)
             end = time.time()
@@ -175,14 +136,43 @@ def run_backend_check(url):
                     ),
                 }
 
-            browser.close()
-        except Exception as e:
-            results["error"] = str(e)
+                # Deixa os assets tardios (lazy, terceiros) entrarem na cascata
+                try:
+                    page.wait_for_load_state("networkidle", timeout=5000)
+                except:
+                    pass
+    except Exception as e:
+        results["error"] = str(e)
+
+    # O HAR só é escrito quando o contexto fecha
+    try:
+        rows, summary = load_har(har_path, url)
+        summary["failed"] = failed[:20]
+        results["waterfall"] = {"summary": summary, "rows": top_rows(rows)}
+        if keep_har: results["har_path"] = har_path
+    except:
+        pass
+    finally:
+        if not keep_har and os.path.exists(har_path): os.remove(har_path)
 
     return results
 
 
-def parse_data(lh_data, be_data):
+def _fmt_ms(value):
+    if value is None: return "N/A"
+    return f"{value / 1000:.1f} s" if value >= 1000 else f"{value:.0f} ms"
+
+
+def parse_data(lh_data, be_data, recon=None, measurements=None):
+    """Normaliza as sondas para o relatório/IA.
+
+    ``distributions`` traz as séries numéricas por modo de cache (ver
+    ``src/core/measure.py``); um scan simples vira uma série de uma amostra.
+    Com várias amostras, ``metrics`` mostra o p75 (o percentil que o Google
+    usa para os Core Web Vitals) e ``score`` a mediana.
+    """
+    if measurements:
+        lh_data = measurements.get("report")
     if not lh_data or "error" in lh_data:
         lh_data = {"audits": {}, "categories": {}}
 
@@ -192,13 +182,34 @@ def parse_data(lh_data, be_data):
 
     lcp = audits.get("largest-contentful-paint", {}).get("displayValue", "N/A")
     cls = audits.get("cumulative-layout-shift", {}).get("displayValue", "N/A")
+    ttfb = f"{be_data.get('ttfb')} ms"
+
+    if measurements and measurements.get("modes"):
+        distributions = measurements["modes"]
+        # Cache frio é o cenário do visitante novo: é ele que vai para o SLA
+        primary = distributions.get("cold") or next(iter(distributions.values()))
+        # Cada série pode vir vazia (n=0: todos os runs falharam ou a métrica faltou)
+        if primary.get("lcp_ms", {}).get("n"):
+            lcp = _fmt_ms(primary["lcp_ms"].get("p75"))
+        if primary.get("cls", {}).get("n"):
+            cls = f"{primary['cls']['p75']:.3f}"
+        if primary.get("score", {}).get("n"):
+            score = primary["score"]["median"]
+        if primary.get("ttfb_ms", {}).get("n"):
+            ttfb = f"{primary['ttfb_ms']['p75']:.0f} ms"
+    else:
+        values = lighthouse_values(lh_data if audits else None)
+        distributions = {"single": build_distributions([values] if values else [], [be_data.get("ttfb")])}
 
     return {
-        "score": int(score),
+        "score": int(round(score)),
         "stack": be_data.get("stack", []),
         "wp_details": be_data.get("details", {}),
         "ssl_days": be_data.get("ssl_days", 0),
         "html_context": be_data.get("html_summary", {}),
         "security": be_data.get("security", {}),
-        "metrics": {"LCP": lcp, "CLS": cls, "TTFB": f"{be_data.get('ttfb')} ms"},
+        "metrics": {"LCP": lcp, "CLS": cls, "TTFB": ttfb},
+        "distributions": distributions,
+        "network": be_data.get("waterfall", {}),
+        "recon": recon or {},
     }
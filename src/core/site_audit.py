@@ -0,0 +1,167 @@
+import heapq
+import re
+from collections import Counter
+from urllib.parse import urlparse
+from src.core.fingerprints import StackScanner
+from src.core.scanner import analyze_security_headers
+
+# Quantas URLs de exemplo guardar por achado (o total é sempre contado)
+SAMPLE_URLS = 20
+# Páginas mais lentas/pesadas listadas no resumo
+TOP_PAGES = 10
+
+_ID_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8,}|[0-9a-f-]{36})$", re.IGNORECASE)
+
+
+def page_template(url):
+    """Agrupa URLs parecidas: /blog/post-x -> /blog/*, /produto/123 -> /produto/:id"""
+    segments = [s for s in urlparse(url).path.split("/") if s]
+    if not segments:
+        return "/"
+    first = ":id" if _ID_SEGMENT.match(segments[0]) else segments[0]
+    if len(segments) == 1:
+        return f"/{first}"
+    if len(segments) == 2 and _ID_SEGMENT.match(segments[1]):
+        return f"/{first}/:id"
+    return f"/{first}/*"
+
+
+def analyze_page(url, status, headers, html=None, scanner=None, elapsed_ms=None, ttfb_ms=None, size=None):
+    """Fatos compactos de uma página (o HTML não sai daqui).
+
+    Recebe o ``html`` inteiro ou um ``StackScanner`` que já leu a página em
+    streaming (modo rápido do crawler).
+    """
+    if scanner is None:
+        scanner = StackScanner()
+        scanner.feed(html or "")
+    stack, details = scanner.result(headers or {})
+    security = analyze_security_headers(headers or {})
+    return {
+        "url": url,
+        "template": page_template(url),
+        "status": status,
+        "stack": sorted(stack),
+        "plugins": details["plugins"],
+        "security_score": security["score"],
+        "issues": security["issues"],
+        "bytes": size if size is not None else len((html or "").encode("utf-8")),
+        "elapsed_ms": elapsed_ms,
+        "ttfb_ms": ttfb_ms,
+    }
+
+
+class _Running:
+    """Soma/mín/máx sem guardar a série inteira"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        if value is None:
+            return
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def summary(self):
+        if not self.count:
+            return None
+        return {"avg": round(self.total / self.count, 1), "min": self.min, "max": self.max}
+
+
+class SiteAggregator:
+    """Estatísticas do site inteiro, alimentadas página a página durante o crawl.
+
+    Memória proporcional ao número de templates/tecnologias/achados, não ao
+    número de páginas: de cada achado ficam só a contagem e até
+    ``SAMPLE_URLS`` exemplos.
+    """
+
+    def __init__(self):
+        self.pages = 0
+        self.skipped = 0
+        self.status = Counter()
+        self.techs = Counter()
+        self.issues = {}
+        self.templates = {}
+        self.security = _Running()
+        self.size = _Running()
+        self.elapsed = _Running()
+        self.ttfb = _Running()
+        self._slowest = []
+        self._heaviest = []
+
+    def _issue(self, issue, url):
+        # "Leak: PHP/8.1" e "Server Info: nginx" agrupam pelo tipo
+        kind = issue.split(":", 1)[0]
+        entry = self.issues.setdefault(kind, {"count": 0, "samples": []})
+        entry["count"] += 1
+        if len(entry["samples"]) < SAMPLE_URLS:
+            entry["samples"].append(url)
+
+    @staticmethod
+    def _keep_top(heap, value, url):
+        if value is None:
+            return
+        if len(heap) < TOP_PAGES:
+            heapq.heappush(heap, (value, url))
+        elif value > heap[0][0]:
+            heapq.heapreplace(heap, (value, url))
+
+    def add(self, page):
+        self.pages += 1
+        self.status[str(page["status"])] += 1
+        self.techs.update(page["stack"])
+        for issue in page["issues"]:
+            self._issue(issue, page["url"])
+
+        template = self.templates.setdefault(page["template"], {
+            "pages": 0, "plugins": Counter(), "stack": Counter(), "bytes": _Running(), "elapsed": _Running(),
+        })
+        template["pages"] += 1
+        template["plugins"].update(page["plugins"])
+        template["stack"].update(page["stack"])
+        template["bytes"].add(page["bytes"])
+        template["elapsed"].add(page["elapsed_ms"])
+
+        self.security.add(page["security_score"])
+        self.size.add(page["bytes"])
+        self.elapsed.add(page["elapsed_ms"])
+        self.ttfb.add(page["ttfb_ms"])
+        self._keep_top(self._slowest, page["elapsed_ms"], page["url"])
+        self._keep_top(self._heaviest, page["bytes"], page["url"])
+
+    def skip(self):
+        """Página não analisada (ex: 304 no re-crawl incremental)"""
+        self.skipped += 1
+
+    def summary(self):
+        """Resumo JSON-serializável (vai junto no resultado do crawl)"""
+        templates = {}
+        for name, t in sorted(self.templates.items(), key=lambda item: -item[1]["pages"]):
+            templates[name] = {
+                "pages": t["pages"],
+                "plugins": dict(t["plugins"].most_common()),
+                "stack": dict(t["stack"].most_common()),
+                "bytes": t["bytes"].summary(),
+                "elapsed_ms": t["elapsed"].summary(),
+            }
+        return {
+            "pages": self.pages,
+            "skipped": self.skipped,
+            "status": dict(self.status),
+            "stack": dict(self.techs.most_common()),
+            "issues": dict(sorted(self.issues.items(), key=lambda item: -item[1]["count"])),
+            "templates": templates,
+            "security_score": self.security.summary(),
+            "bytes": self.size.summary(),
+            "elapsed_ms": self.elapsed.summary(),
+            "ttfb_ms": self.ttfb.summary(),
+            "slowest": [{"url": u, "elapsed_ms": v} for v, u in sorted(self._slowest, reverse=True)],
+            "heaviest": [{"url": u, "bytes": v} for v, u in sorted(self._heaviest, reverse=True)],
+        }
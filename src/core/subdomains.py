@@ -0,0 +1,197 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from src.core.waterfall import registrable_domain
+from src.utils.net_cache import get_net_cache
+
+# Rótulos mais comuns (usado quando não há wordlist)
+COMMON_LABELS = (
+    "www", "mail", "webmail", "smtp", "pop", "imap", "mx", "ftp", "sftp", "vpn", "remote", "ns1", "ns2",
+    "dns", "api", "api2", "graphql", "app", "apps", "m", "mobile", "admin", "painel", "portal", "cpanel",
+    "whm", "webdisk", "autodiscover", "autoconfig", "dev", "develop", "staging", "stage", "hml",
+    "homolog", "homologacao", "qa", "test", "teste", "sandbox", "demo", "beta", "preview", "old", "new",
+    "legacy", "v1", "v2", "blog", "shop", "loja", "store", "checkout", "pay", "pagamento", "status",
+    "docs", "help", "ajuda", "suporte", "support", "wiki", "cdn", "static", "assets", "img", "images",
+    "media", "files", "download", "uploads", "s3", "git", "gitlab", "jenkins", "ci", "grafana", "kibana",
+    "monitor", "metrics", "sentry", "auth", "sso", "login", "id", "accounts", "dashboard", "intranet",
+    "crm", "erp", "jira", "confluence", "db", "mysql", "redis", "elastic", "search", "internal", "lab",
+)
+
+# Rótulos aleatórios resolvidos para detectar DNS curinga (*.dominio)
+WILDCARD_PROBES = 3
+
+
+class RateLimiter:
+    """Espaça as chamadas para no máximo ``rate`` por segundo (0 = sem limite)"""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self._next = 0.0
+
+    async def wait(self):
+        if not self.interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class SubdomainResolver:
+    """Resolver assíncrono com limite de consultas em voo, taxa e cache LRU.
+
+    Pode ser compartilhado entre vários domínios (batch): o cache evita
+    repetir o mesmo nome e o limite vale para o processo todo. Nomes que
+    resolvem também vão para o cache de rede do processo.
+    """
+
+    def __init__(self, concurrency=200, rate=500, cache_size=50000, lifetime=3):
+        import dns.asyncresolver
+        self._resolver = dns.asyncresolver.Resolver()
+        self._resolver.lifetime = lifetime
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._limiter = RateLimiter(rate)
+        self._cache = OrderedDict()
+        self.cache_size = cache_size
+        self.queries = 0
+        self.errors = 0
+
+    def _remember(self, host, ips):
+        self._cache[host] = ips
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def resolve(self, host):
+        """IPs (A) do nome; ``[]`` se não existe, ``None`` se a consulta falhou"""
+        if host in self._cache:
+            self._cache.move_to_end(host)
+            return self._cache[host]
+        shared = get_net_cache().cached_dns(host)
+        if shared is not None:
+            return shared
+        import dns.exception
+        import dns.resolver
+
+        await self._limiter.wait()
+        async with self._semaphore:
+            self.queries += 1
+            try:
+                answers = await self._resolver.resolve(host, "A")
+                ips = sorted(r.to_text() for r in answers)
+                # Hosts vivos vão para o cache do processo (o batch reaproveita)
+                get_net_cache().store_dns(host, ips, answers.rrset.ttl)
+            except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+                ips = []
+            except (dns.exception.DNSException, OSError):
+                # Timeout/SERVFAIL: não guarda no cache, pode ser transitório
+                self.errors += 1
+                return None
+        self._remember(host, ips)
+        return ips
+
+    async def wildcard_ips(self, domain):
+        """IPs que respondem para qualquer rótulo (vazio se não há curinga)"""
+        probes = [f"pfs-{uuid.uuid4().hex[:12]}.{domain}" for _ in range(WILDCARD_PROBES)]
+        found = set()
+        for ips in await asyncio.gather(*(self.resolve(p) for p in probes)):
+            found.update(ips or ())
+        return found
+
+
+def _clean_host(name, domain):
+    """Nome de certificado/link -> host do domínio, ou None (``*.x`` vira ``x``)"""
+    host = (name or "").strip().lower().rstrip(".")
+    if host.startswith("*."):
+        host = host[2:]
+    if host != domain and host.endswith("." + domain):
+        return host
+    return None
+
+
+def iter_wordlist(path):
+    """Rótulos do arquivo linha a linha (não carrega wordlists de 100k+ na memória)"""
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            label = line.strip().lower().strip(".")
+            if label and not label.startswith("#"):
+                yield label
+
+
+def iter_candidates(domain, wordlist=None, extra=()):
+    """Candidatos em streaming: nomes conhecidos (certificado/links) primeiro, depois a wordlist.
+
+    Só os nomes conhecidos são deduplicados (são poucos); a wordlist é
+    consumida sob demanda e repetições caem no cache do resolver.
+    """
+    known = {}
+    for name, source in extra:
+        host = _clean_host(name, domain)
+        if host and host not in known:
+            known[host] = source
+    for host, source in known.items():
+        yield host, source
+    labels = iter_wordlist(wordlist) if wordlist else COMMON_LABELS
+    for label in labels:
+        host = f"{label}.{domain}"
+        if host not in known:
+            yield host, "wordlist"
+
+
+def hosts_from_urls(urls):
+    """Hosts dos links do crawler (entrada para ``extra``)"""
+    hosts = (urlparse(u).hostname for u in urls)
+    return [(h, "link") for h in hosts if h]
+
+
+async def discover_subdomains(target, wordlist=None, extra=(), concurrency=200, rate=500,
+                              resolver=None, on_found=None):
+    """Descobre subdomínios vivos de ``target`` (URL ou host).
+
+    ``extra`` são pares ``(nome, origem)`` já conhecidos, ex: SANs do
+    certificado (``"cert"``) e hosts de links (``"link"``). Quando o domínio
+    tem DNS curinga, nomes que só resolvem para os IPs do curinga são
+    descartados. ``on_found(sub)`` é chamado assim que cada host vivo aparece.
+    """
+    start = time.perf_counter()
+    host = urlparse(target if "//" in target else "//" + target).hostname or target
+    domain = registrable_domain(host)
+    resolver = resolver or SubdomainResolver(concurrency, rate)
+    wildcard = await resolver.wildcard_ips(domain)
+
+    found = []
+    checked = 0
+    candidates = iter_candidates(domain, wordlist, extra)
+
+    # Mesmo esquema do batch: N workers puxando do mesmo gerador
+    async def worker():
+        nonlocal checked
+        for name, source in candidates:
+            ips = await resolver.resolve(name)
+            checked += 1
+            if not ips or (wildcard and set(ips) <= wildcard):
+                continue
+            sub = {"host": name, "ips": ips, "source": source}
+            found.append(sub)
+            if on_found: on_found(sub)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    return {
+        "domain": domain,
+        "wildcard": sorted(wildcard),
+        "subdomains": sorted(found, key=lambda s: s["host"]),
+        "checked": checked,
+        "errors": resolver.errors,
+        "elapsed_ms": int((time.perf_counter() - start) * 1000),
+    }
+
+
+def live_hosts_file(subdomains, path):
+    """Grava os hosts vivos um por linha (entrada direta do ``perfscan batch``)"""
+    with open(path, "w", encoding="utf-8") as f:
+        for sub in subdomains:
+            f.write(sub["host"] + "\n")
+    return path
@@ -0,0 +1,154 @@
+import json
+from collections import Counter
+from datetime import datetime
+from urllib.parse import urlparse
+
+# Tipos que deveriam vir comprimidos (gzip/br/zstd)
+COMPRESSIBLE = ("text/", "javascript", "json", "xml", "svg", "font/ttf", "font/otf")
+# Abaixo disso compressão não compensa
+MIN_COMPRESS_BYTES = 1024
+SLOW_REQUEST_MS = 1000
+
+
+def _ms(value):
+    """HAR usa -1 para fase que não aconteceu (ex: conexão reaproveitada)"""
+    if value is None or value < 0:
+        return 0
+    return round(value, 1)
+
+
+def registrable_domain(host):
+    """Domínio "registrável" aproximado (últimos dois rótulos, três para .com.br etc.)"""
+    labels = host.split(".")
+    if len(labels) > 2 and len(labels[-1]) == 2 and labels[-2] in ("com", "net", "org", "gov", "edu", "co"):
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def _iso_ms(value):
+    """startedDateTime (ISO 8601) em ms, para ordenar e montar o offset da cascata"""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000
+    except:
+        return 0
+
+
+def parse_har(har, page_url):
+    """Linhas compactas (uma por request) a partir do HAR gravado pelo Playwright"""
+    first_party = registrable_domain(urlparse(page_url).hostname or "")
+    entries = har.get("log", {}).get("entries", [])
+    if not entries:
+        return []
+    started = [_iso_ms(e.get("startedDateTime")) for e in entries]
+    t0 = min(started)
+
+    rows = []
+    for entry, start in zip(entries, started):
+        request, response = entry.get("request", {}), entry.get("response", {})
+        timings = entry.get("timings", {})
+        headers = {h["name"].lower(): h["value"] for h in response.get("headers", [])}
+        content = response.get("content", {})
+        host = urlparse(request.get("url", "")).hostname or ""
+        transfer = response.get("_transferSize")
+        if transfer is None or transfer < 0:
+            transfer = max(0, response.get("bodySize", 0) or 0) + max(0, response.get("headersSize", 0) or 0)
+        rows.append({
+            "url": request.get("url", ""),
+            "host": host,
+            "third_party": registrable_domain(host) != first_party,
+            "status": response.get("status"),
+            "type": (content.get("mimeType") or "").split(";")[0],
+            "protocol": response.get("httpVersion") or "",
+            "start_ms": _ms(start - t0),
+            "dns_ms": _ms(timings.get("dns")),
+            "connect_ms": _ms(timings.get("connect")),
+            "tls_ms": _ms(timings.get("ssl")),
+            "ttfb_ms": _ms(timings.get("wait")),
+            "download_ms": _ms(timings.get("receive")),
+            "total_ms": _ms(entry.get("time")),
+            "transfer_bytes": transfer,
+            "body_bytes": max(0, content.get("size", 0) or 0),
+            "encoding": headers.get("content-encoding", ""),
+            "cache_control": headers.get("cache-control", ""),
+            "cache_status": headers.get("cf-cache-status") or headers.get("x-cache") or headers.get("x-vercel-cache") or "",
+        })
+    rows.sort(key=lambda r: r["start_ms"])
+    return rows
+
+
+def uncompressed(row):
+    return (not row["encoding"] and row["body_bytes"] >= MIN_COMPRESS_BYTES
+            and any(t in row["type"] for t in COMPRESSIBLE))
+
+
+def uncacheable(row):
+    """Asset estático (não o HTML) sem cache HTTP de longa duração"""
+    if row["status"] != 200 or row["type"] in ("", "text/html"):
+        return False
+    cache = row["cache_control"].lower()
+    return "no-store" in cache or "max-age" not in cache and "immutable" not in cache
+
+
+def summarize(rows):
+    """Onde está a lentidão: totais, terceiros, piores requests e assets sem compressão/cache"""
+    if not rows:
+        return {"requests": 0}
+    hosts = {}
+    for row in rows:
+        h = hosts.setdefault(row["host"], {"requests": 0, "bytes": 0, "time_ms": 0, "third_party": row["third_party"]})
+        h["requests"] += 1
+        h["bytes"] += row["transfer_bytes"]
+        h["time_ms"] = round(h["time_ms"] + row["total_ms"], 1)
+
+    slowest = sorted(rows, key=lambda r: -r["total_ms"])[:10]
+    return {
+        "requests": len(rows),
+        "transfer_bytes": sum(r["transfer_bytes"] for r in rows),
+        "body_bytes": sum(r["body_bytes"] for r in rows),
+        "finished_ms": round(max(r["start_ms"] + r["total_ms"] for r in rows), 1),
+        "protocols": dict(Counter(r["protocol"] or "?" for r in rows)),
+        "third_party": {
+            "requests": sum(1 for r in rows if r["third_party"]),
+            "bytes": sum(r["transfer_bytes"] for r in rows if r["third_party"]),
+        },
+        "hosts": dict(sorted(hosts.items(), key=lambda item: -item[1]["time_ms"])[:10]),
+        "slowest": [{"url": r["url"], "total_ms": r["total_ms"], "ttfb_ms": r["ttfb_ms"]} for r in slowest],
+        "slow_requests": sum(1 for r in rows if r["total_ms"] >= SLOW_REQUEST_MS),
+        "uncompressed": [{"url": r["url"], "bytes": r["body_bytes"]} for r in rows if uncompressed(r)][:20],
+        "uncached": sum(1 for r in rows if uncacheable(r) and not r["third_party"]),
+    }
+
+
+def load_har(path, page_url):
+    """Lê o HAR exportado e devolve ``(linhas, resumo)``"""
+    with open(path, "r", encoding="utf-8") as f:
+        har = json.load(f)
+    rows = parse_har(har, page_url)
+    return rows, summarize(rows)
+
+
+def _short(url, size=60):
+    parsed = urlparse(url)
+    text = (parsed.hostname or "") + parsed.path
+    return text if len(text) <= size else "…" + text[-(size - 1):]
+
+
+def top_rows(rows, limit=25):
+    """Os ``limit`` requests mais lentos, mantendo a ordem da cascata"""
+    keep = {id(r) for r in sorted(rows, key=lambda r: -r["total_ms"])[:limit]}
+    return [r for r in rows if id(r) in keep]
+
+
+def waterfall_table(rows):
+    """Tabela Markdown compacta, uma linha por request (use ``top_rows`` antes)"""
+    if not rows:
+        return ""
+    lines = ["| Início | Recurso | Proto | DNS | Conn | TLS | TTFB | Down | Total | KB | Enc | Cache |",
+             "|---|---|---|---|---|---|---|---|---|---|---|---|"]
+    for r in rows:
+        lines.append("| {:.0f} | {}{} | {} | {:.0f} | {:.0f} | {:.0f} | {:.0f} | {:.0f} | {:.0f} | {:.1f} | {} | {} |".format(
+            r["start_ms"], _short(r["url"]), " ⚠️" if uncompressed(r) else "", r["protocol"] or "-",
+            r["dns_ms"], r["connect_ms"], r["tls_ms"], r["ttfb_ms"], r["download_ms"], r["total_ms"],
+            r["transfer_bytes"] / 1024, r["encoding"] or "-", (r["cache_control"] or "-")[:24],
+        ))
+    return "\n".join(lines)
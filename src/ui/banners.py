@@ -1,7 +1,6 @@
 import random
 import string
 import time
-from datetime import datetime
 from rich.console import Console
 from rich.panel import Panel
 from rich.live import Live
@@ -11,12 +10,12 @@ from rich.table import Table
 from rich.prompt import IntPrompt
 from rich import box
 import pyfiglet
-import os
 
 console = Console()
 
 def clear_screen():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    # Sequência ANSI do rich em vez de subir um processo `clear`/`cls`
+    console.clear()
 
 def show_intro():
     clear_screen()
@@ -1,6 +1,8 @@
-import random
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
 from rich.align import Align
@@ -9,21 +11,90 @@ from rich.table import Table
 from rich.layout import Layout
 from rich import box
 
-def generate_sparkline(data_points):
+HISTORY = 20
+# Intervalo entre amostras de CPU/rede (o quadro roda mais rápido que isso)
+VITALS_INTERVAL = 0.5
+
+def generate_sparkline(data_points, peak=100):
     bars = "  ▂▃▅▆▇"
-    return "".join([bars[min(int(x / 15), len(bars)-1)] for x in data_points])
+    scale = 100 / peak if peak else 0
+    return "".join([bars[min(int(x * scale / 15), len(bars)-1)] for x in data_points])
+
+class SystemVitals:
+    """CPU da máquina e vazão de rede reais, via psutil (se instalado) ou /proc.
+
+    CPU é da máquina toda, não só deste processo: o trabalho pesado roda nos
+    Chromes e no Lighthouse, que são processos filhos.
+    """
+
+    def __init__(self):
+        try:
+            import psutil
+            self._psutil = psutil
+        except ImportError:
+            self._psutil = None
+        self._last = self._read()
+
+    def _read(self):
+        """``(instante, cpu_ocupada, cpu_total, bytes_rede)`` ou None sem fonte disponível"""
+        now = time.monotonic()
+        try:
+            if self._psutil:
+                cpu = self._psutil.cpu_times()
+                total = sum(cpu)
+                busy = total - cpu.idle - getattr(cpu, "iowait", 0)
+                net = self._psutil.net_io_counters()
+                return now, busy, total, net.bytes_recv + net.bytes_sent
+            with open("/proc/stat", "r") as f:
+                fields = [int(v) for v in f.readline().split()[1:]]
+            total = sum(fields[:8])
+            busy = total - fields[3] - fields[4]  # idle + iowait
+            net_bytes = 0
+            with open("/proc/net/dev", "r") as f:
+                for line in f.readlines()[2:]:
+                    name, data = line.split(":", 1)
+                    if name.strip() == "lo": continue
+                    cols = data.split()
+                    net_bytes += int(cols[0]) + int(cols[8])
+            return now, busy, total, net_bytes
+        except:
+            return None
+
+    def sample(self):
+        """``(cpu_%, rede_Mb/s)`` desde a última amostra, ou None"""
+        current = self._read()
+        last, self._last = self._last, current
+        if current is None or last is None or current[2] <= last[2]:
+            return None
+        cpu = 100 * (current[1] - last[1]) / (current[2] - last[2])
+        mbps = (current[3] - last[3]) * 8 / (current[0] - last[0]) / 1e6
+        return round(cpu), round(mbps, 1)
 
 class NeuralDashboard:
-    def __init__(self, url):
+    """Estado do painel alimentado por uma fila de eventos.
+
+    Os estágios (qualquer thread) só chamam ``update_logs``, ``set_status``,
+    ``set_progress`` etc., que enfileiram e retornam na hora; quem aplica os
+    eventos e redesenha é o loop de ``live_dashboard``, no próprio ritmo. O
+    ``Layout`` é montado uma vez e só as regiões que mudaram são refeitas.
+    Com ``enabled=False`` (``--no-ui``) os eventos são descartados.
+    """
+
+    def __init__(self, url, enabled=True):
         self.url = url
+        self.enabled = enabled
+        self.events = queue.SimpleQueue()
         self.logs = []
         self.stack = ["Analyzing signatures..."]
         self.security_score = "PENDING"
         self.status_msg = "INITIALIZING"
-        
-        self.cpu_history = [random.randint(10, 30) for _ in range(20)]
-        self.net_history = [random.randint(0, 10) for _ in range(20)]
-        
+        self.ai_text = ""
+
+        self.vitals = SystemVitals()
+        self.cpu_history = [0] * HISTORY
+        self.net_history = [0.0] * HISTORY
+        self._last_vitals = 0.0
+
         self.progress = Progress(
             SpinnerColumn("dots12", style="bold #00ff00"),
             TextColumn("[bold #00ff00]{task.description}"),
@@ -32,26 +103,94 @@ class NeuralDashboard:
             expand=True
         )
         self.task_id = self.progress.add_task("Booting...", total=100)
+        self.layout = self._build_layout()
+        self._dirty = {"left", "logs", "right"}
+
+    # --- Produtores (qualquer thread) ---
+
+    def emit(self, kind, *args):
+        if self.enabled:
+            self.events.put((kind, args))
 
     def update_logs(self, msg):
-        ts = datetime.now().strftime("%H:%M:%S")
-        self.logs.append(f"[dim green]>{ts}[/] {msg}")
-        if len(self.logs) > 10: self.logs.pop(0)
+        self.emit("log", msg)
+
+    def stream_ai(self, token):
+        """Acumula os tokens que a IA vai gerando (chamado da thread do LLM)"""
+        self.emit("ai", token)
+
+    def set_status(self, msg):
+        self.emit("status", msg)
+
+    def set_progress(self, completed, description=None):
+        self.emit("progress", completed, description)
+
+    def set_stack(self, stack):
+        self.emit("stack", list(stack))
+
+    def set_security(self, score):
+        self.emit("security", score)
+
+    # --- Consumidor (loop de render) ---
+
+    def _apply(self, kind, args):
+        if kind == "log":
+            ts = datetime.now().strftime("%H:%M:%S")
+            self.logs.append(f"[dim green]>{ts}[/] {args[0]}")
+            if len(self.logs) > 10: self.logs.pop(0)
+            self._dirty.add("logs")
+        elif kind == "ai":
+            self.ai_text += args[0]
+            self._dirty.add("stream")
+        elif kind == "status":
+            self.status_msg = args[0]
+        elif kind == "progress":
+            completed, description = args
+            self.progress.update(self.task_id, completed=completed, description=description or self.status_msg)
+        elif kind == "stack":
+            self.stack = args[0]
+            self._dirty.add("right")
+        elif kind == "security":
+            self.security_score = str(args[0])
+            self._dirty.add("right")
+
+    def drain(self):
+        while True:
+            try:
+                kind, args = self.events.get_nowait()
+            except queue.Empty:
+                return
+            self._apply(kind, args)
 
     def tick(self):
-        self.cpu_history.pop(0)
-        self.cpu_history.append(random.randint(20, 90))
-        self.net_history.pop(0)
-        self.net_history.append(random.randint(10, 100))
+        """Nova amostra de CPU/rede (no máximo a cada VITALS_INTERVAL)"""
+        now = time.monotonic()
+        if now - self._last_vitals < VITALS_INTERVAL:
+            return
+        self._last_vitals = now
+        sample = self.vitals.sample()
+        if sample is None:
+            return
+        self.cpu_history = self.cpu_history[1:] + [sample[0]]
+        self.net_history = self.net_history[1:] + [sample[1]]
+        self._dirty.add("left")
+
+    def _build_layout(self):
+        layout = Layout()
+        layout.split_column(Layout(name="header", size=3), Layout(name="body", ratio=1), Layout(name="footer", size=4))
+        layout["body"].split_row(Layout(name="left", size=30), Layout(name="center", ratio=2), Layout(name="right", size=30))
+        layout["center"].split_column(Layout(name="logs", ratio=1), Layout(name="stream", ratio=1, visible=False))
+        layout["footer"].update(Panel(self.progress, border_style="green", box=box.DOUBLE))
+        return layout
 
     def get_header(self):
         grid = Table.grid(expand=True)
         grid.add_column(justify="left", ratio=1)
         grid.add_column(justify="center", ratio=1)
         grid.add_column(justify="right", ratio=1)
-        
+
         status_color = "green" if self.status_msg == "SCANNING" else "cyan"
-        
+
         grid.add_row(
             Text(" PERFSCAN v6.0 ", style="bold black on #00ff00"),
             Text(f" ◉ STATUS: {self.status_msg} ", style=f"bold {status_color}"),
@@ -59,29 +198,18 @@ class NeuralDashboard:
         )
         return Panel(grid, style="green", box=box.HEAVY_EDGE)
 
-    def make_layout(self):
-        layout = Layout()
-        layout.split_column(Layout(name="header", size=3), Layout(name="body", ratio=1), Layout(name="footer", size=4))
-        layout["body"].split_row(Layout(name="left", size=30), Layout(name="center", ratio=2), Layout(name="right", size=30))
-        
-        layout["header"].update(self.get_header())
-        
-        # Left Vitals
+    def _vitals_panel(self):
         cpu_graph = generate_sparkline(self.cpu_history)
-        net_graph = generate_sparkline(self.net_history)
+        net_graph = generate_sparkline(self.net_history, peak=max(self.net_history) or 1)
         vitals_grid = Table.grid(expand=True)
         vitals_grid.add_row(f"[bold]CORE LOAD[/] [dim]{self.cpu_history[-1]}%[/]")
         vitals_grid.add_row(f"[red]{cpu_graph}[/]")
         vitals_grid.add_row("")
         vitals_grid.add_row(f"[bold]NET UPLINK[/] [dim]{self.net_history[-1]} Mb/s[/]")
         vitals_grid.add_row(f"[cyan]{net_graph}[/]")
-        layout["left"].update(Panel(vitals_grid, title="SYSTEM VITALS", border_style="dim green", box=box.ROUNDED))
-        
-        # Center Logs
-        log_text = "\n".join(self.logs)
-        layout["center"].update(Panel(Align.left(log_text, vertical="bottom"), title="[bold green] NEURAL LINK OUTPUT [/]", border_style="#00ff00", box=box.HEAVY))
-        
-        # Right Intel
+        return Panel(vitals_grid, title="SYSTEM VITALS", border_style="dim green", box=box.ROUNDED)
+
+    def _intel_panel(self):
         intel_grid = Table.grid(expand=True)
         intel_grid.add_row("[bold underline white]TARGET[/]")
         intel_grid.add_row(f"[cyan]{self.url.replace('https://', '')[:22]}[/]")
@@ -91,7 +219,7 @@ class NeuralDashboard:
             intel_grid.add_row(f"[magenta]⚡ {tech}[/]")
         intel_grid.add_row("")
         intel_grid.add_row("[bold underline white]SECURITY RATING[/]")
-        
+
         if self.security_score == "PENDING":
             intel_grid.add_row("[yellow blink]CALCULATING...[/]")
         else:
@@ -100,8 +228,53 @@ class NeuralDashboard:
                 color = "green" if score_val > 80 else "red"
                 intel_grid.add_row(f"[bold {color} reverse]  {score_val}/100  [/]")
             except: intel_grid.add_row(str(self.security_score))
+        return Panel(intel_grid, title="TARGET INTEL", border_style="cyan", box=box.ROUNDED)
 
-        layout["right"].update(Panel(intel_grid, title="TARGET INTEL", border_style="cyan", box=box.ROUNDED))
-        layout["footer"].update(Panel(self.progress, border_style="green", box=box.DOUBLE))
-        
-        return layout
\ No newline at end of file
+    def make_layout(self):
+        """Aplica os eventos pendentes e refaz só as regiões que mudaram"""
+        self.drain()
+        self.tick()
+        dirty, self._dirty = self._dirty, set()
+        layout = self.layout
+
+        layout["header"].update(self.get_header())
+        if "left" in dirty:
+            layout["left"].update(self._vitals_panel())
+        if "logs" in dirty:
+            log_text = "\n".join(self.logs)
+            layout["logs"].update(Panel(Align.left(log_text, vertical="bottom"), title="[bold green] NEURAL LINK OUTPUT [/]", border_style="#00ff00", box=box.HEAVY))
+        if "stream" in dirty:
+            # Streaming da IA: mostra só a cauda do texto que está sendo escrito
+            tail = "\n".join(self.ai_text[-4000:].splitlines()[-12:])
+            layout["stream"].visible = True
+            layout["stream"].update(Panel(Align.left(Text(tail), vertical="bottom"), title="[bold magenta] LIVE DOSSIER [/]", border_style="magenta", box=box.HEAVY))
+        if "right" in dirty:
+            layout["right"].update(self._intel_panel())
+        return layout
+
+@contextmanager
+def live_dashboard(dash, console, fps=15):
+    """Redesenha ``dash`` a ``fps`` quadros/s numa thread própria.
+
+    O trabalho (loop asyncio, threads dos estágios) nunca espera animação:
+    só enfileira eventos. Ao sair desenha o quadro final. Com o painel
+    desligado (``--no-ui``) não abre nada.
+    """
+    if not dash.enabled:
+        yield dash
+        return
+    from rich.live import Live
+    stop = threading.Event()
+    with Live(dash.make_layout(), console=console, auto_refresh=False) as live:
+        def loop():
+            while not stop.wait(1 / fps):
+                live.update(dash.make_layout(), refresh=True)
+
+        renderer = threading.Thread(target=loop, name="dashboard", daemon=True)
+        renderer.start()
+        try:
+            yield dash
+        finally:
+            stop.set()
+            renderer.join()
+            live.update(dash.make_layout(), refresh=True)
@@ -0,0 +1,56 @@
+import subprocess
+import sys
+
+# Só podem carregar quando o estágio que usa roda (nunca no boot da CLI)
+HEAVY_MODULES = ("playwright", "markdown_it", "dns", "rich", "requests", "pyfiglet")
+
+# Orçamento padrão do import de cada entrada (ms, cumulativo)
+DEFAULT_BUDGETS = {
+    "main": 40,
+    "src.core.batch": 150,
+}
+
+
+def parse_importtime(stderr):
+    """Linhas do ``-X importtime`` -> ``{módulo: (self_us, cumulativo_us)}``"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # cabeçalho "self [us] | cumulative | imported package"
+        modules[parts[2].strip()] = (self_us, cumulative_us)
+    return modules
+
+
+def measure_import(module, python=None):
+    """Importa ``module`` num interpretador novo e devolve o que foi carregado e quanto custou"""
+    proc = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=False,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"import {module} falhou")
+    modules = parse_importtime(proc.stderr)
+    return {
+        "module": module,
+        "ms": round(modules.get(module, (0, 0))[1] / 1000, 1),
+        "heavy": sorted({name.split(".")[0] for name in modules} & set(HEAVY_MODULES)),
+        "slowest": sorted(((n, round(c / 1000, 1)) for n, (_, c) in modules.items() if n != module),
+                          key=lambda item: -item[1])[:5],
+    }
+
+
+def check_budgets(budgets=None, runs=3):
+    """Mede cada entrada ``runs`` vezes (vale a menor) e aponta estouro ou módulo pesado no boot"""
+    results = []
+    for module, budget_ms in (budgets or DEFAULT_BUDGETS).items():
+        samples = [measure_import(module) for _ in range(max(1, runs))]
+        best = min(samples, key=lambda r: r["ms"])
+        best["budget_ms"] = budget_ms
+        best["ok"] = best["ms"] <= budget_ms and not best["heavy"]
+        results.append(best)
+    return results
@@ -0,0 +1,175 @@
+import asyncio
+import ipaddress
+import socket
+import ssl
+import threading
+import time
+from datetime import datetime
+
+
+class NetCache:
+    """DNS e fatos do TLS compartilhados pelo processo inteiro.
+
+    Recon, checagem de SSL, subdomínios e os Chromes do Lighthouse leem
+    daqui, então um scan (ou um batch cheio de URLs do mesmo domínio)
+    resolve cada host uma vez por TTL e faz um handshake só por
+    ``host:porta``. Seguro para várias threads: chamadas simultâneas para a
+    mesma chave esperam a primeira em vez de repetir a consulta.
+    """
+
+    def __init__(self, default_ttl=60, negative_ttl=30, min_ttl=5, max_ttl=3600, tls_ttl=3600):
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self.tls_ttl = tls_ttl
+        self._dns = {}
+        self._tls = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, table, key):
+        with self._lock:
+            entry = table.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+        return None
+
+    def _put(self, table, key, value, ttl):
+        with self._lock:
+            table[key] = (time.monotonic() + ttl, value)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    # --- DNS ---
+
+    def _query_dns(self, host):
+        """``(ips, ttl)``: TTL real via dnspython; hosts/sem dnspython caem no getaddrinfo"""
+        try:
+            ipaddress.ip_address(host)
+            return [host], self.max_ttl
+        except ValueError:
+            pass
+        try:
+            import dns.resolver
+            answer = dns.resolver.resolve(host, "A", lifetime=3)
+            ips = sorted(r.to_text() for r in answer)
+            return ips, min(self.max_ttl, max(self.min_ttl, answer.rrset.ttl))
+        except:
+            pass
+        try:
+            infos = socket.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        except OSError:
+            return [], self.negative_ttl
+        # IPv4 primeiro, sem repetir
+        ips = list(dict.fromkeys(i[4][0] for i in sorted(infos, key=lambda i: i[0] != socket.AF_INET)))
+        return ips, self.default_ttl
+
+    def resolve(self, host):
+        """IPs do host (``[]`` se não resolve), respeitando o TTL do registro"""
+        host = (host or "").lower().rstrip(".")
+        cached = self._get(self._dns, host)
+        if cached is not None:
+            return cached
+        with self._key_lock(("dns", host)):
+            cached = self._get(self._dns, host)
+            if cached is not None:
+                return cached
+            self.misses += 1
+            ips, ttl = self._query_dns(host)
+            self._put(self._dns, host, ips, ttl)
+            return ips
+
+    async def resolve_async(self, host):
+        cached = self._get(self._dns, (host or "").lower().rstrip("."))
+        if cached is not None:
+            return cached
+        return await asyncio.to_thread(self.resolve, host)
+
+    def store_dns(self, host, ips, ttl=None):
+        """Registra uma resposta obtida por fora (ex: resolver de subdomínios)"""
+        ttl = self.default_ttl if ttl is None else min(self.max_ttl, max(self.min_ttl, ttl))
+        self._put(self._dns, host.lower().rstrip("."), list(ips), ttl)
+
+    def cached_dns(self, host):
+        """Só o que já está no cache (sem consultar)"""
+        return self._get(self._dns, host.lower().rstrip("."))
+
+    def host_resolver_rules(self, hosts):
+        """Valor de ``--host-resolver-rules`` do Chromium para os hosts já resolvidos"""
+        rules = []
+        for host in hosts:
+            ips = self.resolve(host)
+            if not ips or host == ips[0]:
+                continue
+            ip = ips[0]
+            rules.append(f"MAP {host} {'[' + ip + ']' if ':' in ip else ip}")
+        return ",".join(rules)
+
+    # --- TLS ---
+
+    def _handshake(self, host, port, timeout):
+        ips = self.resolve(host)
+        if not ips:
+            return {"error": "DNS não resolve"}
+        context = ssl.create_default_context()
+        context.set_alpn_protocols(["h2", "http/1.1"])
+        try:
+            with socket.create_connection((ips[0], port), timeout=timeout) as sock:
+                with context.wrap_socket(sock, server_hostname=host) as ssock:
+                    cert = ssock.getpeercert()
+                    return {
+                        "not_after": cert["notAfter"],
+                        "sans": [value for kind, value in cert.get("subjectAltName", ()) if kind == "DNS"],
+                        "issuer": dict(x[0] for x in cert.get("issuer", ())).get("organizationName"),
+                        "protocol": ssock.version(),
+                        "cipher": ssock.cipher()[0],
+                        "alpn": ssock.selected_alpn_protocol(),
+                        # O módulo ssl não expõe a resposta OCSP grampeada
+                        "ocsp_stapling": None,
+                    }
+        except Exception as e:
+            return {"error": str(e)}
+
+    def tls_facts(self, host, port=443, timeout=3):
+        """Certificado/protocolo/cifra de ``host:port`` (um handshake por TTL)"""
+        key = (host.lower(), port)
+        cached = self._get(self._tls, key)
+        if cached is not None:
+            return cached
+        with self._key_lock(("tls",) + key):
+            cached = self._get(self._tls, key)
+            if cached is not None:
+                return cached
+            self.misses += 1
+            facts = self._handshake(host, port, timeout)
+            self._put(self._tls, key, facts, self.negative_ttl if "error" in facts else self.tls_ttl)
+            return facts
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "hosts": len(self._dns), "tls": len(self._tls)}
+
+
+def cert_days_left(not_after):
+    """Dias até ``notAfter`` (formato: May 30 12:00:00 2025 GMT), calculado na hora da leitura"""
+    expiry_date = datetime.strptime(not_after, "%b %d %H:%M:%S %Y %Z")
+    return (expiry_date - datetime.now()).days
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_net_cache():
+    """Cache global do processo (criado no primeiro uso)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = NetCache()
+        return _cache
@@ -1,11 +1,10 @@
-import os
-from playwright.sync_api import sync_playwright
-from markdown_it import MarkdownIt
+from src.core.browser_pool import get_browser_pool
 
 def generate_pdf(report_md, filename):
     """
     Converte o relatório Markdown em um PDF Cyberpunk Profissional.
     """
+    from markdown_it import MarkdownIt
     md = MarkdownIt()
     html_content = md.render(report_md)
     
@@ -33,13 +32,11 @@ def generate_pdf(report_md, filename):
     </html>
     """
     
-    # Salva o PDF usando Playwright
+    # Salva o PDF usando o Chromium compartilhado (já quente depois do scan)
     pdf_path = filename.replace(".md", ".pdf")
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
+    with get_browser_pool().context() as context:
+        page = context.new_page()
         page.set_content(full_html)
         page.pdf(path=pdf_path, format="A4")
-        browser.close()
         
     return pdf_path
\ No newline at end of file
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join(".perfscan", "ai_cache.sqlite")
+
+
+def cache_key(*parts):
+    """Hash estável (sha256) de qualquer combinação JSON-serializável"""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """Cache persistente de relatórios da IA, endereçado pelo conteúdo.
+
+    Entradas expiram após ``ttl`` segundos e, quando o total passa de
+    ``max_bytes``, as menos usadas recentemente saem primeiro (LRU pelo
+    ``last_access``). Seguro para várias threads (modo batch).
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=7 * 86400, max_bytes=50 * 1024 * 1024):
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder): os.makedirs(folder)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS reports (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_reports_access ON reports(last_access)")
+        self.db.commit()
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self.db.execute("SELECT value, created_at FROM reports WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self.db.execute("DELETE FROM reports WHERE key = ?", (key,))
+                    self.db.commit()
+                self.misses += 1
+                return None
+            self.db.execute("UPDATE reports SET last_access = ? WHERE key = ?", (now, key))
+            self.db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, value):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO reports (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now),
+            )
+            self._evict(now)
+            self.db.commit()
+
+    def _evict(self, now):
+        self.db.execute("DELETE FROM reports WHERE created_at < ?", (now - self.ttl,))
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM reports").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM reports ORDER BY last_access").fetchall():
+            self.db.execute("DELETE FROM reports WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        with self._lock:
+            entries, total = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM reports").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": entries,
+            "bytes": total,
+        }
+
+    def clear(self):
+        with self._lock:
+            self.db.execute("DELETE FROM reports")
+            self.db.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_report_cache():
+    """Cache global do processo (aberto no primeiro uso)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ReportCache()
+        return _cache
@@ -0,0 +1,72 @@
+import math
+import statistics
+
+# t de Student bicaudal 95% por graus de liberdade (acima de 30 ~ normal)
+T95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262,
+       10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 25: 2.060, 30: 2.042}
+
+
+def _t95(df):
+    if df > 30:
+        return 1.96
+    # Tabela esparsa: usa o df tabelado imediatamente abaixo (mais conservador)
+    return T95[max(k for k in T95 if k <= df)]
+
+
+def percentile(sorted_values, p):
+    """Percentil com interpolação linear (mesmo método do numpy padrão)"""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * p / 100
+    lo = math.floor(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def median_ci95(sorted_values):
+    """IC 95% da mediana por estatística de ordem (sem supor distribuição normal)"""
+    n = len(sorted_values)
+    if n < 6:
+        # Com menos de 6 amostras o intervalo seria o próprio mín/máx
+        return None
+    half = 1.96 * math.sqrt(n) / 2
+    lo = max(0, math.floor(n / 2 - half))
+    hi = min(n - 1, math.ceil(n / 2 + half) - 1)
+    return [sorted_values[lo], sorted_values[hi]]
+
+
+def describe(samples, digits=1):
+    """Resumo de uma série: mediana, p75, p95, desvio padrão e ICs 95%.
+
+    ``ci95_mean`` usa t de Student; ``ci95_median`` é livre de distribuição
+    (melhor para latência, que tem cauda longa). Amostras ``None`` (run
+    que falhou) são ignoradas.
+    """
+    values = sorted(v for v in samples if v is not None)
+    n = len(values)
+    if not n:
+        return {"n": 0}
+
+    def r(v):
+        return None if v is None else round(v, digits)
+
+    mean = statistics.fmean(values)
+    stdev = statistics.stdev(values) if n > 1 else 0.0
+    ci_mean = None
+    if n > 1:
+        margin = _t95(n - 1) * stdev / math.sqrt(n)
+        ci_mean = [r(mean - margin), r(mean + margin)]
+    ci_median = median_ci95(values)
+    return {
+        "n": n,
+        "median": r(percentile(values, 50)),
+        "p75": r(percentile(values, 75)),
+        "p95": r(percentile(values, 95)),
+        "mean": r(mean),
+        "stdev": r(stdev),
+        "min": r(values[0]),
+        "max": r(values[-1]),
+        "cv": round(stdev / mean, 3) if mean else None,  # coeficiente de variação
+        "ci95_mean": ci_mean,
+        "ci95_median": [r(v) for v in ci_median] if ci_median else None,
+    }
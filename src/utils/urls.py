@@ -0,0 +1,90 @@
+from collections import deque
+from urllib.parse import urlsplit, urlunsplit, urljoin
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url, base=None):
+    """Forma canônica única de URL usada por todo o crawler.
+
+    Resolve relativos contra ``base``, remove fragmento, porta padrão e barra
+    final, baixa o host para minúsculas e ordena os pares da query string
+    sem decodificar (``%20``, ``?flag`` etc. ficam como vieram). Retorna
+    ``None`` para esquemas que não são http(s).
+    """
+    if base:
+        url = urljoin(base, url)
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS:
+        return None
+
+    host = (parts.hostname or "").rstrip(".")
+    if not host:
+        return None
+    # hostname tira os colchetes do IPv6; sem eles a porta fica ambígua
+    netloc = f"[{host}]" if ":" in host else host
+    if port and port != DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    if parts.username:
+        auth = parts.username + (f":{parts.password}" if parts.password else "")
+        netloc = f"{auth}@{netloc}"
+
+    path = parts.path.rstrip("/")
+    query = "&".join(sorted(piece for piece in parts.query.split("&") if piece))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+class OrderedSet:
+    """Conjunto com ordem de inserção (dict por baixo, tudo O(1))"""
+
+    def __init__(self, items=()):
+        self._items = dict.fromkeys(items)
+
+    def add(self, item):
+        if item in self._items:
+            return False
+        self._items[item] = None
+        return True
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class CrawlFrontier:
+    """Fila FIFO + conjunto de vistos: push/pop/membership em O(1)"""
+
+    def __init__(self, seeds=()):
+        self._queue = deque()
+        self._seen = set()
+        for url in seeds:
+            self.push(url)
+
+    def push(self, url, depth=0):
+        """Enfileira a URL se ela nunca foi vista. Retorna True se entrou."""
+        if url in self._seen:
+            return False
+        self._seen.add(url)
+        self._queue.append((url, depth))
+        return True
+
+    def pop(self):
+        """Próxima ``(url, profundidade)`` ou None se a fila acabou"""
+        return self._queue.popleft() if self._queue else None
+
+    def seen(self, url):
+        return url in self._seen
+
+    def __len__(self):
+        return len(self._queue)
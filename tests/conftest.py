@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Testes importam ``src.*`` a partir da raiz, de onde quer que o pytest rode
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
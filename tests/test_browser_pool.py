@@ -0,0 +1,28 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.core.browser_pool import BrowserPool
+
+
+def test_borrow_then_asyncio_run_on_same_thread():
+    # run_dag reaproveita as threads do to_thread: depois de um empréstimo,
+    # o recon/measure da mesma thread ainda precisa conseguir rodar asyncio.run
+    pytest.importorskip("playwright.sync_api")
+    pool = BrowserPool(max_contexts=1)
+
+    def borrow():
+        with pool.context() as ctx:
+            ctx.new_page().close()
+
+    try:
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            try:
+                executor.submit(borrow).result()
+            except Exception as e:  # sem `playwright install` não há o que testar
+                pytest.skip(f"Chromium indisponível: {e}")
+            assert pool._executable_path
+            assert executor.submit(asyncio.run, asyncio.sleep(0, "ok")).result() == "ok"
+    finally:
+        pool.close()
@@ -0,0 +1,22 @@
+import main
+
+
+def crawl_options(monkeypatch, argv):
+    captured = {}
+    monkeypatch.setattr(main, "interactive", lambda **kwargs: captured.update(kwargs))
+    main.main(argv)
+    return captured["crawl_options"]
+
+
+def test_crawl_defaults_to_browser(monkeypatch):
+    assert crawl_options(monkeypatch, ["--no-ui"])["mode"] == "browser"
+
+
+def test_fast_flag_selects_http_mode(monkeypatch):
+    assert crawl_options(monkeypatch, ["--fast"])["mode"] == "fast"
+
+
+def test_large_crawl_flags_pass_through(monkeypatch):
+    options = crawl_options(monkeypatch, ["--max-pages", "5000", "--max-depth", "4", "--resume", "--persist"])
+    assert options["max_pages"] == 5000 and options["max_depth"] == 4
+    assert options["resume"] and options["persist"]
@@ -0,0 +1,61 @@
+import sqlite3
+
+from src.core.crawl_store import CrawlStore
+
+
+def test_fresh_run_drops_stale_wal(tmp_path):
+    path = str(tmp_path / "crawl.sqlite")
+    store = CrawlStore(path)
+    store.push("https://example.com/")
+    store.close()
+    # Sobra de um processo morto no meio de um checkpoint
+    for suffix in ("-wal", "-shm"):
+        with open(path + suffix, "wb") as f:
+            f.write(b"lixo de um run antigo")
+
+    store = CrawlStore(path)
+    assert store.visited_count() == 0
+    assert sqlite3.connect(path).execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    store.close()
+
+
+def test_resume_keeps_frontier(tmp_path):
+    path = str(tmp_path / "crawl.sqlite")
+    store = CrawlStore(path)
+    store.push("https://example.com/")
+    store.push("https://example.com/a", 1)
+    store.close()
+
+    store = CrawlStore(path, resume=True)
+    popped = [store.pop(), store.pop()]
+    assert [p[0] for p in popped] == ["https://example.com/", "https://example.com/a"]
+    store.close()
+
+
+def crawl(path, pages, incremental=True):
+    """Um run: cada página é visitada com o hash dado e classificada contra o anterior"""
+    store = CrawlStore(path, incremental=incremental)
+    for url, body_hash in pages.items():
+        store.push(url)
+        previous = store.previous(url)
+        if previous is None:
+            change = "added"
+        else:
+            change = "unchanged" if previous["body_hash"] == body_hash else "changed"
+        store.mark_visited(url, 200)
+        store.save_validators(url, body_hash=body_hash, change=change)
+    changes = store.changes()
+    store.close()
+    return changes
+
+
+def test_changes_against_previous_run(tmp_path):
+    path = str(tmp_path / "crawl.sqlite")
+    assert crawl(path, {"https://ex.com": "h1", "https://ex.com/a": "h2", "https://ex.com/b": "h3"}) is None
+    changes = crawl(path, {"https://ex.com": "h1", "https://ex.com/a": "h2-novo", "https://ex.com/c": "h4"})
+    assert changes == {
+        "added": ["https://ex.com/c"],
+        "removed": ["https://ex.com/b"],
+        "changed": ["https://ex.com/a"],
+        "unchanged": 1,
+    }
@@ -0,0 +1,39 @@
+import hashlib
+
+import pytest
+
+pytest.importorskip("requests")
+
+import src.core.crawler as crawler
+
+# Site falso: http redireciona para https (como a maioria dos sites reais)
+PAGES = {
+    "https://example.com": ["/a", "/b", "/c"],
+    "https://example.com/a": ["/", "/b", "/c"],
+    "https://example.com/b": ["/", "/a", "/c"],
+    "https://example.com/c": ["/", "/a", "/b"],
+}
+
+
+class FakeFetcher:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def close(self):
+        pass
+
+    def fetch(self, url, headers=None, on_text=None):
+        final = url.replace("http://", "https://")
+        return {"url": url, "final_url": final, "status": 200, "headers": {}, "html": True,
+                "hrefs": PAGES[final], "spa_root": False, "scripts": 0, "bytes": 10,
+                "body_hash": hashlib.md5(final.encode()).hexdigest()}
+
+
+def test_incremental_recrawl_follows_saved_edges_after_redirect(monkeypatch, tmp_path):
+    monkeypatch.setattr(crawler, "HttpFetcher", FakeFetcher)
+    path = str(tmp_path / "crawl.sqlite")
+    first = crawler.run_crawler("http://example.com", incremental=True, state_path=path, mode="fast")
+    second = crawler.run_crawler("http://example.com", incremental=True, state_path=path, mode="fast")
+    assert second["total_scanned"] == first["total_scanned"]
+    assert second["changes"]["removed"] == []
+    assert second["changes"]["unchanged"] == first["total_scanned"]
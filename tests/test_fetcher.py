@@ -0,0 +1,33 @@
+import pytest
+
+pytest.importorskip("requests")
+
+from src.core.fetcher import LinkExtractor, looks_client_rendered
+
+
+def extract(html, chunk=5):
+    parser = LinkExtractor()
+    for i in range(0, len(html), chunk):
+        parser.feed(html[i:i + chunk])
+    parser.close()
+    return {"html": True, "hrefs": parser.hrefs, "spa_root": parser.spa_root, "scripts": parser.scripts}
+
+
+def test_server_rendered_page_stays_on_http():
+    result = extract('<nav><a href="/">Início</a><a href="/blog">Blog</a><a href="/contato">Contato</a></nav>')
+    assert result["hrefs"] == ["/", "/blog", "/contato"]
+    assert not looks_client_rendered(result)
+
+
+def test_empty_spa_shell_needs_browser():
+    result = extract('<div id="root"></div><script src="/assets/index-abc.js"></script>')
+    assert result["spa_root"] and result["scripts"] == 1
+    assert looks_client_rendered(result)
+
+
+def test_spa_root_with_few_links_needs_browser():
+    assert looks_client_rendered(extract('<div id="__next"><a href="/login">Entrar</a></div>'))
+
+
+def test_non_html_is_never_rendered():
+    assert not looks_client_rendered({"html": False, "hrefs": []})
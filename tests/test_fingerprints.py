@@ -0,0 +1,47 @@
+from src.core.fingerprints import StackScanner, fingerprint
+
+WORDPRESS_PAGE = """<html><head>
+<meta name="generator" content="WordPress 6.5.2">
+<link rel="stylesheet" href="/wp-content/themes/astra/style.css">
+<script src="/wp-content/plugins/woocommerce/assets/js/frontend.js"></script>
+<script src="/wp-content/plugins/contact-form-7/includes/js/index.js"></script>
+</head><body class="elementor-page"><script src="https://www.googletagmanager.com/gtm.js?id=GTM-X"></script></body></html>"""
+
+
+def test_wordpress_stack_and_details():
+    techs, details = fingerprint(WORDPRESS_PAGE, {"Server": "nginx/1.25", "Set-Cookie": "PHPSESSID=1; path=/"})
+    assert {"WordPress", "WooCommerce", "Elementor", "PHP", "Nginx", "Google Tag Manager"} <= techs
+    assert details["theme"] == "astra"
+    assert details["plugins"] == ["woocommerce", "contact-form-7"]
+    assert not details["ai_code"]
+
+
+def test_overlapping_literals_keep_both_techs():
+    # "react-dom" casa antes e cobre o trecho de "react": o trie fecha as substrings
+    techs, _ = fingerprint('<script src="/_next/static/react-dom.js"></script>', {})
+    assert {"Next.js", "React"} <= techs
+
+
+def test_implies_are_transitive():
+    techs, _ = fingerprint("", {"X-Powered-By": "Express"})
+    assert techs == {"Express", "Node.js"}
+
+
+def test_case_insensitive_headers_and_body():
+    techs, _ = fingerprint('<DIV NG-VERSION="17.0.0"></DIV>', {"SERVER": "CloudFlare", "CF-RAY": "abc"})
+    assert {"Angular", "Cloudflare"} <= techs
+
+
+def test_streaming_matches_across_chunk_boundary():
+    html = "x" * 5000 + WORDPRESS_PAGE
+    whole = fingerprint(html, {})
+    for size in (7, 64, 333):
+        scanner = StackScanner()
+        for i in range(0, len(html), size):
+            scanner.feed(html[i:i + size])
+        assert scanner.result({}) == whole
+
+
+def test_plain_page_detects_nothing():
+    assert fingerprint("<html><body><p>Olá</p></body></html>", {}) == (
+        set(), {"plugins": [], "theme": "Unknown", "ai_code": False})
@@ -0,0 +1,14 @@
+from src.utils.importtime import check_budgets
+
+from conftest import ROOT
+
+
+def test_import_budgets(monkeypatch):
+    # O import roda num interpretador novo, a partir da raiz do projeto
+    monkeypatch.chdir(ROOT)
+    results = check_budgets()
+    failed = [r for r in results if not r["ok"]]
+    assert not failed, "; ".join(
+        f"{r['module']}: {r['ms']} ms (orçamento {r['budget_ms']} ms), pesados no boot: {r['heavy'] or '-'}"
+        for r in failed
+    )
@@ -0,0 +1,73 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import src.utils.net_cache as net_cache
+from src.utils.net_cache import NetCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def cache_with_fake_dns(monkeypatch, answers):
+    clock = Clock()
+    # Relógio só do módulo: o time.monotonic global fica intacto
+    monkeypatch.setattr(net_cache, "time", SimpleNamespace(monotonic=clock))
+    cache = NetCache(min_ttl=5, max_ttl=3600)
+    calls = []
+
+    def query(host):
+        calls.append(host)
+        return answers[host]
+
+    monkeypatch.setattr(cache, "_query_dns", query)
+    return cache, clock, calls
+
+
+def test_dns_respects_record_ttl(monkeypatch):
+    cache, clock, calls = cache_with_fake_dns(monkeypatch, {"example.com": (["93.184.216.34"], 60)})
+    assert cache.resolve("Example.COM.") == ["93.184.216.34"]
+    clock.now += 59
+    assert cache.resolve("example.com") == ["93.184.216.34"]
+    assert calls == ["example.com"]
+    clock.now += 2
+    cache.resolve("example.com")
+    assert len(calls) == 2
+    assert cache.stats()["hits"] >= 1
+
+
+def test_negative_answers_are_cached(monkeypatch):
+    cache, clock, calls = cache_with_fake_dns(monkeypatch, {"nope.example": ([], 30)})
+    assert cache.resolve("nope.example") == []
+    assert cache.resolve("nope.example") == []
+    assert calls == ["nope.example"]
+
+
+def test_store_dns_clamps_ttl(monkeypatch):
+    cache, clock, _ = cache_with_fake_dns(monkeypatch, {})
+    cache.store_dns("a.example.com", ["1.1.1.1"], ttl=0)
+    clock.now += 4
+    assert cache.cached_dns("a.example.com") == ["1.1.1.1"]
+    clock.now += 2
+    assert cache.cached_dns("a.example.com") is None
+
+
+def test_concurrent_lookups_query_once(monkeypatch):
+    cache = NetCache()
+    calls = []
+
+    def slow_query(host):
+        calls.append(host)
+        time.sleep(0.05)
+        return ["10.0.0.1"], 60
+
+    monkeypatch.setattr(cache, "_query_dns", slow_query)
+    threads = [threading.Thread(target=cache.resolve, args=("api.example.com",)) for _ in range(8)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert calls == ["api.example.com"]
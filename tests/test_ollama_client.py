@@ -0,0 +1,69 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from src.core.ollama_client import AsyncOllamaClient, OllamaClient
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def iter_lines(self):
+        return [json.dumps(line).encode() for line in self.lines]
+
+
+def test_sync_and_async_share_one_gate():
+    client = OllamaClient(max_in_flight=1)
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    def post(*args, **kwargs):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.05)
+        with lock:
+            in_flight[0] -= 1
+        return FakeResponse([{"response": "ok", "done": True, "done_reason": "stop"}])
+
+    client.session.post = post
+    async_client = AsyncOllamaClient(client)
+
+    async def run():
+        sync_call = asyncio.to_thread(client.generate, "p", stream=True)
+        return await asyncio.gather(sync_call, *(async_client.generate("p", stream=True) for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert [text for text, _ in results] == ["ok"] * 4
+    assert peak[0] == 1
+
+
+def test_stream_error_chunk_is_surfaced():
+    client = OllamaClient()
+    client.session.post = lambda *a, **k: FakeResponse([{"response": "Olá"}, {"error": "model runner stopped"}])
+    text, stats = client.generate("p", stream=True)
+    assert text == "Erro IA: model runner stopped"
+    assert stats["error"] == text and not stats["done"]
+
+
+def test_cancelled_before_slot_skips_request():
+    client = OllamaClient()
+    client.session.post = lambda *a, **k: pytest.fail("não deveria chamar o Ollama")
+    cancel = threading.Event()
+    cancel.set()
+    text, stats = client.generate("p", stream=True, cancel=cancel)
+    assert text == "" and stats["cancelled"]
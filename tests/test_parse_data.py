@@ -0,0 +1,22 @@
+from src.core.measure import build_distributions
+from src.core.scanner import parse_data
+
+BACKEND = {"ttfb": 420, "stack": ["nginx"]}
+
+
+def test_all_runs_failed():
+    measurements = {"modes": {"cold": build_distributions([None, None, None], [None, None])}, "report": None}
+    data = parse_data(None, BACKEND, measurements=measurements)
+    assert data["metrics"] == {"LCP": "N/A", "CLS": "N/A", "TTFB": "420 ms"}
+    assert data["score"] == 0
+
+
+def test_missing_metric_keeps_the_others():
+    runs = [{"lcp_ms": 2000 + i * 400, "cls": None, "fcp_ms": None, "tbt_ms": None, "server_ttfb_ms": None,
+             "score": 80 + i} for i in range(3)]
+    measurements = {"modes": {"cold": build_distributions(runs, [300, 310, 320])}, "report": None}
+    data = parse_data(None, BACKEND, measurements=measurements)
+    assert data["metrics"]["LCP"] == "2.6 s"
+    assert data["metrics"]["CLS"] == "N/A"
+    assert data["metrics"]["TTFB"] == "315 ms"
+    assert data["score"] == 81
@@ -0,0 +1,32 @@
+import asyncio
+import sys
+import time
+import types
+
+from src.core.pipeline import Stage, build_scan_stages, run_dag
+
+
+def test_independent_stages_overlap():
+    stages = [
+        Stage("a", lambda: time.sleep(0.2) or 1),
+        Stage("b", lambda: time.sleep(0.2) or 2),
+        Stage("sum", lambda a, b: a + b, deps=("a", "b")),
+    ]
+    start = time.perf_counter()
+    results, timings = asyncio.run(run_dag(stages))
+    assert results["sum"] == 3
+    assert time.perf_counter() - start < 0.35
+    assert set(timings) == {"a", "b", "sum"}
+
+
+def test_lighthouse_does_not_wait_for_backend(monkeypatch):
+    scanner = types.ModuleType("src.core.scanner")
+    scanner.run_backend_check = scanner.get_ssl_info = scanner.parse_data = None
+    monkeypatch.setitem(sys.modules, "src.core.scanner", scanner)
+
+    by_name = {s.name: s for s in build_scan_stages("https://example.com", recon=False, report=False)}
+    assert by_name["lighthouse"].deps == ()
+    # No Chromium compartilhado a medição não pode dividir o browser com o HAR
+    by_name = {s.name: s for s in build_scan_stages("https://example.com", recon=False, report=False,
+                                                   lighthouse_pool=True)}
+    assert by_name["lighthouse"].deps == ("backend",)
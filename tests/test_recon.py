@@ -0,0 +1,35 @@
+import pytest
+
+from src.core.recon import TOP_PORTS, parse_ports, target_host, top_ports
+
+
+def test_top_ports_curated_first():
+    ports = top_ports(1000)
+    assert len(ports) == len(set(ports)) == 1000
+    assert ports[:3] == TOP_PORTS[:3]
+    assert set(dict.fromkeys(TOP_PORTS)) <= set(ports)
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("22,80,443", [22, 80, 443]),
+    ("80, 443,80", [80, 443]),
+    ("8000-8003", [8000, 8001, 8002, 8003]),
+    ("0-2,65535-70000", [1, 2, 65535]),
+    ([443, 80, 443], [443, 80]),
+])
+def test_parse_ports(spec, expected):
+    assert parse_ports(spec) == expected
+
+
+def test_parse_ports_presets():
+    assert parse_ports(None) == top_ports(100)
+    assert parse_ports("top10,9999") == top_ports(10) + [9999]
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://Example.com:8443/x", ("example.com", 8443)),
+    ("example.com", ("example.com", None)),
+    ("http://[::1]:8080/", ("::1", 8080)),
+])
+def test_target_host(url, expected):
+    assert target_host(url) == expected
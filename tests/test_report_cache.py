@@ -0,0 +1,113 @@
+import time
+
+import pytest
+
+import src.core.ai as ai
+from src.utils.report_cache import ReportCache
+
+DATA = {
+    "stack": {"nginx", "PHP", "WordPress"},
+    "score": 71,
+    "metrics": {"LCP": "2.3 s", "CLS": "0.02", "TTFB": "410 ms"},
+    "ssl_days": 60,
+    "security": {"score": 73, "issues": ["Falta HSTS", "Server Info: nginx"]},
+}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ReportCache(str(tmp_path / "cache.sqlite"))
+
+
+@pytest.fixture
+def llm(monkeypatch, cache):
+    """Ollama falso: conta as chamadas e devolve ``reply`` com as stats de um run completo"""
+    calls = []
+    state = {"reply": "Resumo.", "stats": {"done": True, "done_reason": "stop"}}
+
+    def query(prompt, options=None, system=None, priority=10, on_stats=None):
+        calls.append(prompt)
+        if on_stats: on_stats(dict(state["stats"]))
+        return state["reply"]
+
+    monkeypatch.setattr(ai, "query_ollama", query)
+    monkeypatch.setattr(ai, "get_report_cache", lambda: cache)
+    state["calls"] = calls
+    return state
+
+
+def key_for(data):
+    system, prompt, options = ai.build_prompt(data, ai.GENERATION_OPTIONS)
+    return ai.summary_cache_key(system, prompt, options)
+
+
+def test_key_ignores_set_order():
+    assert key_for(DATA) == key_for({**DATA, "stack": ["WordPress", "PHP", "nginx"]})
+
+
+def test_key_follows_numbers_quoted_in_prompt():
+    # O modelo cita os números do prompt: valor novo = resumo novo
+    assert key_for(DATA) != key_for({**DATA, "metrics": {**DATA["metrics"], "LCP": "2.4 s"}})
+    assert key_for(DATA) != key_for({**DATA, "score": 72})
+
+
+def test_summarize_hits_cache_for_same_scan(llm):
+    assert ai.summarize(DATA) == "Resumo."
+    assert ai.summarize({**DATA, "stack": list(DATA["stack"])}) == "Resumo."
+    assert len(llm["calls"]) == 1
+
+
+@pytest.mark.parametrize("reply, stats", [
+    ("", {"done": True, "done_reason": "stop"}),
+    ("Resumo cortado", {"done": True, "done_reason": "length"}),
+    ("Resumo sem fim", {"done": False}),
+    ("Erro conexão IA: timeout", {"error": "Erro conexão IA: timeout"}),
+])
+def test_incomplete_replies_are_not_cached(llm, cache, reply, stats):
+    llm["reply"], llm["stats"] = reply, stats
+    ai.summarize(DATA)
+    ai.summarize(DATA)
+    assert len(llm["calls"]) == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_reply_mentioning_errors_is_cached(llm):
+    llm["reply"] = "Erros de console e LCP alto derrubam a conversão."
+    ai.summarize(DATA)
+    ai.summarize(DATA)
+    assert len(llm["calls"]) == 1
+
+
+def test_reply_mentioning_errors_is_not_a_failure(llm):
+    llm["reply"] = "Erros de console e LCP alto derrubam a conversão."
+    report = ai.analyze_performance(DATA)
+    assert "Erros de console" in report
+    assert "Resumo da IA indisponível" not in report
+
+
+def test_flagged_error_falls_back_to_template(llm):
+    llm["reply"], llm["stats"] = "Erro conexão IA: timeout", {"error": "Erro conexão IA: timeout"}
+    report = ai.analyze_performance(DATA)
+    assert "Resumo da IA indisponível (Erro conexão IA: timeout)" in report
+
+
+def test_ttl_expires_entries(tmp_path):
+    cache = ReportCache(str(tmp_path / "c.sqlite"), ttl=0.05)
+    cache.put("k", "v")
+    assert cache.get("k") == "v"
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    cache = ReportCache(str(tmp_path / "c.sqlite"), max_bytes=10)
+    cache.put("a", "aaaa")
+    time.sleep(0.01)
+    cache.put("b", "bbbb")
+    time.sleep(0.01)
+    cache.get("a")  # "a" passa a ser o mais recente
+    time.sleep(0.01)
+    cache.put("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa" and cache.get("c") == "cccc"
@@ -0,0 +1,45 @@
+import statistics
+
+import pytest
+
+from src.utils.stats import describe, median_ci95, percentile
+
+
+def test_percentile_matches_numpy_linear():
+    values = [10, 20, 30, 40]
+    assert percentile(values, 50) == 25
+    assert percentile(values, 75) == 32.5
+    assert percentile([], 50) is None
+
+
+def test_describe_ignores_failed_runs():
+    summary = describe([1200, None, 1000, 1100, None])
+    assert summary["n"] == 3
+    assert summary["median"] == 1100 and summary["min"] == 1000 and summary["max"] == 1200
+
+
+def test_describe_empty_series():
+    assert describe([None, None]) == {"n": 0}
+
+
+def test_ci95_mean_uses_student_t():
+    samples = [980, 1010, 1005, 995, 1020, 990]
+    summary = describe(samples)
+    mean, stdev = statistics.fmean(samples), statistics.stdev(samples)
+    margin = 2.571 * stdev / len(samples) ** 0.5  # t com 5 graus de liberdade
+    assert summary["ci95_mean"] == [pytest.approx(mean - margin, abs=0.1), pytest.approx(mean + margin, abs=0.1)]
+    lo, hi = summary["ci95_mean"]
+    assert lo < summary["mean"] < hi
+
+
+def test_ci95_median_needs_six_samples():
+    assert describe([1, 2, 3, 4, 5])["ci95_median"] is None
+    values = list(range(1, 21))
+    lo, hi = median_ci95(values)
+    assert lo <= percentile(values, 50) <= hi
+    assert lo > values[0] and hi < values[-1]
+
+
+def test_single_sample_has_no_interval():
+    summary = describe([500])
+    assert summary["stdev"] == 0 and summary["ci95_mean"] is None
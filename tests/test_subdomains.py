@@ -0,0 +1,50 @@
+import asyncio
+
+from src.core.subdomains import discover_subdomains, iter_candidates
+
+
+def test_known_names_come_first_and_are_deduplicated():
+    # Curinga vira o próprio domínio (descartado) e a primeira origem vista vale
+    extra = [("*.example.com", "cert"), ("API.example.com.", "link"), ("api.example.com", "cert"),
+             ("example.com", "cert"), ("other.org", "link")]
+    candidates = list(iter_candidates("example.com", extra=extra))
+    known = [c for c in candidates if c[1] != "wordlist"]
+    assert candidates[0] == ("api.example.com", "link")
+    assert known == [("api.example.com", "link")]
+    hosts = [host for host, _ in candidates]
+    assert len(hosts) == len(set(hosts))
+    assert "www.example.com" in hosts
+
+
+def test_wordlist_is_streamed(tmp_path):
+    # Repetições da wordlist não são filtradas aqui: caem no cache do resolver
+    wordlist = tmp_path / "labels.txt"
+    wordlist.write_text("# comentário\nwww\n\nDEV.\nwww\n", encoding="utf-8")
+    assert list(iter_candidates("example.com", str(wordlist))) == [
+        ("www.example.com", "wordlist"), ("dev.example.com", "wordlist"), ("www.example.com", "wordlist")]
+
+
+class FakeResolver:
+    """Zona falsa com curinga: qualquer nome inexistente cai em 10.0.0.99"""
+
+    errors = 0
+
+    def __init__(self, records):
+        self.records = records
+
+    async def resolve(self, host):
+        return self.records.get(host, ["10.0.0.99"])
+
+    async def wildcard_ips(self, domain):
+        return {"10.0.0.99"}
+
+
+def test_wildcard_answers_are_dropped():
+    resolver = FakeResolver({"www.example.com": ["10.0.0.1"], "api.example.com": ["10.0.0.2", "10.0.0.99"]})
+    found = []
+    result = asyncio.run(discover_subdomains("https://example.com/", resolver=resolver, concurrency=4,
+                                             on_found=found.append))
+    assert [s["host"] for s in result["subdomains"]] == ["api.example.com", "www.example.com"]
+    assert result["wildcard"] == ["10.0.0.99"]
+    assert len(found) == 2
+    assert result["checked"] > 2
@@ -0,0 +1,45 @@
+import pytest
+
+from src.utils.urls import CrawlFrontier, OrderedSet, normalize_url
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("HTTP://Example.COM:80/a/", "http://example.com/a"),
+    ("https://example.com:443/", "https://example.com"),
+    ("https://example.com:8443/x#top", "https://example.com:8443/x"),
+    ("https://example.com./p", "https://example.com/p"),
+    ("https://ex.com/p?b=2&a=x%20y&flag", "https://ex.com/p?a=x%20y&b=2&flag"),
+    ("http://[::1]:8080/", "http://[::1]:8080"),
+    ("http://[2001:db8::1]/", "http://[2001:db8::1]"),
+    ("https://user:pw@example.com/", "https://user:pw@example.com"),
+])
+def test_normalize_url(raw, expected):
+    assert normalize_url(raw) == expected
+
+
+def test_normalize_url_resolves_relative():
+    assert normalize_url("../b/?z=1&a=2", base="https://ex.com/a/c/") == "https://ex.com/a/b?a=2&z=1"
+
+
+@pytest.mark.parametrize("raw", ["mailto:a@b.com", "javascript:void(0)", "ftp://ex.com/", "http://", "http://[::1"])
+def test_normalize_url_rejects(raw):
+    assert normalize_url(raw) is None
+
+
+def test_frontier_is_fifo_and_deduplicates():
+    frontier = CrawlFrontier(["https://ex.com"])
+    assert frontier.push("https://ex.com/a", 1)
+    assert not frontier.push("https://ex.com", 2)
+    assert len(frontier) == 2
+    assert frontier.pop() == ("https://ex.com", 0)
+    assert frontier.pop() == ("https://ex.com/a", 1)
+    assert frontier.pop() is None
+    # Já saiu da fila mas continua visto
+    assert frontier.seen("https://ex.com/a")
+    assert not frontier.push("https://ex.com/a")
+
+
+def test_ordered_set_keeps_insertion_order():
+    links = OrderedSet(["b", "a"])
+    assert links.add("c") and not links.add("a")
+    assert list(links) == ["b", "a", "c"] and len(links) == 3 and "c" in links